@@ -0,0 +1,197 @@
+import argparse
+import itertools
+import json
+import os
+from multiprocessing import Pool
+from Board.board import Board
+from Board.move import Move
+from Endgames.bitbase import BitbaseProber
+from Helpers.moveUtility import MoveUtility
+from Helpers.pgnReader import PGNReader
+from Helpers.pgnWriter import PGNWriter
+from Search.searcher import Searcher
+
+class GameAnnotator:
+    """
+    Annotates the moves of a game with the evaluation of the played move, the best move found by the search,
+    and a tag for inaccuracies, mistakes and blunders.
+    One annotator (with its board, move generator and searcher) is kept alive per worker process,
+    so the transposition table stays warm from one game to the next
+    """
+    # Centipawn loss (compared to the best move) at which a move is tagged
+    InaccuracyThreshold = 50
+    MistakeThreshold = 100
+    BlunderThreshold = 300
+
+    def __init__(self, max_depth=8, max_nodes=None, tt_size_mb=64, bitbase_path=None):
+        self.board = Board()
+        self.searcher = Searcher(self.board, tt_size_mb, BitbaseProber.load(bitbase_path) if bitbase_path else None)
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+
+    def annotate(self, game):
+        """
+        Returns (move values, comments) for the mainline of the game, one comment per move,
+        or None if a move can't be resolved in its position (so the game is skipped rather than written cut short)
+        """
+        board = self.board
+        moves = list(PGNReader.read_game_moves(game, board))
+        if len(moves) < len(game.moves):
+            return None
+
+        board.load_fen_fast(game.start_fen)
+        comments = []
+        for move in moves:
+            comments.append(self.annotate_move(move))
+            board.make_move(move)
+
+        return [move.value for move in moves], comments
+
+    def annotate_move(self, move):
+        """
+        Comment for a move about to be played on the board: evaluation after the move (from white's perspective),
+        search depth, and the best move with its evaluation if the played move was worse
+        """
+        board = self.board
+        white_sign = 1 if board.is_white_to_move else -1
+
+        best_move = self.searcher.start_search(self.max_depth, self.max_nodes)
+        best_eval = self.searcher.best_eval
+        depth = self.searcher.current_depth
+
+        if best_move.is_null or best_move.value == move.value:
+            return f"{GameAnnotator.format_score(best_eval * white_sign)}/{depth}"
+
+        best_move_name = MoveUtility.get_move_name_san(best_move, board)
+
+        # Score the played move with a root search restricted to it, to the depth the best move was searched to,
+        # so that both scores come from the same position and depth
+        self.searcher.start_search(max(1, depth), self.max_nodes, search_moves=[move])
+        played_eval = self.searcher.best_eval
+        played_depth = self.searcher.current_depth
+
+        comment = f"{GameAnnotator.format_score(played_eval * white_sign)}/{played_depth}"
+        tag = GameAnnotator.get_tag(best_eval - played_eval)
+        if tag:
+            comment += f" {tag} Best: {best_move_name} ({GameAnnotator.format_score(best_eval * white_sign)})"
+        return comment
+
+    @staticmethod
+    def get_tag(centipawn_loss):
+        if centipawn_loss >= GameAnnotator.BlunderThreshold:
+            return "Blunder (??)."
+        if centipawn_loss >= GameAnnotator.MistakeThreshold:
+            return "Mistake (?)."
+        if centipawn_loss >= GameAnnotator.InaccuracyThreshold:
+            return "Inaccuracy (?!)."
+        return ""
+
+    @staticmethod
+    def format_score(score):
+        if Searcher.is_mate_score(score):
+            mate_in_moves = (Searcher.num_ply_to_mate(score) + 1) // 2
+            return f"#{mate_in_moves}" if score > 0 else f"#-{mate_in_moves}"
+        return f"{score / 100:+.2f}"
+
+
+class PGNAnnotator:
+    """
+    Annotates every game of a PGN file, spreading the games over a pool of worker processes.
+    Games are written in their input order; games with a move that can't be resolved are skipped.
+    After every flush, the number of input games done (and the size of the output at that point) is recorded
+    in a checkpoint file, so an interrupted run can be resumed where it left off
+    """
+    # Annotator of the current worker process (created by init_worker)
+    worker_annotator = None
+
+    def __init__(self, max_depth=8, max_nodes=None, num_workers=None, tt_size_mb=64, flush_interval=10, bitbase_path=None):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.num_workers = num_workers or os.cpu_count()
+        self.tt_size_mb = tt_size_mb
+        self.flush_interval = flush_interval
+        self.bitbase_path = bitbase_path
+
+    @staticmethod
+    def init_worker(max_depth, max_nodes, tt_size_mb, bitbase_path):
+        PGNAnnotator.worker_annotator = GameAnnotator(max_depth, max_nodes, tt_size_mb, bitbase_path)
+
+    @staticmethod
+    def annotate_game(game):
+        return game, PGNAnnotator.worker_annotator.annotate(game)
+
+    @staticmethod
+    def read_checkpoint(checkpoint_path):
+        """
+        (number of input games done, number of them skipped, output size in bytes) from the checkpoint,
+        or (0, 0, 0) if there is none
+        """
+        if not os.path.exists(checkpoint_path):
+            return 0, 0, 0
+        with open(checkpoint_path, 'r') as file:
+            checkpoint = json.load(file)
+        return checkpoint["games"], checkpoint.get("skipped", 0), checkpoint["offset"]
+
+    @staticmethod
+    def write_checkpoint(checkpoint_path, num_games, num_skipped, offset):
+        temp_path = checkpoint_path + ".tmp"
+        with open(temp_path, 'w') as file:
+            json.dump({"games": num_games, "skipped": num_skipped, "offset": offset}, file)
+        os.replace(temp_path, checkpoint_path)
+
+    def annotate(self, input_path, output_path, checkpoint_path=None):
+        """
+        Annotate the games in input_path and write them to output_path.
+        Returns (number of games written, number skipped), including those of the run being resumed
+        """
+        checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+        num_done, num_skipped, offset = PGNAnnotator.read_checkpoint(checkpoint_path)
+
+        # Discard anything written after the last checkpoint (it will be written again)
+        with open(output_path, 'a') as output:
+            output.truncate(offset)
+
+        with open(input_path, 'r', errors='replace') as input_file, PGNWriter(output_path, self.flush_interval) as writer, \
+                Pool(self.num_workers, PGNAnnotator.init_worker, (self.max_depth, self.max_nodes, self.tt_size_mb, self.bitbase_path)) as pool:
+            games = itertools.islice(PGNReader.read_games(input_file), num_done, None)
+
+            for game, annotation in pool.imap(PGNAnnotator.annotate_game, games):
+                if annotation is None:
+                    num_skipped += 1
+                else:
+                    move_values, comments = annotation
+                    moves = [Move(move_value=value) for value in move_values]
+                    writer.write_game(moves, game.result, game.start_fen, headers=game.headers, comments=comments)
+                num_done += 1
+
+                if num_done % self.flush_interval == 0:
+                    writer.file.flush()
+                    PGNAnnotator.write_checkpoint(checkpoint_path, num_done, num_skipped, writer.file.tell())
+
+            writer.file.flush()
+            PGNAnnotator.write_checkpoint(checkpoint_path, num_done, num_skipped, writer.file.tell())
+
+        return num_done - num_skipped, num_skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotate the games of a PGN file with evaluations and best moves")
+    parser.add_argument("input", help="PGN file to annotate")
+    parser.add_argument("output", help="annotated PGN output (appended to when resuming)")
+    parser.add_argument("--depth", type=int, default=8, help="search depth per move")
+    parser.add_argument("--nodes", type=int, default=None, help="node limit per move")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--hash", type=int, default=64, help="transposition table size (MB) per worker")
+    parser.add_argument("--bitbases", default=None, help="directory of bitbases to probe during search")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint path (default: <output>.checkpoint)")
+    args = parser.parse_args()
+
+    annotator = PGNAnnotator(args.depth, args.nodes, args.workers, args.hash, bitbase_path=args.bitbases)
+    num_games, num_skipped = annotator.annotate(args.input, args.output, args.checkpoint)
+    print(f"Annotated {num_games} games")
+    if num_skipped:
+        print(f"Skipped {num_skipped} games with a move that could not be resolved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import random
+import timeit
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
+
+class BitboardBenchmark:
+    """
+    Micro-benchmarks of the bitboard primitives against the previous approach
+    (a while loop calling pop_lsb and clearing the bit by hand)
+    """
+    NumBitboards = 1000
+    Repeats = 5
+    Iterations = 20
+
+    @staticmethod
+    def squares_with_pop_lsb(bitboard):
+        squares = []
+        while bitboard:
+            squares.append(BitBoardUtility.pop_lsb(bitboard))
+            bitboard &= bitboard - 1
+        return squares
+
+    @staticmethod
+    def squares_with_iter_squares(bitboard):
+        return [square for square in BitBoardUtility.iter_squares(bitboard)]
+
+    @staticmethod
+    def popcount_with_string(bitboard):
+        return bin(bitboard).count('1')
+
+    @staticmethod
+    def random_bitboards(num_bits, seed=1234):
+        rng = random.Random(seed)
+        return [sum(1 << square for square in rng.sample(range(64), num_bits)) for _ in range(BitboardBenchmark.NumBitboards)]
+
+    @staticmethod
+    def time(function, bitboards):
+        """
+        Best time (in seconds) of Repeats runs, each applying the function Iterations times to every bitboard
+        """
+        timings = timeit.repeat(lambda: [function(bitboard) for bitboard in bitboards],
+                                repeat=BitboardBenchmark.Repeats, number=BitboardBenchmark.Iterations)
+        return min(timings)
+
+    @staticmethod
+    def run():
+        candidates = [
+            ("squares: pop_lsb loop", BitboardBenchmark.squares_with_pop_lsb),
+            ("squares: iter_squares", BitboardBenchmark.squares_with_iter_squares),
+            ("squares: get_squares", BitBoardUtility.get_squares),
+            ("count: bin().count", BitboardBenchmark.popcount_with_string),
+            ("count: popcount", BitBoardUtility.popcount),
+            ("count: int.bit_count", int.bit_count),
+        ]
+
+        for num_bits in (2, 8, 16, 32):
+            bitboards = BitboardBenchmark.random_bitboards(num_bits)
+            print(f"{num_bits} bits set:")
+            for name, function in candidates:
+                seconds = BitboardBenchmark.time(function, bitboards)
+                per_call = seconds / (BitboardBenchmark.Iterations * BitboardBenchmark.NumBitboards) * 1e9
+                print(f"  {name:<24}{per_call:8.1f} ns")
+
+
+if __name__ == "__main__":
+    BitboardBenchmark.run()
@@ -0,0 +1,215 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+from Board.board import Board
+from Board.move import Move
+from Board.piece import Piece
+from Board.zobrist import Zobrist
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from Move_Generation.moveGenerator import MoveGenerator
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
+from Move_Generation.Magics.magic import Magic
+
+class ComponentBenchmark:
+    """
+    Times the engine's hot primitives in isolation. Each benchmark is warmed up, then timed over Repeats runs of a
+    calibrated number of iterations; the fastest run gives the reported time per operation (the median is kept too).
+    Results are written to JSON and can be compared against a stored baseline, flagging anything slower by more
+    than the threshold
+    """
+    Repeats = 7
+    WarmupSeconds = 0.1
+    # Each timed run is made long enough that timer resolution and call overhead don't matter
+    MinRunSeconds = 0.05
+    DefaultThreshold = 0.1
+
+    PositionClasses = {
+        "opening": FenUtility.StartPositionFEN,
+        "middlegame": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "endgame": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "promotions": "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+    }
+    # Positions in which every move type can be found, for the make/unmake benchmarks
+    MoveTypePositions = list(PositionClasses.values()) + ["rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"]
+
+    def __init__(self, name_filter=None, seed=1234):
+        self.name_filter = name_filter
+        self.rng = random.Random(seed)
+
+    def get_benchmarks(self):
+        """
+        (name, function, operations per call) for every benchmark. Functions take no arguments;
+        any setup happens here so that only the primitive itself is timed
+        """
+        benchmarks = []
+        rng = self.rng
+
+        squares = [rng.randrange(64) for _ in range(256)]
+        blockers = [rng.getrandbits(64) & rng.getrandbits(64) for _ in range(256)]
+        queries = list(zip(squares, blockers))
+        benchmarks.append(("magic.get_rook_attacks", lambda: [Magic.get_rook_attacks(square, blocker) for square, blocker in queries], len(queries)))
+        benchmarks.append(("magic.get_bishop_attacks", lambda: [Magic.get_bishop_attacks(square, blocker) for square, blocker in queries], len(queries)))
+
+        bitboards = [rng.getrandbits(64) | 1 << 63 for _ in range(256)]
+        benchmarks.append(("bitboard.pop_lsb", lambda: [BitBoardUtility.pop_lsb(bitboard) for bitboard in bitboards], len(bitboards)))
+
+        move_generator = MoveGenerator()
+        for class_name, fen in ComponentBenchmark.PositionClasses.items():
+            board = Board()
+            board.load_position(fen)
+            benchmarks.append((f"movegen.generate_moves[{class_name}]", lambda board=board: move_generator.generate_moves(board), 1))
+            benchmarks.append((f"movegen.generate_captures[{class_name}]", lambda board=board: move_generator.generate_moves(board, captures_only=True), 1))
+
+        for move_type, fen, move in ComponentBenchmark.find_move_types(move_generator):
+            board = Board()
+            board.load_position(fen)
+            benchmarks.append((f"board.make_unmake[{move_type}]", lambda board=board, move=move: ComponentBenchmark.make_unmake(board, move), 1))
+
+        fens = list(ComponentBenchmark.PositionClasses.values())
+        benchmarks.append(("fen.position_from_fen", lambda: [FenUtility.position_from_fen(fen) for fen in fens], len(fens)))
+
+        zobrist_board = Board()
+        zobrist_board.load_position(ComponentBenchmark.PositionClasses["middlegame"])
+        benchmarks.append(("zobrist.calculate_zobrist_key", lambda: Zobrist.calculate_zobrist_key(zobrist_board), 1))
+
+        san_board = Board()
+        san_board.load_position(ComponentBenchmark.PositionClasses["middlegame"])
+        san_moves = move_generator.generate_moves(san_board)
+        benchmarks.append(("moveutility.get_move_name_san", lambda: [MoveUtility.get_move_name_san(move, san_board) for move in san_moves], len(san_moves)))
+
+        if self.name_filter:
+            benchmarks = [benchmark for benchmark in benchmarks if self.name_filter in benchmark[0]]
+        return benchmarks
+
+    @staticmethod
+    def make_unmake(board, move):
+        board.make_move(move, in_search=True)
+        board.unmake_move(move, in_search=True)
+
+    @staticmethod
+    def find_move_types(move_generator):
+        """
+        (move type, fen, move) for the first move of each type found in MoveTypePositions
+        """
+        found = {}
+        board = Board()
+        for fen in ComponentBenchmark.MoveTypePositions:
+            board.load_position(fen)
+            for move in move_generator.generate_moves(board):
+                move_type = ComponentBenchmark.get_move_type(board, move)
+                if move_type not in found:
+                    found[move_type] = (move_type, fen, move)
+        return list(found.values())
+
+    @staticmethod
+    def get_move_type(board, move):
+        flag = move.move_flag
+        if move.is_promotion:
+            return "promotion"
+        if flag == Move.CastleFlag:
+            return "castle"
+        if flag == Move.EnPassantCaptureFlag:
+            return "en_passant"
+        if flag == Move.PawnTwoUpFlag:
+            return "pawn_two_up"
+        if board.square[move.target_square] != Piece.NoneType:
+            return "capture"
+        return "quiet"
+
+    @staticmethod
+    def time_benchmark(function, operations_per_call):
+        """
+        (fastest, median) time per operation in nanoseconds
+        """
+        timer = timeit.Timer(function)
+
+        # Warm up, and find how many calls make a run last at least MinRunSeconds
+        number, seconds = timer.autorange()
+        while seconds < ComponentBenchmark.MinRunSeconds:
+            number *= 2
+            seconds = timer.timeit(number)
+        warmup_remaining = ComponentBenchmark.WarmupSeconds - seconds
+        while warmup_remaining > 0:
+            warmup_remaining -= timer.timeit(number)
+
+        timings = [seconds / (number * operations_per_call) * 1e9 for seconds in timer.repeat(ComponentBenchmark.Repeats, number)]
+        return min(timings), statistics.median(timings)
+
+    def run(self, verbose=True):
+        results = {}
+        for name, function, operations_per_call in self.get_benchmarks():
+            fastest, median = ComponentBenchmark.time_benchmark(function, operations_per_call)
+            results[name] = {"ns_per_op": round(fastest, 2), "median_ns_per_op": round(median, 2)}
+            if verbose:
+                print(f"{name:<45}{fastest:12.1f} ns  (median {median:.1f})", flush=True)
+
+        return {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "benchmarks": results,
+        }
+
+    @staticmethod
+    def compare(results, baseline, threshold=DefaultThreshold):
+        """
+        Compare results against a baseline. Returns (name, baseline ns, current ns, relative change) for every benchmark
+        present in both, and the names of those slower than the baseline by more than the threshold
+        """
+        comparisons = []
+        regressions = []
+        for name, result in results["benchmarks"].items():
+            if name not in baseline["benchmarks"]:
+                continue
+            baseline_ns = baseline["benchmarks"][name]["ns_per_op"]
+            current_ns = result["ns_per_op"]
+            change = current_ns / baseline_ns - 1 if baseline_ns > 0 else 0.0
+            comparisons.append((name, baseline_ns, current_ns, change))
+            if change > threshold:
+                regressions.append(name)
+        return comparisons, regressions
+
+    @staticmethod
+    def write_json(results, path):
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    @staticmethod
+    def read_json(path):
+        with open(path, 'r') as file:
+            return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the engine's hot primitives")
+    parser.add_argument("--output", default=None, help="write results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare against this JSON results file")
+    parser.add_argument("--threshold", type=float, default=ComponentBenchmark.DefaultThreshold,
+                        help="relative slowdown reported as a regression (default 0.1 = 10%%)")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeats", type=int, default=ComponentBenchmark.Repeats)
+    args = parser.parse_args()
+
+    ComponentBenchmark.Repeats = args.repeats
+    results = ComponentBenchmark(args.filter).run()
+    if args.output:
+        ComponentBenchmark.write_json(results, args.output)
+
+    if args.baseline:
+        comparisons, regressions = ComponentBenchmark.compare(results, ComponentBenchmark.read_json(args.baseline), args.threshold)
+        print()
+        for name, baseline_ns, current_ns, change in comparisons:
+            marker = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<45}{baseline_ns:12.1f} -> {current_ns:10.1f} ns  {change:+7.1%}{marker}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import os
+import subprocess
+import sys
+
+class ImportBenchmark:
+    """
+    Checks the import time of entry-point modules against a budget, using python -X importtime in a fresh interpreter.
+    Precomputed tables are built lazily (see LazyTable), so tools that only parse FEN or write PGN shouldn't pay for
+    the move generation tables at startup; this catches a module that starts doing heavy work at import again
+    """
+    CoreDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    # Cumulative import time budgets in milliseconds. Measured best of 10 runs (CPython 3.11): fenUtility 9-13 ms,
+    # pgnCreator 39-43 ms, moveGenerator 25 ms; the budgets leave headroom for slower or busier machines
+    ImportBudgetsMs = {
+        "Helpers.fenUtility": 20,
+        "Helpers.pgnCreator": 65,
+        "Move_Generation.moveGenerator": 40,
+    }
+    Runs = 5
+
+    @staticmethod
+    def measure(module_name):
+        """
+        Best cumulative import time (ms) of the module over Runs fresh interpreters
+        """
+        env = dict(os.environ, PYTHONPATH=ImportBenchmark.CoreDir)
+        timings = []
+        for _ in range(ImportBenchmark.Runs):
+            process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"], cwd=ImportBenchmark.CoreDir,
+                                     env=env, capture_output=True, text=True)
+            if process.returncode != 0:
+                raise RuntimeError(f"importing {module_name} failed:\n{process.stderr}")
+            timings.append(ImportBenchmark.parse_cumulative_us(process.stderr, module_name) / 1000)
+        return min(timings)
+
+    @staticmethod
+    def parse_cumulative_us(importtime_output, module_name):
+        """
+        Cumulative time (us) of the module from -X importtime output ("import time: self [us] | cumulative | imported package")
+        """
+        for line in importtime_output.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            fields = line[len("import time:"):].split('|')
+            if len(fields) == 3 and fields[2].strip() == module_name:
+                return int(fields[1])
+        raise ValueError(f"{module_name} not found in -X importtime output")
+
+    @staticmethod
+    def run(budgets):
+        """
+        Measure every module. Returns the names of the modules over budget
+        """
+        over_budget = []
+        for module_name, budget_ms in budgets.items():
+            import_ms = ImportBenchmark.measure(module_name)
+            status = "ok" if import_ms <= budget_ms else "OVER BUDGET"
+            print(f"{module_name:<36}{import_ms:8.1f} ms  (budget {budget_ms} ms)  {status}", flush=True)
+            if import_ms > budget_ms:
+                over_budget.append(module_name)
+        return over_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check module import times against their budgets")
+    parser.add_argument("modules", nargs='*', help='"module" or "module=budget_ms" (default: the built-in budgets)')
+    parser.add_argument("--runs", type=int, default=ImportBenchmark.Runs)
+    args = parser.parse_args()
+
+    ImportBenchmark.Runs = args.runs
+    budgets = dict(ImportBenchmark.ImportBudgetsMs)
+    if args.modules:
+        budgets = {}
+        for module in args.modules:
+            name, _, budget = module.partition('=')
+            budgets[name] = float(budget) if budget else ImportBenchmark.ImportBudgetsMs.get(name, 50)
+
+    if ImportBenchmark.run(budgets):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
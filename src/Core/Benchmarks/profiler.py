@@ -0,0 +1,189 @@
+import argparse
+import cProfile
+import functools
+import os
+import time
+from Board.board import Board
+from Evaluation.evaluation import Evaluation
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from Move_Generation.moveGenerator import MoveGenerator
+from Search.searcher import Searcher
+from Search.transpositionTable import TranspositionTable
+
+class Profiler:
+    """
+    Call counts and timings of the search's hot paths.
+    Nothing is instrumented until enable is called (directly, or by the UCI engine at startup when the CHESS_PROFILE
+    environment variable is set): the methods are then replaced on their classes by timed wrappers, and disable puts
+    the originals back. So when profiling is off the hot paths are the original functions, with no flag to check.
+
+    Times are inclusive (total) and exclusive (self, minus instrumented callees). Self times are also recorded per
+    call stack of instrumented functions, which can be written in the folded format read by flamegraph tools.
+    The call stack is shared, so only one thread should run instrumented code at a time
+    """
+    EnvironmentVariable = "CHESS_PROFILE"
+    # Set on every timed wrapper, so that a method is never wrapped twice (e.g. by a second copy of this module
+    # loaded as __main__, whose originals dict doesn't know about the first copy's wrappers)
+    WrapperMarker = "_profiler_instrumented"
+
+    Targets = [
+        (MoveGenerator, "_init"),
+        (MoveGenerator, "_calculate_attack_data"),
+        (MoveGenerator, "_generate_king_moves"),
+        (MoveGenerator, "_generate_sliding_moves"),
+        (MoveGenerator, "_generate_knight_moves"),
+        (MoveGenerator, "_generate_pawn_moves"),
+        (Board, "make_move"),
+        (Board, "unmake_move"),
+        (Evaluation, "evaluate"),
+        (TranspositionTable, "lookup_evaluation"),
+        (TranspositionTable, "store_evaluation"),
+        (TranspositionTable, "try_get_stored_move"),
+    ]
+
+    # (class, method name) -> original function, for every method currently instrumented
+    originals = {}
+    # Qualified name -> [calls, total seconds, self seconds]
+    stats = {}
+    # "outer;...;inner" -> self seconds
+    folded_stacks = {}
+    # [name, seconds spent in instrumented callees] for each instrumented call in progress
+    call_stack = []
+
+    @staticmethod
+    def is_enabled():
+        return bool(Profiler.originals)
+
+    @staticmethod
+    def enable_from_environment():
+        if os.environ.get(Profiler.EnvironmentVariable, "") not in ("", "0"):
+            Profiler.enable()
+
+    @staticmethod
+    def enable(targets=None):
+        for owner, name in targets or Profiler.Targets:
+            function = owner.__dict__[name]
+            if (owner, name) in Profiler.originals or getattr(function, Profiler.WrapperMarker, False):
+                continue
+            Profiler.originals[(owner, name)] = function
+            setattr(owner, name, Profiler.instrument(f"{owner.__name__}.{name}", function))
+
+    @staticmethod
+    def disable():
+        for (owner, name), function in Profiler.originals.items():
+            setattr(owner, name, function)
+        Profiler.originals = {}
+
+    @staticmethod
+    def reset():
+        for stat in Profiler.stats.values():
+            stat[:] = [0, 0.0, 0.0]
+        Profiler.folded_stacks.clear()
+
+    @staticmethod
+    def instrument(qualified_name, function):
+        stat = Profiler.stats.setdefault(qualified_name, [0, 0.0, 0.0])
+        call_stack = Profiler.call_stack
+        folded_stacks = Profiler.folded_stacks
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def instrumented(*args, **kwargs):
+            frame = [qualified_name, 0.0]
+            call_stack.append(frame)
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self_time = elapsed - frame[1]
+                stack_key = ';'.join(caller[0] for caller in call_stack)
+                call_stack.pop()
+                if call_stack:
+                    call_stack[-1][1] += elapsed
+
+                stat[0] += 1
+                stat[1] += elapsed
+                stat[2] += self_time
+                folded_stacks[stack_key] = folded_stacks.get(stack_key, 0.0) + self_time
+
+        setattr(instrumented, Profiler.WrapperMarker, True)
+        return instrumented
+
+    @staticmethod
+    def get_report():
+        """
+        (name, calls, total seconds, self seconds) for every instrumented function that was called, by self time
+        """
+        rows = [(name, calls, total, self_time) for name, (calls, total, self_time) in Profiler.stats.items() if calls > 0]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    @staticmethod
+    def format_report():
+        rows = Profiler.get_report()
+        total_self_time = sum(row[3] for row in rows) or 1.0
+        lines = [f"{'function':<42}{'calls':>10}{'total ms':>11}{'self ms':>11}{'us/call':>9}{'self %':>8}"]
+        for name, calls, total, self_time in rows:
+            lines.append(f"{name:<42}{calls:>10}{total * 1000:>11.1f}{self_time * 1000:>11.1f}"
+                         f"{total / calls * 1e6:>9.2f}{self_time / total_self_time:>8.1%}")
+        return '\n'.join(lines)
+
+    @staticmethod
+    def write_folded_stacks(path):
+        """
+        Write the self time of every call stack (in microseconds) as "outer;...;inner count" lines,
+        the input format of flamegraph.pl, inferno and speedscope
+        """
+        with open(path, 'w') as file:
+            for stack, seconds in sorted(Profiler.folded_stacks.items()):
+                file.write(f"{stack} {int(seconds * 1e6)}\n")
+
+    @staticmethod
+    def profile_search(searcher, max_depth=None, max_nodes=None, cprofile_path=None):
+        """
+        Run a search with fresh statistics and return its move. If cprofile_path is given the search also runs
+        under cProfile, and its statistics (readable with pstats, snakeviz or gprof2dot) are written there
+        """
+        Profiler.reset()
+        if cprofile_path is None:
+            return searcher.start_search(max_depth, max_nodes)
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return searcher.start_search(max_depth, max_nodes)
+        finally:
+            profile.disable()
+            profile.dump_stats(cprofile_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a search: call counts and times of the hot paths")
+    parser.add_argument("--fen", default=FenUtility.StartPositionFEN)
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--nodes", type=int, default=None)
+    parser.add_argument("--cprofile", default=None, help="also write cProfile statistics to this path")
+    parser.add_argument("--folded", default=None, help="write folded call stacks (for flame graphs) to this path")
+    args = parser.parse_args()
+
+    board = Board()
+    board.load_position(args.fen)
+    searcher = Searcher(board)
+    # Build the lazily initialized move generation tables first, so that they don't count towards the first call
+    searcher.move_generator.generate_moves(board)
+
+    Profiler.enable()
+    start_time = time.perf_counter()
+    move = Profiler.profile_search(searcher, args.depth, args.nodes, args.cprofile)
+    elapsed = time.perf_counter() - start_time
+    Profiler.disable()
+
+    print(f"Depth {searcher.current_depth}, {searcher.nodes} nodes in {elapsed:.2f}s, best move {MoveUtility.get_move_name_uci(move)}\n")
+    print(Profiler.format_report())
+    if args.folded:
+        Profiler.write_folded_stacks(args.folded)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
-from piece import Piece
-from pieceList import PieceList
-from gameState import GameState
+from Board.piece import Piece
+from Board.pieceList import PieceList
+from Board.gameState import GameState
 from Helpers.fenUtility import FenUtility
-from move import Move
+from Board.move import Move
 from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
-from zobrist import Zobrist
+from Board.zobrist import Zobrist
 from Helpers.boardHelpers import BoardHelper
 from Move_Generation.Magics.magic import Magic
 
@@ -62,6 +62,7 @@ class Board:
         self.all_piece_lists = [None] * (Piece.MaxPieceIndex + 1)
         self.game_state_history = []
         self.start_position_info = None
+        self.start_fen = None
         self.cached_in_check_value = False
         self.has_cached_in_check_value = False
 
@@ -86,7 +87,7 @@ class Board:
         self.all_pieces_bitboard = 0
 
         # Initialize game state
-        self.current_game_state = GameState()
+        self.current_game_state = GameState(Piece.NoneType, 0, 0, 0, 0)
         self.initialize()
 
     @property
@@ -119,7 +120,7 @@ class Board:
     
     @property
     def game_start_fen(self):
-        return self.start_position_info.fen
+        return self.start_fen
     
     def make_move(self, move, in_search=False):
         """
@@ -161,8 +162,8 @@ class Board:
 
             # Remove captured piece from bitboards/piece list
             self.all_piece_lists[captured_piece].remove_piece_at_square(capture_square)
-            BitBoardUtility.toggle_square(self.piece_bitboards, captured_piece, capture_square)
-            BitBoardUtility.toggle_square(self.color_bitboards, self.opponent_color_index, capture_square)
+            self.piece_bitboards[captured_piece] = BitBoardUtility.toggle_square(self.piece_bitboards[captured_piece], capture_square)
+            self.color_bitboards[self.opponent_color_index] = BitBoardUtility.toggle_square(self.color_bitboards[self.opponent_color_index], capture_square)
             new_zobrist_key ^= Zobrist.pieces_array[captured_piece][capture_square]
 
         # Handle King
@@ -178,8 +179,8 @@ class Board:
                 castling_rook_to_index = target_square - 1 if kingside else target_square + 1
 
                 # Update rook position
-                BitBoardUtility.toggle_squares(self.piece_bitboards, rook_piece, castling_rook_from_index, castling_rook_to_index)
-                BitBoardUtility.toggle_squares(self.color_bitboards, self.move_color_index, castling_rook_from_index, castling_rook_to_index)
+                self.piece_bitboards[rook_piece] = BitBoardUtility.toggle_squares(self.piece_bitboards[rook_piece], castling_rook_from_index, castling_rook_to_index)
+                self.color_bitboards[self.move_color_index] = BitBoardUtility.toggle_squares(self.color_bitboards[self.move_color_index], castling_rook_from_index, castling_rook_to_index)
                 self.all_piece_lists[rook_piece].move_piece(castling_rook_from_index, castling_rook_to_index)
                 self.square[castling_rook_from_index] = Piece.NoneType
                 self.square[castling_rook_to_index] = Piece.Rook | self.move_color
@@ -200,8 +201,8 @@ class Board:
             promotion_piece = Piece.make_piece(promotion_piece_type, self.move_color)
 
             # Remove pawn from promotion square and add promoted piece instead
-            BitBoardUtility.toggle_square(self.piece_bitboards, moved_piece, target_square)
-            BitBoardUtility.toggle_square(self.piece_bitboards, promotion_piece, target_square)
+            self.piece_bitboards[moved_piece] = BitBoardUtility.toggle_square(self.piece_bitboards[moved_piece], target_square)
+            self.piece_bitboards[promotion_piece] = BitBoardUtility.toggle_square(self.piece_bitboards[promotion_piece], target_square)
             self.all_piece_lists[moved_piece].remove_piece_at_square(target_square)
             self.all_piece_lists[promotion_piece].add_piece_at_square(target_square)
             self.square[target_square] = promotion_piece
@@ -215,13 +216,13 @@ class Board:
         # Update castling rights
         if prev_castle_state != 0:
             # Any piece moving to/from rook square removes castling right for that side
-            if target_square in (BoardHelper.h1, start_square == BoardHelper.h1):
+            if BoardHelper.h1 in (target_square, start_square):
                 new_castling_rights &= GameState.ClearWhiteKingsideMask
-            elif target_square in (BoardHelper.a1, start_square == BoardHelper.a1):
+            elif BoardHelper.a1 in (target_square, start_square):
                 new_castling_rights &= GameState.ClearWhiteQueensideMask
-            if target_square in (BoardHelper.h8, start_square == BoardHelper.h8):
+            if BoardHelper.h8 in (target_square, start_square):
                 new_castling_rights &= GameState.ClearBlackKingsideMask
-            elif target_square in (BoardHelper.a8, start_square == BoardHelper.a8):
+            elif BoardHelper.a8 in (target_square, start_square):
                 new_castling_rights &= GameState.ClearBlackQueensideMask
 
         # Update zobrist key with new piece position and side to move
@@ -310,7 +311,7 @@ class Board:
 
             # Add back captured piece
             self.piece_bitboards[captured_piece] = BitBoardUtility.toggle_square(self.piece_bitboards[captured_piece], capture_square)
-            self.colour_bitboards[self.opponent_colour_index] = BitBoardUtility.toggle_square(self.colour_bitboards[self.opponent_colour_index], capture_square)
+            self.color_bitboards[self.opponent_color_index] = BitBoardUtility.toggle_square(self.color_bitboards[self.opponent_color_index], capture_square)
             self.all_piece_lists[captured_piece].add_piece_at_square(capture_square)
             self.square[capture_square] = captured_piece
 
@@ -326,7 +327,7 @@ class Board:
                 rook_square_after_castling = moved_to - 1 if kingside else moved_to + 1
 
                 # Undo castling by returning rook to original square
-                self.piece_bitboards[rook_piece] == BitBoardUtility.toggle_squares(
+                self.piece_bitboards[rook_piece] = BitBoardUtility.toggle_squares(
                     self.piece_bitboards[rook_piece], rook_square_after_castling, rook_square_before_castling
                 )
                 self.color_bitboards[self.move_color_index] = BitBoardUtility.toggle_squares(
@@ -441,6 +442,7 @@ class Board:
         Load the position on the board from a PositionInfo object
         """
         self.start_position_info = pos_info
+        self.start_fen = pos_info.fen
         self.initialize()
 
         # Load pieces into board array and piece lists
@@ -451,13 +453,12 @@ class Board:
             self.square[square_index] = piece
 
             if piece != Piece.NoneType:
-                BitBoardUtility.set_square(self.piece_bitboards[piece], square_index)
-                BitBoardUtility.set_square(self.color_bitboards[color_index], square_index)
+                self.piece_bitboards[piece] = BitBoardUtility.set_square(self.piece_bitboards[piece], square_index)
+                self.color_bitboards[color_index] = BitBoardUtility.set_square(self.color_bitboards[color_index], square_index)
 
                 if piece_type == Piece.King:
                     self.king_square[color_index] = square_index
-                else:
-                    self.all_piece_lists[piece].add_piece_at_square(square_index)
+                self.all_piece_lists[piece].add_piece_at_square(square_index)
 
                 self.total_piece_count_without_pawns_and_kings += (0 if piece_type in (Piece.Pawn, Piece.King) else 1)
 
@@ -483,6 +484,95 @@ class Board:
         self.repetition_position_history.append(zobrist_key)
         self.game_state_history.append(self.current_game_state)
 
+    def load_fen_fast(self, fen):
+        """
+        Load the position from a FEN string in a single pass, writing the square array, bitboards, piece lists
+        and zobrist key directly. Unlike load_position, no PositionInfo is built and the existing lists are
+        reused, so this is the one to use when loading many positions into the same board
+        """
+        sections = fen.split()
+        square = self.square
+        piece_bitboards = self.piece_bitboards
+        all_piece_lists = self.all_piece_lists
+        pieces_array = Zobrist.pieces_array
+        piece_symbols = FenUtility.PieceSymbols
+
+        for i in range(64):
+            square[i] = Piece.NoneType
+        for i in range(len(piece_bitboards)):
+            piece_bitboards[i] = 0
+        for piece_list in all_piece_lists:
+            if piece_list is not None:
+                piece_list.clear()
+
+        white_pieces = 0
+        black_pieces = 0
+        non_pawn_piece_count = 0
+        zobrist_key = 0
+
+        # FEN ranks run from the 8th rank down to the 1st
+        square_index = 56
+        for symbol in sections[0]:
+            if symbol == '/':
+                square_index -= 16
+            elif symbol <= '8':
+                square_index += ord(symbol) - 48
+            else:
+                piece = piece_symbols[symbol]
+                bit = 1 << square_index
+                square[square_index] = piece
+                piece_bitboards[piece] |= bit
+                zobrist_key ^= pieces_array[piece][square_index]
+
+                if piece & Piece.colorMask:
+                    black_pieces |= bit
+                else:
+                    white_pieces |= bit
+
+                piece_type = piece & Piece.typeMask
+                all_piece_lists[piece].add_piece_at_square(square_index)
+                if piece_type == Piece.King:
+                    self.king_square[Board.BlackIndex if piece & Piece.colorMask else Board.WhiteIndex] = square_index
+                elif piece_type != Piece.Pawn:
+                    non_pawn_piece_count += 1
+                square_index += 1
+
+        self.color_bitboards[Board.WhiteIndex] = white_pieces
+        self.color_bitboards[Board.BlackIndex] = black_pieces
+        self.all_pieces_bitboard = white_pieces | black_pieces
+        self.total_piece_count_without_pawns_and_kings = non_pawn_piece_count
+
+        self.is_white_to_move = len(sections) < 2 or sections[1] == 'w'
+        self.update_slider_bitboards()
+
+        castling_rights = 0
+        if len(sections) > 2:
+            for symbol in sections[2]:
+                castling_rights |= FenUtility.CastlingSymbols.get(symbol, 0)
+
+        ep_file = 0
+        if len(sections) > 3 and sections[3] != '-':
+            ep_file = ord(sections[3][0]) - ord('a') + 1
+
+        fifty_move_counter = int(sections[4]) if len(sections) > 4 else 0
+        move_count = int(sections[5]) if len(sections) > 5 else 1
+        self.ply_count = (move_count - 1) * 2 + (0 if self.is_white_to_move else 1)
+
+        zobrist_key ^= Zobrist.en_passant_file[ep_file] ^ Zobrist.castling_rights[castling_rights]
+        if not self.is_white_to_move:
+            zobrist_key ^= Zobrist.side_to_move
+
+        self.current_game_state = GameState(Piece.NoneType, ep_file, castling_rights, fifty_move_counter, zobrist_key)
+        self.start_position_info = None
+        self.start_fen = fen
+        self.has_cached_in_check_value = False
+
+        self.all_game_moves.clear()
+        self.repetition_position_history.clear()
+        self.game_state_history.clear()
+        self.repetition_position_history.append(zobrist_key)
+        self.game_state_history.append(self.current_game_state)
+
     def __str__(self):
         """
         Return a string representation of the board
@@ -504,7 +594,7 @@ class Board:
         Create a new board initialized as a copy of another board
         """
         board = Board()
-        board.load_position_info(source.start_position_info)
+        board.load_fen_fast(source.game_start_fen)
 
         for move in source.all_game_moves:
             board.make_move(move)
@@ -521,7 +611,7 @@ class Board:
         4. Addition of promoted piece during pawn promotion
         """
         self.piece_bitboards[piece] = BitBoardUtility.toggle_squares(self.piece_bitboards[piece], start_square, target_square)
-        self.colour_bitboards[self.move_colour_index] = BitBoardUtility.toggle_squares(self.colour_bitboards[self.move_colour_index], start_square, target_square)
+        self.color_bitboards[self.move_color_index] = BitBoardUtility.toggle_squares(self.color_bitboards[self.move_color_index], start_square, target_square)
 
         self.all_piece_lists[piece].move_piece(start_square, target_square)
         self.square[start_square] = Piece.NoneType
@@ -554,7 +644,7 @@ class Board:
         self.repetition_position_history = []
         self.game_state_history = []
 
-        self.current_game_state = GameState()
+        self.current_game_state = GameState(Piece.NoneType, 0, 0, 0, 0)
         self.ply_count = 0
 
         self.knights = [PieceList(10), PieceList(10)]
@@ -582,5 +672,5 @@ class Board:
 
         # Initialize bitboards
         self.piece_bitboards = [0] * (Piece.MaxPieceIndex + 1)
-        self.colour_bitboards = [0, 0]
+        self.color_bitboards = [0, 0]
         self.all_pieces_bitboard = 0
\ No newline at end of file
@@ -1,5 +1,3 @@
-from Helpers.boardHelpers import BoardHelper
-
 # Structure for representing squares on the chess board as file/rank integer pairs.
 # (0, 0) = a1, (7, 7) = h8.
 # Coords can also be used as offsets. For example, while a Coord of (-1, 0) is not
@@ -13,13 +11,13 @@ class Coord:
         """
         if rank_index is None:
             # If rank_index is None, initialize using a single square index
-            self.file_index = BoardHelper.file_index(file_index)
-            self.rank_index = BoardHelper.rank_index(file_index)
+            self.file_index = file_index & 0b000111
+            self.rank_index = file_index >> 3
             self.square_index = file_index
         else:
             self.file_index = file_index
             self.rank_index = rank_index
-            self.square_index = BoardHelper.index_from_coord(self)
+            self.square_index = rank_index * 8 + file_index
     
     def is_light_square(self):
         """Determines if the square is a light-colored square"""
@@ -35,7 +33,6 @@ class Coord:
         """Checks if the coordinate is within the valid chessboard range"""
         return 0 <= self.file_index < 8 and 0 <= self.rank_index < 8
     
-    @property
     def __add__(self, other):
         """Defines the addition of two Coord objects"""
         if isinstance(other, Coord):
@@ -1,4 +1,4 @@
-from piece import Piece
+from Board.piece import Piece
 
 class Move:
     # Flags
@@ -9,6 +9,10 @@ class PieceList:
     def count(self):
         return self.num_pieces
     
+    def clear(self):
+        """Remove all pieces (the lists are reused rather than reallocated)"""
+        self.num_pieces = 0
+
     def add_piece_at_square(self, square):
         """Add a piece at the given square"""
         self.occupied_squares[self.num_pieces] = square
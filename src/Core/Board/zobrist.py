@@ -1,21 +1,23 @@
 import random
 import struct
-from piece import Piece
+from Board.piece import Piece
+from Helpers.lazyTable import LazyTable
 
 class Zobrist:
-    # Random numbers are generated for each aspect of the game state, and are used for calculating the hash:
+    # Random numbers are generated for each aspect of the game state, and are used for calculating the hash
+    # (generated by initialize on first use):
 
     # Piece type, color, square index
-    pieces_array = [[0 for _ in range(64)] for _ in range(Piece.MaxPieceIndex + 1)]
+    pieces_array = LazyTable([[0 for _ in range(64)] for _ in range(Piece.MaxPieceIndex + 1)])
 
     # Each player has 4 possible castling right states: none, queenside, kingside, both
     # So, taking both sides into account, there are 16 possible states
-    castling_rights = [0] * 16
+    castling_rights = LazyTable([0] * 16)
 
     # En passant file (0 = no ep)
     # Rank does not need to be specified since side to move is included in key
-    en_passant_file = [0] * 9
-    side_to_move = 0
+    en_passant_file = LazyTable([0] * 9)
+    side_to_move = LazyTable(0)
 
     @staticmethod
     def initialize():
@@ -33,7 +35,7 @@ class Zobrist:
             Zobrist.castling_rights[i] = Zobrist.random_unsigned_64_bit_number(rng)
 
         for i in range(1, len(Zobrist.en_passant_file)):
-            Zobrist.side_to_move = Zobrist.random_unsigned_64_bit_number(rng)
+            Zobrist.en_passant_file[i] = Zobrist.random_unsigned_64_bit_number(rng)
 
         Zobrist.side_to_move = Zobrist.random_unsigned_64_bit_number(rng)
 
@@ -47,7 +49,7 @@ class Zobrist:
         zobrist_key = 0
 
         for square_index in range(64):
-            piece = board.squares[square_index]
+            piece = board.square[square_index]
 
             if Piece.piece_type(piece) != Piece.NoneType:
                 zobrist_key ^= Zobrist.pieces_array[piece][square_index]
@@ -57,7 +59,7 @@ class Zobrist:
         if board.move_color == Piece.Black:
             zobrist_key ^= Zobrist.side_to_move
 
-        zobrist_key = Zobrist.castling_rights[board.current_game_state.castling_rights]
+        zobrist_key ^= Zobrist.castling_rights[board.current_game_state.castling_rights]
 
         return zobrist_key
     
@@ -67,4 +69,4 @@ class Zobrist:
         Generate a random 64-bit unsigned integer using the provided random number generator
         """
         buffer = bytearray(rng.getrandbits(8) for _ in range(8))
-        return struct.unpack('Q', buffer)[0]
\ No newline at end of file
+        return struct.unpack('Q', buffer)[0]
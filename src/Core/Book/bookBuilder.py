@@ -0,0 +1,354 @@
+import argparse
+import heapq
+import os
+import queue
+import struct
+import tempfile
+import traceback
+import numpy as np
+from multiprocessing import Process, Queue
+from Board.board import Board
+from Board.move import Move
+from Helpers.fenUtility import FenUtility
+from Helpers.fileUtility import FileUtility
+from Helpers.moveUtility import MoveUtility
+from Helpers.pgnReader import PGNReader
+from Book.openingBook import OpeningBook
+
+class BookBuilder:
+    """
+    Builds an opening book from PGN collections.
+    Games are streamed from the input files in batches to a set of worker processes. Each worker replays its games
+    up to a ply limit and counts (zobrist key, move) pairs; whenever its counts grow too large they are written to disk
+    as a sorted shard. The shards of all workers are then merged with an external (k-way) merge, so memory use is
+    bounded by the shard size rather than by the size of the book.
+    The output is either a text book (same format as resources/Book.txt) or the binary format read by OpeningBook
+    """
+    ShardRecordType = np.dtype([('key', '<u8'), ('move', '<u2'), ('count', '<u4')])
+    GamesPerBatch = 500
+    MaxShardEntries = 2_000_000
+    ReadBlockSize = 1 << 16
+    # While waiting on the queues, the workers are checked for failures this often (seconds)
+    PollInterval = 1.0
+
+    def __init__(self, max_ply=20, num_workers=None, min_count=1, work_directory=None):
+        self.max_ply = max_ply
+        self.num_workers = num_workers or os.cpu_count()
+        self.min_count = min_count
+        self.work_directory = work_directory
+
+    @staticmethod
+    def read_games(paths):
+        """
+        Yield (start fen, list of SAN moves) for every game in the given PGN files.
+        Variations are skipped; only the mainline is kept
+        """
+        for path in paths:
+            with FileUtility.open_text(path) as file:
+                for game in PGNReader.read_games(file):
+                    yield game.start_fen, game.moves
+
+    def build(self, pgn_paths, output_path, binary=False):
+        """
+        Build a book from the given PGN files and write it to output_path
+        """
+        with tempfile.TemporaryDirectory(dir=self.work_directory) as shard_directory:
+            shard_paths = self.count_moves(pgn_paths, shard_directory, include_fens=not binary)
+            records = BookBuilder.merge_shards([path for path, _ in shard_paths])
+            records = (record for record in records if record[2] >= self.min_count)
+
+            if binary:
+                return BookBuilder.write_binary(records, output_path, shard_directory)
+            fens = BookBuilder.merge_fen_shards([fen_path for _, fen_path in shard_paths])
+            return BookBuilder.write_text(records, fens, output_path)
+
+    def count_moves(self, pgn_paths, shard_directory, include_fens):
+        """
+        Stream games to the workers and wait for them to finish.
+        Returns a list of (move shard path, fen shard path) pairs.
+        Raises RuntimeError if a worker fails (or dies), after stopping the others
+        """
+        game_queue = Queue(maxsize=self.num_workers * 4)
+        result_queue = Queue()
+        workers = [Process(target=BookBuilder.worker, args=(i, game_queue, result_queue, shard_directory, self.max_ply, include_fens))
+                   for i in range(self.num_workers)]
+        for worker in workers:
+            worker.start()
+
+        # Worker index -> shard paths
+        results = {}
+        try:
+            batch = []
+            for game in BookBuilder.read_games(pgn_paths):
+                batch.append(game)
+                if len(batch) == BookBuilder.GamesPerBatch:
+                    BookBuilder.put_batch(game_queue, batch, workers, result_queue, results)
+                    batch = []
+            if batch:
+                BookBuilder.put_batch(game_queue, batch, workers, result_queue, results)
+
+            for _ in workers:
+                BookBuilder.put_batch(game_queue, None, workers, result_queue, results)
+
+            while len(results) < len(workers):
+                BookBuilder.collect_results(workers, result_queue, results, BookBuilder.PollInterval)
+        finally:
+            # Batches left on the queue after a failure must not keep this process from exiting
+            game_queue.cancel_join_thread()
+            for worker in workers:
+                if worker.is_alive() and len(results) < len(workers):
+                    worker.terminate()
+                worker.join()
+
+        return [paths for worker_index in sorted(results) for paths in results[worker_index]]
+
+    @staticmethod
+    def put_batch(game_queue, batch, workers, result_queue, results):
+        """
+        Put a batch (or the sentinel) on the game queue, checking on the workers while the queue is full
+        """
+        while True:
+            try:
+                game_queue.put(batch, timeout=BookBuilder.PollInterval)
+                return
+            except queue.Full:
+                BookBuilder.collect_results(workers, result_queue, results)
+
+    @staticmethod
+    def collect_results(workers, result_queue, results, timeout=None):
+        """
+        Move the results posted by the workers into results, waiting up to timeout seconds for one if given.
+        Raises RuntimeError if a worker reported an error, or exited without posting its result
+        """
+        # Workers flush their result to the queue before exiting, so a result is there for anything seen as exited here
+        exited = [worker_index for worker_index, worker in enumerate(workers) if not worker.is_alive()]
+        try:
+            while True:
+                worker_index, shard_paths, error = result_queue.get(timeout=timeout) if timeout else result_queue.get_nowait()
+                if error is not None:
+                    raise RuntimeError(f"Book worker {worker_index} failed:\n{error}")
+                results[worker_index] = shard_paths
+                timeout = None
+        except queue.Empty:
+            pass
+
+        for worker_index in exited:
+            if worker_index not in results:
+                raise RuntimeError(f"Book worker {worker_index} exited (code {workers[worker_index].exitcode}) without a result")
+
+    @staticmethod
+    def worker(worker_index, game_queue, result_queue, shard_directory, max_ply, include_fens):
+        """
+        Replay batches of games until the sentinel (None) is received, counting (zobrist key, move) pairs.
+        Puts (worker index, list of shards written, None) on the result queue, or (worker index, None, traceback)
+        if anything fails, so that the main process never waits for a worker which is gone
+        """
+        try:
+            shard_paths = BookBuilder.count_games(worker_index, game_queue, shard_directory, max_ply, include_fens)
+        except Exception:
+            result_queue.put((worker_index, None, traceback.format_exc()))
+            return
+        result_queue.put((worker_index, shard_paths, None))
+
+    @staticmethod
+    def count_games(worker_index, game_queue, shard_directory, max_ply, include_fens):
+        """
+        Body of a worker. Returns the list of (move shard path, fen shard path) pairs it wrote
+        """
+        board = Board()
+        counts = {}
+        fens = {}
+        shard_paths = []
+
+        def flush():
+            shard_index = len(shard_paths)
+            move_path = os.path.join(shard_directory, f"moves_{worker_index}_{shard_index}.bin")
+            fen_path = os.path.join(shard_directory, f"fens_{worker_index}_{shard_index}.txt")
+            BookBuilder.write_shard(counts, fens, move_path, fen_path)
+            shard_paths.append((move_path, fen_path))
+            counts.clear()
+            fens.clear()
+
+        while True:
+            batch = game_queue.get()
+            if batch is None:
+                break
+
+            for fen, san_moves in batch:
+                board.load_fen_fast(fen)
+                for san in san_moves[:max_ply]:
+                    move = MoveUtility.get_move_from_san(board, san)
+                    if move.is_null:
+                        break
+
+                    key = (board.zobrist_key, move.value)
+                    counts[key] = counts.get(key, 0) + 1
+                    if include_fens and board.zobrist_key not in fens:
+                        fens[board.zobrist_key] = ' '.join(FenUtility.current_fen(board).split()[:4])
+                    board.make_move(move)
+
+            if len(counts) >= BookBuilder.MaxShardEntries:
+                flush()
+
+        if counts:
+            flush()
+        return shard_paths
+
+    @staticmethod
+    def write_shard(counts, fens, move_path, fen_path):
+        """
+        Write counts sorted by (key, move), and fens sorted by key
+        """
+        records = np.empty(len(counts), dtype=BookBuilder.ShardRecordType)
+        for i, ((key, move_value), count) in enumerate(counts.items()):
+            records[i] = (key, move_value, count)
+        records.sort(order=['key', 'move'])
+        records.tofile(move_path)
+
+        with open(fen_path, 'w') as file:
+            for key in sorted(fens):
+                file.write(f"{key}\t{fens[key]}\n")
+
+    @staticmethod
+    def read_shard(path):
+        """
+        Yield (key, move, count) records of a shard, reading it in blocks
+        """
+        record_size = BookBuilder.ShardRecordType.itemsize
+        num_records = os.path.getsize(path) // record_size
+
+        with open(path, 'rb') as file:
+            for start in range(0, num_records, BookBuilder.ReadBlockSize):
+                block = np.fromfile(file, dtype=BookBuilder.ShardRecordType, count=min(BookBuilder.ReadBlockSize, num_records - start))
+                for key, move_value, count in block.tolist():
+                    yield key, move_value, count
+
+    @staticmethod
+    def merge_shards(paths):
+        """
+        K-way merge of sorted shards, summing the counts of equal (key, move) pairs
+        """
+        current = None
+        for key, move_value, count in heapq.merge(*[BookBuilder.read_shard(path) for path in paths]):
+            if current is not None and current[0] == key and current[1] == move_value:
+                current[2] += count
+                continue
+            if current is not None:
+                yield tuple(current)
+            current = [key, move_value, count]
+
+        if current is not None:
+            yield tuple(current)
+
+    @staticmethod
+    def merge_fen_shards(paths):
+        """
+        K-way merge of sorted fen shards, yielding each (key, fen) once
+        """
+        def read(path):
+            with open(path, 'r') as file:
+                for line in file:
+                    key, fen = line.rstrip('\n').split('\t')
+                    yield int(key), fen
+
+        previous_key = None
+        for key, fen in heapq.merge(*[read(path) for path in paths]):
+            if key != previous_key:
+                yield key, fen
+                previous_key = key
+
+    @staticmethod
+    def group_by_key(records):
+        """
+        Group sorted (key, move, count) records into (key, [(move, count), ...]) with moves sorted by count (most played first)
+        """
+        key = None
+        moves = []
+        for record_key, move_value, count in records:
+            if record_key != key:
+                if moves:
+                    yield key, sorted(moves, key=lambda item: item[1], reverse=True)
+                key = record_key
+                moves = []
+            moves.append((move_value, count))
+        if moves:
+            yield key, sorted(moves, key=lambda item: item[1], reverse=True)
+
+    @staticmethod
+    def write_text(records, fens, output_path):
+        """
+        Write the book in the text format of resources/Book.txt. Returns the number of positions written
+        """
+        num_positions = 0
+        fens = iter(fens)
+        fen_key, fen = next(fens, (None, None))
+
+        with open(output_path, 'w') as file:
+            for key, moves in BookBuilder.group_by_key(records):
+                # Both streams are sorted by key, so the fen of this position is found by advancing the fen stream
+                while fen_key is not None and fen_key < key:
+                    fen_key, fen = next(fens, (None, None))
+                if fen_key != key:
+                    continue
+
+                file.write(f"pos {fen}\n")
+                for move_value, count in moves:
+                    file.write(f"{MoveUtility.get_move_name_uci(Move(move_value=move_value))} {count}\n")
+                num_positions += 1
+
+        return num_positions
+
+    @staticmethod
+    def write_binary(records, output_path, temp_directory):
+        """
+        Write the book in the binary format read by OpeningBook, streaming the keys, offsets and entries
+        to temporary files first since their sizes are not known in advance. Returns the number of positions written
+        """
+        keys_path = os.path.join(temp_directory, "keys.bin")
+        offsets_path = os.path.join(temp_directory, "offsets.bin")
+        entries_path = os.path.join(temp_directory, "entries.bin")
+        entry_struct = struct.Struct("<HI")
+        num_positions = 0
+        num_entries = 0
+
+        with open(keys_path, 'wb') as keys_file, open(offsets_path, 'wb') as offsets_file, open(entries_path, 'wb') as entries_file:
+            offsets_file.write(struct.pack("<I", 0))
+            for key, moves in BookBuilder.group_by_key(records):
+                keys_file.write(struct.pack("<Q", key))
+                for move_value, count in moves:
+                    entries_file.write(entry_struct.pack(move_value, min(count, 0xFFFFFFFF)))
+                num_entries += len(moves)
+                num_positions += 1
+                offsets_file.write(struct.pack("<I", num_entries))
+
+        with open(output_path, 'wb') as output:
+            output.write(struct.pack(OpeningBook.HeaderFormat, OpeningBook.Magic, OpeningBook.Version, num_positions, num_entries))
+            for path in (keys_path, offsets_path, entries_path):
+                with open(path, 'rb') as part:
+                    while True:
+                        block = part.read(1 << 20)
+                        if not block:
+                            break
+                        output.write(block)
+
+        return num_positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book from PGN files")
+    parser.add_argument("output", help="output book path")
+    parser.add_argument("pgn_files", nargs='+', help="PGN files (optionally .gz or .bz2 compressed)")
+    parser.add_argument("--max-ply", type=int, default=20)
+    parser.add_argument("--min-count", type=int, default=1, help="drop moves played fewer times than this")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--binary", action="store_true", help="write the binary book format instead of text")
+    parser.add_argument("--temp-dir", default=None, help="directory for the intermediate shards")
+    args = parser.parse_args()
+
+    builder = BookBuilder(args.max_ply, args.workers, args.min_count, args.temp_dir)
+    num_positions = builder.build(args.pgn_files, args.output, args.binary)
+    print(f"Wrote {num_positions} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
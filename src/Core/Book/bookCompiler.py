@@ -0,0 +1,96 @@
+import argparse
+import struct
+import numpy as np
+from Board.board import Board
+from Helpers.moveUtility import MoveUtility
+from Book.openingBook import OpeningBook
+
+class BookCompiler:
+    """
+    Converts a text book (lines of "pos <fen>" followed by "<uci move> <count>" lines, as in resources/Book.txt)
+    into the binary format read by OpeningBook.
+    Positions are keyed by OpeningBook.position_key, so different FEN strings of the same position are merged
+    """
+
+    @staticmethod
+    def read_text_book(path):
+        """
+        Yield (fen, [(uci move name, count), ...]) for every position in a text book
+        """
+        fen = None
+        moves = []
+        with open(path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("pos"):
+                    if fen is not None:
+                        yield fen, moves
+                    fen = line[3:].strip()
+                    moves = []
+                else:
+                    move_name, count = line.split()
+                    moves.append((move_name, int(count)))
+        if fen is not None:
+            yield fen, moves
+
+    @staticmethod
+    def compile_positions(positions):
+        """
+        Compile (fen, [(uci move name, count), ...]) pairs into a dictionary of position key (see OpeningBook.position_key)
+        -> {move value: count}
+        """
+        board = Board()
+        book = {}
+
+        for fen, moves in positions:
+            board.load_fen_fast(fen)
+            position_moves = book.setdefault(OpeningBook.position_key(board), {})
+            for move_name, count in moves:
+                move_value = MoveUtility.get_move_from_uci_name(move_name, board).value
+                position_moves[move_value] = position_moves.get(move_value, 0) + count
+
+        return book
+
+    @staticmethod
+    def write(book, path):
+        """
+        Write a dictionary of position key -> {move value: count} in the binary book format.
+        Moves of each position are stored most played first
+        """
+        keys = sorted(book)
+        offsets = np.zeros(len(keys) + 1, dtype='<u4')
+        entries = []
+
+        for i, key in enumerate(keys):
+            position_moves = sorted(book[key].items(), key=lambda item: item[1], reverse=True)
+            entries.extend(position_moves)
+            offsets[i + 1] = len(entries)
+
+        entry_array = np.array(entries, dtype=OpeningBook.EntryType)
+        with open(path, 'wb') as file:
+            file.write(struct.pack(OpeningBook.HeaderFormat, OpeningBook.Magic, OpeningBook.Version, len(keys), len(entries)))
+            file.write(np.array(keys, dtype='<u8').tobytes())
+            file.write(offsets.tobytes())
+            file.write(entry_array.tobytes())
+
+    @staticmethod
+    def compile(text_path, binary_path):
+        book = BookCompiler.compile_positions(BookCompiler.read_text_book(text_path))
+        BookCompiler.write(book, binary_path)
+        return len(book)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a text opening book into the binary book format")
+    parser.add_argument("text_book", help="text book, e.g. resources/Book.txt")
+    parser.add_argument("binary_book", help="output path, e.g. resources/Book.bin")
+    args = parser.parse_args()
+
+    num_positions = BookCompiler.compile(args.text_book, args.binary_book)
+    print(f"Compiled {num_positions} positions to {args.binary_book}")
+
+
+if __name__ == "__main__":
+    main()
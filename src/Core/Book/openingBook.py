@@ -0,0 +1,87 @@
+import random
+import struct
+import numpy as np
+from Board.move import Move
+from Board.zobrist import Zobrist
+from Helpers.fenUtility import FenUtility
+
+class OpeningBook:
+    """
+    Reader for the compiled binary book (see BookCompiler).
+    The file is memory-mapped and positions are found by binary search on their key (see position_key),
+    so there is no parsing at startup and transpositions are matched automatically.
+
+    File layout (little endian):
+    header: magic, version, number of positions, number of entries
+    keys: uint64 per position, sorted
+    offsets: uint32 per position + 1, index of the first entry of each position
+    entries: (uint16 move value, uint32 count) per book move
+    """
+    Magic = b"CABK"
+    Version = 1
+    HeaderFormat = "<4sIII"
+    HeaderSize = struct.calcsize(HeaderFormat)
+    EntryType = np.dtype([('move', '<u2'), ('count', '<u4')])
+
+    def __init__(self, path):
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, version, num_positions, num_entries = struct.unpack_from(OpeningBook.HeaderFormat, self.data, 0)
+        if magic != OpeningBook.Magic or version != OpeningBook.Version:
+            raise ValueError(f"{path} is not a compiled opening book (version {OpeningBook.Version})")
+
+        offset = OpeningBook.HeaderSize
+        self.keys = np.frombuffer(self.data, dtype='<u8', count=num_positions, offset=offset)
+        offset += num_positions * 8
+        self.offsets = np.frombuffer(self.data, dtype='<u4', count=num_positions + 1, offset=offset)
+        offset += (num_positions + 1) * 4
+        self.entries = np.frombuffer(self.data, dtype=OpeningBook.EntryType, count=num_entries, offset=offset)
+        self.num_positions = num_positions
+        self.rng = random.Random()
+
+    @staticmethod
+    def position_key(board):
+        """
+        Key of the current position in the book. Board.make_move hashes the en passant file after every double pawn push,
+        while book FENs only give the en passant square when the capture is possible, so the file is left out of the key
+        unless an en passant capture is legal
+        """
+        key = board.zobrist_key
+        ep_file = board.current_game_state.en_passant_file
+        if ep_file and not FenUtility.en_passant_can_be_captured(ep_file - 1, 5 if board.is_white_to_move else 2, board):
+            key ^= Zobrist.en_passant_file[ep_file]
+        return key
+
+    def has_book_moves(self, zobrist_key):
+        return self._find(zobrist_key) >= 0
+
+    def get_book_moves(self, zobrist_key):
+        """
+        List of (move, play count) pairs for the position with the given key (see position_key; empty if not in book)
+        """
+        index = self._find(zobrist_key)
+        if index < 0:
+            return []
+
+        entries = self.entries[self.offsets[index]:self.offsets[index + 1]]
+        return [(Move(move_value=int(entry['move'])), int(entry['count'])) for entry in entries]
+
+    def try_get_book_move(self, board, weight_pow=0.5):
+        """
+        Pick a book move for the current position at random, weighted by play count raised to weight_pow
+        (lower values make rarely played moves more likely). Returns None if the position is not in the book
+        """
+        book_moves = self.get_book_moves(OpeningBook.position_key(board))
+        if not book_moves:
+            return None
+
+        weights = [count ** weight_pow for _, count in book_moves]
+        return self.rng.choices([move for move, _ in book_moves], weights=weights)[0]
+
+    def _find(self, zobrist_key):
+        """
+        Index of the position with the given key, or -1
+        """
+        index = int(np.searchsorted(self.keys, np.uint64(zobrist_key)))
+        if index < self.num_positions and int(self.keys[index]) == zobrist_key:
+            return index
+        return -1
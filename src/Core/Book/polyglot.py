@@ -0,0 +1,171 @@
+import argparse
+import random
+import numpy as np
+from Board.piece import Piece
+from Board.board import Board
+from Helpers.boardHelpers import BoardHelper
+from Helpers.moveUtility import MoveUtility
+from Book.bookCompiler import BookCompiler
+from Book.polyglotRandom import PolyglotRandom
+
+class PolyglotZobrist:
+    """
+    Zobrist keys as defined by the Polyglot book format.
+    These are unrelated to the engine's own (seeded) Zobrist keys, which can't be used to look up Polyglot books
+    """
+    CastlingOffset = 768
+    EnPassantOffset = 772
+    TurnOffset = 780
+
+    # Polyglot castling order: white kingside, white queenside, black kingside, black queenside (same bits as GameState)
+    CastlingMasks = [1, 2, 4, 8]
+
+    @staticmethod
+    def piece_kind(piece):
+        """
+        Polyglot piece index: black pawn = 0, white pawn = 1, black knight = 2, ..., white king = 11
+        """
+        return (Piece.piece_type(piece) - 1) * 2 + (1 if Piece.is_white(piece) else 0)
+
+    @staticmethod
+    def calculate_key(board):
+        random64 = PolyglotRandom.Random64
+        key = 0
+
+        for square_index in range(64):
+            piece = board.square[square_index]
+            if piece != Piece.NoneType:
+                key ^= random64[64 * PolyglotZobrist.piece_kind(piece) + square_index]
+
+        castling_rights = board.current_game_state.castling_rights
+        for i, mask in enumerate(PolyglotZobrist.CastlingMasks):
+            if castling_rights & mask:
+                key ^= random64[PolyglotZobrist.CastlingOffset + i]
+
+        # The en passant file is only hashed if a pawn of the side to move is able to capture
+        ep_file = board.current_game_state.en_passant_file - 1
+        if ep_file >= 0:
+            pawn_rank = 4 if board.is_white_to_move else 3
+            friendly_pawn = Piece.make_piece(Piece.Pawn, board.move_color)
+            for file in (ep_file - 1, ep_file + 1):
+                if 0 <= file < 8 and board.square[pawn_rank * 8 + file] == friendly_pawn:
+                    key ^= random64[PolyglotZobrist.EnPassantOffset + ep_file]
+                    break
+
+        if board.is_white_to_move:
+            key ^= random64[PolyglotZobrist.TurnOffset]
+
+        return key
+
+
+class PolyglotMove:
+    """
+    Conversion between Polyglot move encoding and UCI move names.
+    Polyglot moves are (to file, to rank, from file, from rank, promotion) in 3 bit fields, and castling is
+    encoded as the king capturing its own rook (e.g. e1h1 rather than e1g1)
+    """
+    PromotionSymbols = ['', 'n', 'b', 'r', 'q']
+    CastlingToUci = {"e1h1": "e1g1", "e1a1": "e1c1", "e8h8": "e8g8", "e8a8": "e8c8"}
+    UciToCastling = {uci: polyglot for polyglot, uci in CastlingToUci.items()}
+
+    @staticmethod
+    def to_uci_name(polyglot_move, board):
+        to_square = polyglot_move & 0x3F
+        from_square = (polyglot_move >> 6) & 0x3F
+        promotion = (polyglot_move >> 12) & 0x7
+
+        name = BoardHelper.square_name_from_index(from_square) + BoardHelper.square_name_from_index(to_square)
+        if Piece.piece_type(board.square[from_square]) == Piece.King:
+            name = PolyglotMove.CastlingToUci.get(name, name)
+        return name + PolyglotMove.PromotionSymbols[promotion]
+
+    @staticmethod
+    def from_uci_name(move_name, board):
+        from_square = BoardHelper.square_index_from_name(move_name[:2])
+        if Piece.piece_type(board.square[from_square]) == Piece.King:
+            move_name = PolyglotMove.UciToCastling.get(move_name[:4], move_name[:4])
+
+        from_square = BoardHelper.square_index_from_name(move_name[:2])
+        to_square = BoardHelper.square_index_from_name(move_name[2:4])
+        promotion = PolyglotMove.PromotionSymbols.index(move_name[4]) if len(move_name) > 4 else 0
+        return to_square | (from_square << 6) | (promotion << 12)
+
+
+class PolyglotBook:
+    """
+    Reader for Polyglot .bin books. The file is memory-mapped and the (sorted, big endian) entries are binary searched
+    """
+    EntryType = np.dtype([('key', '>u8'), ('move', '>u2'), ('weight', '>u2'), ('learn', '>u4')])
+
+    def __init__(self, path):
+        self.entries = np.memmap(path, dtype=PolyglotBook.EntryType, mode='r')
+        self.keys = self.entries['key']
+        self.rng = random.Random()
+
+    def get_book_moves(self, board):
+        """
+        List of (move, weight) pairs for the current position (empty if not in book)
+        """
+        key = PolyglotZobrist.calculate_key(board)
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+
+        book_moves = []
+        while index < len(self.entries) and int(self.keys[index]) == key:
+            entry = self.entries[index]
+            move_name = PolyglotMove.to_uci_name(int(entry['move']), board)
+            book_moves.append((MoveUtility.get_move_from_uci_name(move_name, board), int(entry['weight'])))
+            index += 1
+
+        return book_moves
+
+    def try_get_book_move(self, board, weight_pow=1.0):
+        """
+        Pick a book move at random, weighted by the entry weight raised to weight_pow. Returns None if not in book
+        """
+        book_moves = [(move, weight) for move, weight in self.get_book_moves(board) if weight > 0]
+        if not book_moves:
+            return None
+
+        weights = [weight ** weight_pow for _, weight in book_moves]
+        return self.rng.choices([move for move, _ in book_moves], weights=weights)[0]
+
+
+class PolyglotWriter:
+    """
+    Exports a text book (resources/Book.txt format) as a Polyglot .bin book.
+    Play counts are scaled per position to fit in the 16 bit weight field
+    """
+
+    @staticmethod
+    def write(text_book_path, output_path):
+        board = Board()
+        entries = []
+
+        for fen, moves in BookCompiler.read_text_book(text_book_path):
+            board.load_fen_fast(fen)
+            key = PolyglotZobrist.calculate_key(board)
+            max_count = max((count for _, count in moves), default=0)
+            scale = 0xFFFF / max_count if max_count > 0xFFFF else 1
+
+            for move_name, count in moves:
+                weight = max(1, int(count * scale))
+                entries.append((key, PolyglotMove.from_uci_name(move_name, board), weight, 0))
+
+        # Sorted by key, with the highest weight first for each position
+        entries.sort(key=lambda entry: (entry[0], -entry[2]))
+        np.array(entries, dtype=PolyglotBook.EntryType).tofile(output_path)
+        return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a text opening book as a Polyglot .bin book")
+    parser.add_argument("text_book", help="text book, e.g. resources/Book.txt")
+    parser.add_argument("output", help="output .bin path")
+    args = parser.parse_args()
+
+    num_entries = PolyglotWriter.write(args.text_book, args.output)
+    print(f"Wrote {num_entries} entries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,722 @@
+import argparse
+import os
+import numpy as np
+from multiprocessing import Pool
+from Board.piece import Piece
+from Board.board import Board
+from Helpers.boardHelpers import BoardHelper
+from Helpers.lazyTable import LazyTable
+from Move_Generation.precomputedMoveData import PrecomputedMoveData
+
+class Bitbase:
+    """
+    Win/draw/loss tables for endings with few pieces.
+    An ending is named by its material signature, for example "KRKP" (white king and rook against black king and pawn).
+    Positions are indexed by side to move and the square of every piece, in signature order:
+    index = stm * 64^n + sq[0] * 64^(n-1) + ... + sq[n-1]
+    Each table is stored as two packed bit arrays (win bits, then loss bits) from the point of view of the side to move.
+    """
+    Unknown = 0
+    Win = 1
+    Loss = 2
+    Draw = 3
+
+    FileExtension = ".bb"
+
+    # Order in which pieces are listed in a material signature
+    SignatureOrder = "QRBNP"
+
+    # Signatures which are always drawn (no table is needed), with either colour having the minor piece
+    DrawnSignatures = {"KK", "KNK", "KBK", "KKN", "KKB"}
+
+    PieceStrength = {'Q': 9, 'R': 5, 'B': 3, 'N': 3, 'P': 1}
+
+    DefaultEndings = ["KPK", "KRK", "KQK", "KBNK", "KRKP", "KQKR", "KQKP", "KRKN", "KRKB", "KPKP"]
+
+    @staticmethod
+    def canonical_signature(signature):
+        """
+        Sort the pieces of each side into signature order, e.g. "KNBK" -> "KBNK"
+        """
+        second_king = signature.index('K', 1)
+        white = sorted(signature[1:second_king], key=Bitbase.SignatureOrder.index)
+        black = sorted(signature[second_king + 1:], key=Bitbase.SignatureOrder.index)
+        return 'K' + ''.join(white) + 'K' + ''.join(black)
+
+    @staticmethod
+    def normalized_signature(signature):
+        """
+        Canonical signature with the stronger side as white, e.g. "KKP" -> "KPK"
+        """
+        signature = Bitbase.canonical_signature(signature)
+        second_king = signature.index('K', 1)
+        white_strength = sum(Bitbase.PieceStrength[c] for c in signature[1:second_king])
+        black_strength = sum(Bitbase.PieceStrength[c] for c in signature[second_king + 1:])
+        return Bitbase.mirror_signature(signature) if black_strength > white_strength else signature
+
+    @staticmethod
+    def mirror_signature(signature):
+        """
+        Signature of the same ending with colours swapped, e.g. "KRKP" -> "KPKR"
+        """
+        second_king = signature.index('K', 1)
+        return 'K' + signature[second_king + 1:] + 'K' + signature[1:second_king]
+
+    @staticmethod
+    def signature_pieces(signature):
+        """
+        List of pieces in the order used for indexing: white king, black king, then the other white and black pieces
+        """
+        second_king = signature.index('K', 1)
+        white = [Piece.make_piece(Piece.get_piece_type_from_symbol(c), Piece.White) for c in signature[1:second_king]]
+        black = [Piece.make_piece(Piece.get_piece_type_from_symbol(c), Piece.Black) for c in signature[second_king + 1:]]
+        return [Piece.WhiteKing, Piece.BlackKing] + white + black
+
+    @staticmethod
+    def board_signature(board):
+        """
+        Material signature of the position on the board
+        """
+        signature = ""
+        for color_index in (Board.WhiteIndex, Board.BlackIndex):
+            signature += 'K'
+            signature += 'Q' * board.queens[color_index].count
+            signature += 'R' * board.rooks[color_index].count
+            signature += 'B' * board.bishops[color_index].count
+            signature += 'N' * board.knights[color_index].count
+            signature += 'P' * board.pawns[color_index].count
+        return signature
+
+    @staticmethod
+    def table_size(signature):
+        return 2 * 64 ** len(signature)
+
+    @staticmethod
+    def position_index(squares, white_to_move):
+        index = 0 if white_to_move else 1
+        for square in squares:
+            index = index * 64 + square
+        return index
+
+    @staticmethod
+    def dependencies(signature):
+        """
+        Signatures reachable from the given ending by a single capture or promotion
+        """
+        second_king = signature.index('K', 1)
+        result = set()
+
+        for i, c in enumerate(signature):
+            if i == 0 or i == second_king:
+                continue
+            # Capture of this piece
+            result.add(Bitbase.canonical_signature(signature[:i] + signature[i + 1:]))
+            # Promotion of this pawn
+            if c == 'P':
+                for promotion in "QRBN":
+                    result.add(Bitbase.canonical_signature(signature[:i] + promotion + signature[i + 1:]))
+
+        return result
+
+    @staticmethod
+    def all_required_signatures(signatures):
+        """
+        Closure of the given signatures under their dependencies, excluding trivially drawn endings.
+        Endings which only differ by colour are generated once
+        """
+        required = set()
+        pending = [Bitbase.normalized_signature(s) for s in signatures]
+
+        while pending:
+            signature = pending.pop()
+            if signature in required or Bitbase.mirror_signature(signature) in required:
+                continue
+            if signature in Bitbase.DrawnSignatures:
+                continue
+            required.add(signature)
+            pending.extend(Bitbase.normalized_signature(s) for s in Bitbase.dependencies(signature))
+
+        return required
+
+
+class BitbaseProber:
+    """
+    Answers win/draw/loss queries for positions covered by the bitbase files in a directory.
+    Files are memory-mapped, so only the pages that are actually probed are read from disk.
+    """
+    def __init__(self, directory=None):
+        self.tables = {}
+        self.max_pieces = 0
+        self.max_non_pawn_pieces = 0
+
+        if directory is not None and os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                if file_name.endswith(Bitbase.FileExtension):
+                    self.load_table(os.path.join(directory, file_name))
+
+    @staticmethod
+    def load(directory):
+        """
+        Prober for the tables in the directory, or None if there are none (so that searches skip probing altogether)
+        """
+        prober = BitbaseProber(directory)
+        return prober if prober.tables else None
+
+    def load_table(self, path):
+        """
+        Memory-map the table at the given path. The signature is taken from the file name
+        """
+        signature = os.path.basename(path)[:-len(Bitbase.FileExtension)]
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        num_bytes = Bitbase.table_size(signature) // 8
+        self.tables[signature] = (data[:num_bytes], data[num_bytes:])
+
+        num_pieces = len(signature)
+        num_non_pawn_pieces = num_pieces - 2 - signature.count('P')
+        self.max_pieces = max(self.max_pieces, num_pieces)
+        self.max_non_pawn_pieces = max(self.max_non_pawn_pieces, num_non_pawn_pieces)
+
+    def probe(self, board):
+        """
+        Get the result (Bitbase.Win/Loss/Draw) of the position for the side to move,
+        or Bitbase.Unknown if the position is not covered by a table
+        """
+        num_pieces = 2 + board.total_piece_count_without_pawns_and_kings + board.pawns[0].count + board.pawns[1].count
+        if num_pieces <= 3 and Bitbase.board_signature(board) in Bitbase.DrawnSignatures:
+            return Bitbase.Draw
+
+        if board.total_piece_count_without_pawns_and_kings > self.max_non_pawn_pieces or num_pieces > self.max_pieces:
+            return Bitbase.Unknown
+        if board.current_game_state.castling_rights != 0 or board.current_game_state.en_passant_file != 0:
+            return Bitbase.Unknown
+
+        signature = Bitbase.board_signature(board)
+
+        flip = signature not in self.tables
+        if flip:
+            signature = Bitbase.mirror_signature(signature)
+            if signature not in self.tables:
+                return Bitbase.Unknown
+
+        squares = []
+        num_used = {}
+        for piece in Bitbase.signature_pieces(signature):
+            # Looking up with colours swapped: white pieces of the table are black pieces on the board
+            board_piece = piece ^ Piece.colorMask if flip else piece
+            if Piece.piece_type(piece) == Piece.King:
+                color_index = Board.WhiteIndex if Piece.is_white(board_piece) else Board.BlackIndex
+                squares.append(board.king_square[color_index])
+            else:
+                # Pieces of the same type occupy consecutive slots, take the next unused one
+                slot = num_used.get(board_piece, 0)
+                squares.append(board.all_piece_lists[board_piece][slot])
+                num_used[board_piece] = slot + 1
+        return self.probe_squares(signature, squares, board.is_white_to_move, flip)
+
+    def probe_squares(self, signature, squares, white_to_move, flip=False):
+        """
+        Look up a position given as signature-ordered squares.
+        If flip is set the squares are given with colours swapped, and are mirrored vertically before the lookup
+        """
+        if flip:
+            squares = [square ^ 56 for square in squares]
+            white_to_move = not white_to_move
+
+        win_bits, loss_bits = self.tables[signature]
+        index = Bitbase.position_index(squares, white_to_move)
+        byte_index = index >> 3
+        bit = 1 << (index & 7)
+
+        if win_bits[byte_index] & bit:
+            return Bitbase.Win
+        if loss_bits[byte_index] & bit:
+            return Bitbase.Loss
+        return Bitbase.Draw
+
+    def probe_placements(self, signature, squares, white_to_move, flip=False):
+        """
+        probe_squares over many positions at once: squares are arrays (or single squares) which broadcast together,
+        and the results are returned as an array of the same shape
+        """
+        if flip:
+            squares = [square ^ 56 for square in squares]
+            white_to_move = not white_to_move
+
+        win_bits, loss_bits = self.tables[signature]
+        index = np.asarray(Bitbase.position_index(squares, white_to_move))
+        byte_index = index >> 3
+        bit = np.left_shift(1, index & 7)
+
+        result = np.full(index.shape, Bitbase.Draw, dtype=np.uint8)
+        result[(loss_bits[byte_index] & bit) != 0] = Bitbase.Loss
+        result[(win_bits[byte_index] & bit) != 0] = Bitbase.Win
+        return result
+
+
+class BitbaseGenerator:
+    """
+    Builds bitbase files by retrograde analysis over every placement of the pieces at once, with numpy.
+    A table is handled as an array of shape (2, 64, ..., 64) indexed by side to move and the square of each piece,
+    so the positions with a given piece on a given square are a slice, and moving that piece to a target square leads
+    to the matching slice for the other side. Moves are generated for each (piece, start square, target square)
+    from precomputed attack tables, testing blockers and king safety against the squares of the other pieces;
+    moves leaving the ending (captures and promotions) are resolved by probing the smaller tables, which are
+    always generated first. Results are then propagated over the moves with vectorized passes until nothing changes:
+    a position is won if any successor is lost for the opponent, and lost if every successor is won for the opponent.
+    Any position left unresolved is a draw.
+    Tables have no en passant square, so the position after a double pawn push which can be captured en passant
+    is resolved from the table position together with the results of the en passant captures.
+    Note that four piece endings have about 33 million positions each, so generation is intended to run offline.
+    """
+    # Piece -> [from square, to square] bool: squares attacked on an empty board
+    Attacks = LazyTable({})
+    # [from square, to square, square] bool: square lies strictly between the two aligned squares
+    Between = LazyTable(None)
+
+    # Kinds of move returned by piece_targets
+    NormalMove = 0
+    PawnPush = 1
+    PawnTwoUp = 2
+    PawnCapture = 3
+
+    PromotionPieceTypes = [Piece.Queen, Piece.Rook, Piece.Bishop, Piece.Knight]
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def initialize():
+        king = BitbaseGenerator.bitboard_table(PrecomputedMoveData.king_attack_bitboards)
+        knight = BitbaseGenerator.bitboard_table(PrecomputedMoveData.knight_attack_bitboards)
+        pawn = BitbaseGenerator.bitboard_table(PrecomputedMoveData.pawn_attack_bitboards)
+        rook = BitbaseGenerator.bitboard_table(PrecomputedMoveData.rook_moves)
+        bishop = BitbaseGenerator.bitboard_table(PrecomputedMoveData.bishop_moves)
+
+        for color_index, color in enumerate((Piece.White, Piece.Black)):
+            BitbaseGenerator.Attacks[Piece.make_piece(Piece.King, color)] = king
+            BitbaseGenerator.Attacks[Piece.make_piece(Piece.Knight, color)] = knight
+            BitbaseGenerator.Attacks[Piece.make_piece(Piece.Pawn, color)] = pawn[:, color_index]
+            BitbaseGenerator.Attacks[Piece.make_piece(Piece.Rook, color)] = rook
+            BitbaseGenerator.Attacks[Piece.make_piece(Piece.Bishop, color)] = bishop
+            BitbaseGenerator.Attacks[Piece.make_piece(Piece.Queen, color)] = rook | bishop
+
+        # On the line through both squares, and closer to each of them than they are to each other
+        distance = np.array(PrecomputedMoveData.king_distance)
+        BitbaseGenerator.Between = (BitbaseGenerator.bitboard_table(PrecomputedMoveData.align_mask) & (rook | bishop)[:, :, None]
+                                    & (distance[:, None, :] < distance[:, :, None]) & (distance[None, :, :] < distance[:, :, None]))
+
+    @staticmethod
+    def bitboard_table(bitboards):
+        """
+        Table of bitboards as a bool array with an extra axis for the squares
+        """
+        bitboards = np.array(bitboards, dtype=np.uint64)
+        return ((bitboards[..., None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+
+    def generate(self, signatures, num_workers=1):
+        """
+        Generate tables for the given endings and everything they depend on.
+        Endings are generated in order of piece count and then pawn count, so that all endings reachable by a
+        capture or promotion already exist; endings within the same group are generated in parallel
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        required = Bitbase.all_required_signatures(signatures)
+
+        groups = {}
+        for signature in required:
+            if not os.path.exists(self.table_path(signature)):
+                groups.setdefault((len(signature), signature.count('P')), []).append(signature)
+
+        for key in sorted(groups):
+            jobs = [(self.directory, signature) for signature in sorted(groups[key])]
+            if num_workers > 1 and len(jobs) > 1:
+                with Pool(min(num_workers, len(jobs))) as pool:
+                    pool.map(BitbaseGenerator.generate_table_job, jobs)
+            else:
+                for job in jobs:
+                    BitbaseGenerator.generate_table_job(job)
+
+    def table_path(self, signature):
+        return os.path.join(self.directory, signature + Bitbase.FileExtension)
+
+    @staticmethod
+    def generate_table_job(job):
+        directory, signature = job
+        BitbaseGenerator(directory).generate_table(signature)
+
+    def generate_table(self, signature):
+        """
+        Generate and save the table for a single ending (its dependencies must already be on disk)
+        """
+        prober = BitbaseProber(self.directory)
+        pieces = Bitbase.signature_pieces(signature)
+        num_pieces = len(pieces)
+        squares = BitbaseGenerator.square_grids(num_pieces)
+        shape = (2,) + (64,) * num_pieces
+
+        # Legal positions for each side to move: valid placements in which the side which just moved isn't in check
+        valid = BitbaseGenerator.valid_placements(pieces, squares)
+        in_check = np.stack([valid & BitbaseGenerator.is_attacked(pieces, squares, squares[side], side == 1) for side in (0, 1)])
+        legal = valid & ~in_check[::-1]
+
+        state = np.zeros(shape, dtype=np.uint8)
+        move_count = np.zeros(shape, dtype=np.int32)
+        exit_wins = np.zeros(shape, dtype=np.int32)
+        exit_losses = np.zeros(shape, dtype=np.int32)
+        # (side, piece, start, target, packed bits of the positions where the move stays in the ending, en passant results)
+        quiet_moves = []
+
+        for side in (0, 1):
+            for i, piece in enumerate(pieces):
+                if Piece.is_white(piece) != (side == 0):
+                    continue
+                for start in range(64):
+                    from_index = (side,) + BitbaseGenerator.square_slice(i, start)
+                    legal_from = legal[from_index]
+                    if not legal_from.any():
+                        continue
+
+                    for target, move_kind in BitbaseGenerator.piece_targets(piece, start):
+                        num_moves, wins, losses, quiet, en_passant = BitbaseGenerator.generate_moves(prober, pieces, squares, legal_from,
+                                                                                                    i, start, target, move_kind)
+                        move_count[from_index] += num_moves
+                        exit_wins[from_index] += wins
+                        exit_losses[from_index] += losses
+                        if quiet is not None and quiet.any():
+                            quiet_moves.append((side, i, start, target, np.packbits(quiet), en_passant))
+
+        no_moves = legal & (move_count == 0)
+        state[no_moves & in_check] = Bitbase.Loss
+        state[no_moves & ~in_check] = Bitbase.Draw
+        state[exit_wins > 0] = Bitbase.Win
+
+        BitbaseGenerator.propagate(state, move_count, exit_losses, quiet_moves)
+        self.save_table(signature, state.ravel())
+
+    @staticmethod
+    def generate_moves(prober, pieces, squares, legal_from, i, start, target, move_kind):
+        """
+        Moves of piece i from start to target, over the positions with the piece on start (legal where legal_from is set).
+        Returns the number of moves (promotions count once per piece), the number of moves leaving the ending which
+        win and which lose, the positions where the move stays in the ending (None for promotions) and, for a
+        double pawn push, the en passant results (see en_passant_results)
+        """
+        piece = pieces[i]
+        white = Piece.is_white(piece)
+        squares = squares[:i] + [start] + squares[i + 1:]
+        moved_squares = squares[:i] + [target] + squares[i + 1:]
+        others = [k for k in range(len(pieces)) if k != i]
+        captures = {k: squares[k] == target for k in others if Piece.is_white(pieces[k]) != white}
+
+        moves = legal_from.copy()
+        for k in others:
+            occupied = squares[k] == target
+            if move_kind in (BitbaseGenerator.PawnPush, BitbaseGenerator.PawnTwoUp) or Piece.is_white(pieces[k]) == white:
+                moves &= ~occupied
+            if move_kind == BitbaseGenerator.PawnTwoUp:
+                moves &= squares[k] != (start + target) // 2
+            if Piece.is_sliding_piece(piece):
+                moves &= ~BitbaseGenerator.Between[start, target, squares[k]]
+        if move_kind == BitbaseGenerator.PawnCapture:
+            # The capture grids broadcast along different axes, so they're combined pairwise
+            captures_any = np.zeros((), dtype=bool)
+            for captured in captures.values():
+                captures_any = captures_any | captured
+            moves &= captures_any
+
+        king_index = 0 if white else 1
+        moves &= ~BitbaseGenerator.is_attacked(pieces, moved_squares, moved_squares[king_index], not white, captured_square=target)
+
+        is_promotion = Piece.piece_type(piece) == Piece.Pawn and BoardHelper.rank_index(target) in (0, 7)
+        promotion_pieces = [Piece.make_piece_by_color(piece_type, white) for piece_type in BitbaseGenerator.PromotionPieceTypes] if is_promotion else [piece]
+        num_moves = moves * len(promotion_pieces)
+        wins = np.zeros(moves.shape, dtype=np.int32)
+        losses = np.zeros(moves.shape, dtype=np.int32)
+
+        # Captures of each piece, then (for promotions) the non-capturing moves
+        quiet = moves
+        exits = [(k, moves & captured) for k, captured in captures.items()]
+        for _, captured in exits:
+            quiet = quiet & ~captured
+        if is_promotion:
+            exits.append((None, quiet))
+            quiet = None
+
+        for captured_index, exit_moves in exits:
+            if not exit_moves.any():
+                continue
+            remaining = [k for k in range(len(pieces)) if k != captured_index]
+            for promotion_piece in promotion_pieces:
+                successor_pieces = [promotion_piece if k == i else pieces[k] for k in remaining]
+                result = BitbaseGenerator.probe_successors(prober, successor_pieces, [moved_squares[k] for k in remaining], not white)
+                wins += exit_moves & (result == Bitbase.Loss)
+                losses += exit_moves & (result == Bitbase.Win)
+
+        en_passant = None
+        if move_kind == BitbaseGenerator.PawnTwoUp and quiet.any():
+            en_passant = BitbaseGenerator.en_passant_results(prober, pieces, moved_squares, i, target, quiet)
+        return num_moves, wins, losses, quiet, en_passant
+
+    @staticmethod
+    def en_passant_results(prober, pieces, squares, i, target, moves):
+        """
+        For the positions after pawn i has pushed two squares to target (where moves is set): the number of legal
+        en passant captures in reply, and how many of them win and lose for the capturing side.
+        Returns None if there are none
+        """
+        white = Piece.is_white(pieces[i])
+        capture_square = (target - 8) if white else (target + 8)
+        enemy_pawn = Piece.make_piece_by_color(Piece.Pawn, not white)
+        remaining = [k for k in range(len(pieces)) if k != i]
+        remaining_pieces = [pieces[k] for k in remaining]
+        # Kings come first in signature order, so they keep their index without the captured pawn
+        king_index = 1 if white else 0
+
+        counts = np.zeros(moves.shape, dtype=np.int32)
+        wins = np.zeros(moves.shape, dtype=np.int32)
+        losses = np.zeros(moves.shape, dtype=np.int32)
+        for k in remaining:
+            if pieces[k] != enemy_pawn:
+                continue
+            adjacent = np.zeros((), dtype=bool)
+            if BoardHelper.file_index(target) > 0:
+                adjacent = adjacent | (squares[k] == target - 1)
+            if BoardHelper.file_index(target) < 7:
+                adjacent = adjacent | (squares[k] == target + 1)
+
+            capture_squares = [capture_square if j == k else squares[j] for j in remaining]
+            captures = moves & adjacent & ~BitbaseGenerator.is_attacked(remaining_pieces, capture_squares, capture_squares[king_index], white)
+            if not captures.any():
+                continue
+            result = BitbaseGenerator.probe_successors(prober, remaining_pieces, capture_squares, white)
+            counts += captures
+            wins += captures & (result == Bitbase.Loss)
+            losses += captures & (result == Bitbase.Win)
+
+        if not counts.any():
+            return None
+        return counts, wins, losses
+
+    @staticmethod
+    def en_passant_successor_state(successor_state, successor_move_count, en_passant):
+        """
+        State (for the side to move) of the positions after a double pawn push, given the state of the same positions
+        in the table (without the en passant square) and the results of the en passant captures
+        """
+        counts, wins, losses = en_passant
+        has_capture = counts > 0
+        won = has_capture & ((successor_state == Bitbase.Win) | (wins > 0))
+        # Lost only if the other moves lose too (or there are none, as with a stalemate lifted by the capture)
+        lost = has_capture & ~won & (losses == counts) & ((successor_state == Bitbase.Loss) | (successor_move_count == 0))
+
+        state = successor_state.copy()
+        state[has_capture & ~won & ~lost & (successor_state != Bitbase.Unknown)] = Bitbase.Draw
+        state[won] = Bitbase.Win
+        state[lost] = Bitbase.Loss
+        return state
+
+    @staticmethod
+    def propagate(state, move_count, exit_losses, quiet_moves):
+        """
+        Resolve positions from their successors, pass after pass, until nothing changes. The first pass counts the
+        resolved successors of every move; later passes only follow the moves into the positions resolved by the
+        previous one, found from the square of the moved piece. Unresolved positions with moves are draws
+        """
+        num_pieces = state.ndim - 1
+        has_moves = move_count > 0
+        winning_moves = np.zeros(state.shape, dtype=bool)
+        losing_moves = exit_losses.copy()
+
+        for side, i, start, target, packed_moves, en_passant in quiet_moves:
+            from_index = (side,) + BitbaseGenerator.square_slice(i, start)
+            to_index = (1 - side,) + BitbaseGenerator.square_slice(i, target)
+            successor_state = state[to_index]
+            if en_passant is not None:
+                successor_state = BitbaseGenerator.en_passant_successor_state(successor_state, move_count[to_index], en_passant)
+
+            moves = np.unpackbits(packed_moves, count=successor_state.size).view(bool).reshape(successor_state.shape)
+            winning_moves[from_index] |= moves & (successor_state == Bitbase.Loss)
+            losing_moves[from_index] += moves & (successor_state == Bitbase.Win)
+
+        # Flat views, indexed by position index
+        flat_state = state.reshape(-1)
+        flat_move_count = move_count.reshape(-1)
+        flat_winning_moves = winning_moves.reshape(-1)
+        flat_losing_moves = losing_moves.reshape(-1)
+
+        while True:
+            unknown = (state == Bitbase.Unknown) & has_moves
+            new_wins = unknown & winning_moves
+            new_losses = unknown & ~new_wins & (losing_moves == move_count)
+            resolved = np.flatnonzero(new_wins | new_losses)
+            if len(resolved) == 0:
+                break
+
+            previous_state = flat_state.copy()
+            state[new_wins] = Bitbase.Win
+            state[new_losses] = Bitbase.Loss
+            resolved_by_square = BitbaseGenerator.group_by_square(resolved, num_pieces)
+
+            for side, i, start, target, packed_moves, en_passant in quiet_moves:
+                group = resolved_by_square[i].get((1 - side) * 64 + target)
+                if group is None:
+                    continue
+                successor_index, slice_index = group
+                moves = (packed_moves[slice_index >> 3] >> (7 - (slice_index & 7))) & 1 == 1
+                if not moves.any():
+                    continue
+
+                successor_state = flat_state[successor_index]
+                # Successors were unknown until this pass, unless en passant captures resolved them already
+                new_losses = successor_state == Bitbase.Loss
+                new_wins = successor_state == Bitbase.Win
+                if en_passant is not None:
+                    en_passant_results = tuple(results.reshape(-1)[slice_index] for results in en_passant)
+                    successor_move_count = flat_move_count[successor_index]
+                    successor_state = BitbaseGenerator.en_passant_successor_state(successor_state, successor_move_count, en_passant_results)
+                    previous = BitbaseGenerator.en_passant_successor_state(previous_state[successor_index], successor_move_count, en_passant_results)
+                    new_losses = (successor_state == Bitbase.Loss) & (previous != Bitbase.Loss)
+                    new_wins = (successor_state == Bitbase.Win) & (previous != Bitbase.Win)
+
+                stride = 64 ** (num_pieces - 1 - i)
+                position_index = successor_index + (2 * side - 1) * 64 ** num_pieces + (start - target) * stride
+                flat_winning_moves[position_index] |= moves & new_losses
+                flat_losing_moves[position_index] += moves & new_wins
+
+        state[(state == Bitbase.Unknown) & has_moves] = Bitbase.Draw
+
+    @staticmethod
+    def group_by_square(position_indices, num_pieces):
+        """
+        For each piece, the given positions grouped by side to move and square of the piece, as
+        {side * 64 + square: (position indices, indices within the slice of positions with the piece on the square)}
+        """
+        sides, placements = np.divmod(position_indices, 64 ** num_pieces)
+        groups = []
+        for i in range(num_pieces):
+            stride = 64 ** (num_pieces - 1 - i)
+            higher, lower = np.divmod(placements, stride * 64)
+            squares, lower = np.divmod(lower, stride)
+            keys = sides * 64 + squares
+            order = np.argsort(keys, kind='stable')
+            group_keys, group_starts = np.unique(keys[order], return_index=True)
+            position_groups = np.split(position_indices[order], group_starts[1:])
+            slice_groups = np.split((higher * stride + lower)[order], group_starts[1:])
+            groups.append(dict(zip(group_keys.tolist(), zip(position_groups, slice_groups))))
+        return groups
+
+    @staticmethod
+    def probe_successors(prober, pieces, squares, white_to_move):
+        """
+        Results (for the side to move) of the positions with the given pieces, which make up a smaller ending
+        """
+        white = ''.join(Piece.get_symbol(piece) for piece in pieces if Piece.is_white(piece) and Piece.piece_type(piece) != Piece.King)
+        black = ''.join(Piece.get_symbol(piece).upper() for piece in pieces if not Piece.is_white(piece) and Piece.piece_type(piece) != Piece.King)
+        signature = Bitbase.canonical_signature('K' + white + 'K' + black)
+        if signature in Bitbase.DrawnSignatures:
+            return Bitbase.Draw
+
+        flip = signature not in prober.tables
+        if flip:
+            signature = Bitbase.mirror_signature(signature)
+            if signature not in prober.tables:
+                return Bitbase.Unknown
+
+        # Order the squares as the table's pieces, taking pieces of the same type in turn
+        remaining = list(zip(pieces, squares))
+        table_squares = []
+        for piece in Bitbase.signature_pieces(signature):
+            board_piece = piece ^ Piece.colorMask if flip else piece
+            slot = next(k for k, (remaining_piece, _) in enumerate(remaining) if remaining_piece == board_piece)
+            table_squares.append(remaining.pop(slot)[1])
+        return prober.probe_placements(signature, table_squares, white_to_move, flip)
+
+    @staticmethod
+    def is_attacked(pieces, squares, square, by_white, captured_square=None):
+        """
+        Whether the square is attacked by the pieces of the given colour, element-wise over the placements.
+        A piece standing on captured_square has just been captured there, so doesn't attack
+        """
+        attacked = np.zeros((), dtype=bool)
+        for piece, piece_square in zip(pieces, squares):
+            if Piece.is_white(piece) != by_white:
+                continue
+            attacks = BitbaseGenerator.Attacks[piece][piece_square, square]
+            if Piece.is_sliding_piece(piece):
+                for blocker_square in squares:
+                    attacks = attacks & ~BitbaseGenerator.Between[piece_square, square, blocker_square]
+            if captured_square is not None:
+                attacks = attacks & (piece_square != captured_square)
+            attacked = attacked | attacks
+        return attacked
+
+    @staticmethod
+    def piece_targets(piece, start):
+        """
+        (target square, move kind) of every move of the piece from the start square on an empty board
+        """
+        if Piece.piece_type(piece) != Piece.Pawn:
+            return [(int(target), BitbaseGenerator.NormalMove) for target in np.flatnonzero(BitbaseGenerator.Attacks[piece][start])]
+
+        white = Piece.is_white(piece)
+        forward = 8 if white else -8
+        targets = [(start + forward, BitbaseGenerator.PawnPush)]
+        if BoardHelper.rank_index(start) == (1 if white else 6):
+            targets.append((start + 2 * forward, BitbaseGenerator.PawnTwoUp))
+        targets += [(int(target), BitbaseGenerator.PawnCapture) for target in np.flatnonzero(BitbaseGenerator.Attacks[piece][start])]
+        return targets
+
+    @staticmethod
+    def square_grids(num_pieces):
+        """
+        Square of each piece over all placements, as arrays which broadcast to shape (64,) * num_pieces
+        """
+        return [np.arange(64).reshape([64 if axis == i else 1 for axis in range(num_pieces)]) for i in range(num_pieces)]
+
+    @staticmethod
+    def square_slice(i, square):
+        """
+        Index of the placements with piece i on the given square (keeping the axis, so that arrays still broadcast)
+        """
+        return (slice(None),) * i + (slice(square, square + 1),)
+
+    @staticmethod
+    def valid_placements(pieces, squares):
+        """
+        Pieces on distinct squares, no pawns on the first or last rank and kings not adjacent
+        """
+        valid = np.ones((64,) * len(pieces), dtype=bool)
+        for i, piece in enumerate(pieces):
+            for j in range(i + 1, len(pieces)):
+                valid &= squares[i] != squares[j]
+            if Piece.piece_type(piece) == Piece.Pawn:
+                valid &= (squares[i] >= 8) & (squares[i] < 56)
+
+        valid &= ~BitbaseGenerator.Attacks[Piece.WhiteKing][squares[0], squares[1]]
+        return valid
+
+    def save_table(self, signature, state):
+        """
+        Write the win bits followed by the loss bits. Writing to a temporary file first means a table
+        is never seen half-written by a prober
+        """
+        path = self.table_path(signature)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(np.packbits(state == Bitbase.Win, bitorder='little').tobytes())
+            file.write(np.packbits(state == Bitbase.Loss, bitorder='little').tobytes())
+        os.replace(temp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate endgame bitbases")
+    parser.add_argument("directory", help="output directory for the table files")
+    parser.add_argument("endings", nargs='*', default=Bitbase.DefaultEndings, help="material signatures, e.g. KPK KRKP")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    BitbaseGenerator(args.directory).generate(args.endings, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+from Board.piece import Piece
+from Board.board import Board
+from Helpers.boardHelpers import BoardHelper
+from Move_Generation.precomputedMoveData import PrecomputedMoveData
+
+class MaterialSignature:
+    """
+    Integer key describing the material of a position, built from the piece list counts.
+    Each side uses 20 bits (4 bits per piece count: pawns, knights, bishops, rooks, queens), with white in the high bits
+    """
+    PawnShift = 16
+    KnightShift = 12
+    BishopShift = 8
+    RookShift = 4
+    QueenShift = 0
+    SideBits = 20
+    SideMask = (1 << SideBits) - 1
+
+    SymbolShifts = {'P': PawnShift, 'N': KnightShift, 'B': BishopShift, 'R': RookShift, 'Q': QueenShift}
+
+    @staticmethod
+    def from_board(board):
+        key = 0
+        for color_index in (Board.WhiteIndex, Board.BlackIndex):
+            key = (key << MaterialSignature.SideBits
+                   | board.pawns[color_index].count << MaterialSignature.PawnShift
+                   | board.knights[color_index].count << MaterialSignature.KnightShift
+                   | board.bishops[color_index].count << MaterialSignature.BishopShift
+                   | board.rooks[color_index].count << MaterialSignature.RookShift
+                   | board.queens[color_index].count << MaterialSignature.QueenShift)
+        return key
+
+    @staticmethod
+    def from_string(signature):
+        """
+        Key for a signature such as "KBNK" (white pieces after the first king, black pieces after the second)
+        """
+        second_king = signature.index('K', 1)
+        white = 0
+        black = 0
+        for symbol in signature[1:second_king]:
+            white += 1 << MaterialSignature.SymbolShifts[symbol]
+        for symbol in signature[second_king + 1:]:
+            black += 1 << MaterialSignature.SymbolShifts[symbol]
+        return white << MaterialSignature.SideBits | black
+
+    @staticmethod
+    def mirror(key):
+        """
+        Key of the same material with colours swapped
+        """
+        return (key & MaterialSignature.SideMask) << MaterialSignature.SideBits | key >> MaterialSignature.SideBits
+
+    @staticmethod
+    def side_counts(key, color_index):
+        """
+        (pawns, knights, bishops, rooks, queens) of one side
+        """
+        side = key >> MaterialSignature.SideBits if color_index == Board.WhiteIndex else key & MaterialSignature.SideMask
+        return side >> MaterialSignature.PawnShift & 15, side >> MaterialSignature.KnightShift & 15, \
+            side >> MaterialSignature.BishopShift & 15, side >> MaterialSignature.RookShift & 15, side >> MaterialSignature.QueenShift & 15
+
+
+class EndgameEntry:
+    """
+    Specialized handling for a material signature.
+    Draw: the position is drawn, no evaluation or search is needed.
+    Evaluate: function(board, strong_index) returns a score from the strong side's point of view, or None to use the normal evaluation.
+    Scale: function(board, strong_index) returns a factor (out of Endgames.ScaleNormal) for the normal evaluation.
+    """
+    Draw = 0
+    Evaluate = 1
+    Scale = 2
+
+    def __init__(self, kind, function=None, strong_index=Board.WhiteIndex):
+        self.kind = kind
+        self.function = function
+        self.strong_index = strong_index
+
+
+class Endgames:
+    """
+    Registry of specialized endgame evaluators, looked up by material signature.
+    Extends the classification of Arbiter.insufficient_material with minor piece endings that can't be won by force,
+    and with known winning/drawing patterns. The entry for every signature seen is cached, so the classification only
+    happens once per material configuration
+    """
+    KnownWinScore = 20000
+    ScaleNormal = 64
+
+    # Signatures without pawns where neither side can force mate
+    DrawnSignatures = ["KK", "KNK", "KBK", "KNNK", "KNKN", "KBKN", "KBKB"]
+
+    Registry = {}
+
+    def __init__(self):
+        self.cache = {}
+
+    @staticmethod
+    def register(signature, kind, function=None):
+        """
+        Register handling for the given signature (with white as the strong side) and its colour-swapped equivalent
+        """
+        key = MaterialSignature.from_string(signature)
+        Endgames.Registry[key] = EndgameEntry(kind, function, Board.WhiteIndex)
+        Endgames.Registry[MaterialSignature.mirror(key)] = EndgameEntry(kind, function, Board.BlackIndex)
+
+    def probe(self, board):
+        """
+        Get the EndgameEntry for the material on the board, or None if there is no specialized handling
+        """
+        key = MaterialSignature.from_board(board)
+        if key in self.cache:
+            return self.cache[key]
+
+        entry = Endgames.classify(key)
+        self.cache[key] = entry
+        return entry
+
+    def is_known_draw(self, board):
+        entry = self.probe(board)
+        return entry is not None and entry.kind == EndgameEntry.Draw
+
+    @staticmethod
+    def classify(key):
+        """
+        Find the entry for a signature: either registered exactly, or matching one of the pattern families
+        """
+        if key in Endgames.Registry:
+            return Endgames.Registry[key]
+
+        white = MaterialSignature.side_counts(key, Board.WhiteIndex)
+        black = MaterialSignature.side_counts(key, Board.BlackIndex)
+
+        # Bishop and pawns against bare king: drawn with a rook pawn and the wrong coloured bishop
+        for strong_index, strong, weak in ((Board.WhiteIndex, white, black), (Board.BlackIndex, black, white)):
+            if strong[0] > 0 and strong[1:] == (0, 1, 0, 0) and weak == (0, 0, 0, 0, 0):
+                return EndgameEntry(EndgameEntry.Evaluate, Endgames.evaluate_wrong_rook_pawn, strong_index)
+
+        # Only a bishop each (plus pawns): opposite coloured bishops are very drawish
+        if white[1:] == (0, 1, 0, 0) and black[1:] == (0, 1, 0, 0):
+            return EndgameEntry(EndgameEntry.Scale, Endgames.scale_opposite_bishops)
+
+        return None
+
+    @staticmethod
+    def mop_up(strong_king, weak_king):
+        """
+        Reward pushing the weak king towards the edge and bringing the strong king closer
+        """
+        return (PrecomputedMoveData.centre_manhattan_distance[weak_king] * 10
+                + (14 - PrecomputedMoveData.orthogonal_distance[strong_king][weak_king]) * 4)
+
+    @staticmethod
+    def evaluate_kbnk(board, strong_index):
+        """
+        Mate with bishop and knight: the weak king has to be driven into a corner of the bishop's colour
+        """
+        strong_king = board.king_square[strong_index]
+        weak_king = board.king_square[1 - strong_index]
+        bishop_square = board.bishops[strong_index][0]
+        light_bishop = (BoardHelper.file_index(bishop_square) + BoardHelper.rank_index(bishop_square)) % 2 != 0
+
+        corners = (BoardHelper.a8, BoardHelper.h1) if light_bishop else (BoardHelper.a1, BoardHelper.h8)
+        corner_distance = min(PrecomputedMoveData.king_distance[weak_king][corner] for corner in corners)
+        king_distance = PrecomputedMoveData.king_distance[strong_king][weak_king]
+        return Endgames.KnownWinScore + (7 - corner_distance) * 20 + (7 - king_distance) * 5
+
+    @staticmethod
+    def evaluate_kqkr(board, strong_index):
+        """
+        Queen against rook is a win: push the weak king to the edge
+        """
+        strong_king = board.king_square[strong_index]
+        weak_king = board.king_square[1 - strong_index]
+        return Endgames.KnownWinScore + Endgames.mop_up(strong_king, weak_king)
+
+    @staticmethod
+    def evaluate_krkp(board, strong_index):
+        """
+        Rook against pawn is won if the strong king is in front of the pawn, or if the weak king is too far away
+        to support the pawn. Otherwise the normal evaluation is used
+        """
+        weak_index = 1 - strong_index
+        strong_king = board.king_square[strong_index]
+        weak_king = board.king_square[weak_index]
+        pawn_square = board.pawns[weak_index][0]
+        rook_square = board.rooks[strong_index][0]
+
+        pawn_file = BoardHelper.file_index(pawn_square)
+        pawn_rank = BoardHelper.rank_index(pawn_square)
+        # The weak side is black when white is strong, so its pawn moves towards rank 0
+        queening_square = pawn_file if strong_index == Board.WhiteIndex else 56 + pawn_file
+        king_in_front = BoardHelper.file_index(strong_king) == pawn_file and (
+            BoardHelper.rank_index(strong_king) < pawn_rank if strong_index == Board.WhiteIndex else BoardHelper.rank_index(strong_king) > pawn_rank)
+
+        tempo = 0 if board.move_color_index == weak_index else 1
+        weak_king_too_far = (PrecomputedMoveData.king_distance[weak_king][pawn_square] >= 3 + tempo
+                             and PrecomputedMoveData.king_distance[weak_king][rook_square] >= 3)
+
+        if king_in_front or weak_king_too_far:
+            return Endgames.KnownWinScore - PrecomputedMoveData.king_distance[strong_king][queening_square] * 10
+        return None
+
+    @staticmethod
+    def evaluate_wrong_rook_pawn(board, strong_index):
+        """
+        Bishop and pawns against king: drawn if all pawns are on the same rook file, the bishop can't control
+        the queening square, and the defending king reaches the corner
+        """
+        weak_king = board.king_square[1 - strong_index]
+        pawns = board.piece_bitboards[Piece.make_piece(Piece.Pawn, Piece.White if strong_index == Board.WhiteIndex else Piece.Black)]
+        file_a = 0x101010101010101
+        file_h = file_a << 7
+
+        if pawns & ~file_a and pawns & ~file_h:
+            return None
+
+        queening_file = 0 if pawns & file_a else 7
+        queening_square = (56 if strong_index == Board.WhiteIndex else 0) + queening_file
+        bishop_square = board.bishops[strong_index][0]
+        bishop_is_light = (BoardHelper.file_index(bishop_square) + BoardHelper.rank_index(bishop_square)) % 2 != 0
+        queening_square_is_light = (BoardHelper.file_index(queening_square) + BoardHelper.rank_index(queening_square)) % 2 != 0
+
+        if bishop_is_light != queening_square_is_light and PrecomputedMoveData.king_distance[weak_king][queening_square] <= 1:
+            return 0
+        return None
+
+    @staticmethod
+    def scale_opposite_bishops(board, strong_index):
+        """
+        Halve the evaluation when the bishops are on opposite colours
+        """
+        white_bishop = board.bishops[Board.WhiteIndex][0]
+        black_bishop = board.bishops[Board.BlackIndex][0]
+        white_is_light = (BoardHelper.file_index(white_bishop) + BoardHelper.rank_index(white_bishop)) % 2 != 0
+        black_is_light = (BoardHelper.file_index(black_bishop) + BoardHelper.rank_index(black_bishop)) % 2 != 0
+        return Endgames.ScaleNormal // 2 if white_is_light != black_is_light else Endgames.ScaleNormal
+
+
+for drawn_signature in Endgames.DrawnSignatures:
+    Endgames.register(drawn_signature, EndgameEntry.Draw)
+
+Endgames.register("KBNK", EndgameEntry.Evaluate, Endgames.evaluate_kbnk)
+Endgames.register("KQKR", EndgameEntry.Evaluate, Endgames.evaluate_kqkr)
+Endgames.register("KRKP", EndgameEntry.Evaluate, Endgames.evaluate_krkp)
@@ -0,0 +1,235 @@
+from Board.piece import Piece
+from Board.board import Board
+from Helpers.boardHelpers import BoardHelper
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
+from Move_Generation.Bitboards.bits import Bits
+from Move_Generation.Magics.magic import Magic
+from Endgames.bitbase import Bitbase
+from Endgames.endgames import Endgames, EndgameEntry
+
+class Evaluation:
+    """
+    Static evaluation of a position, from the point of view of the side to move.
+    Mobility and king safety are computed from attack bitboards: the opponent's attacks are
+    taken from the move generator (which already computed them while generating moves),
+    so only the side to move's attacks have to be looked up here.
+    """
+    PawnValue = 100
+    KnightValue = 300
+    BishopValue = 320
+    RookValue = 500
+    QueenValue = 900
+
+    # Indexed by piece type
+    PieceValues = [0, PawnValue, KnightValue, BishopValue, RookValue, QueenValue, 0]
+
+    # Bonus per square attacked (not occupied by a friendly piece), indexed by piece type
+    MobilityWeights = [0, 0, 4, 4, 2, 1, 0]
+
+    # Bonus per square attacked in the zone around the enemy king, indexed by piece type
+    KingAttackWeights = [0, 0, 8, 8, 10, 14, 0]
+
+    # Score for a position known to be won (material is added so that progress is still rewarded)
+    KnownWinScore = Endgames.KnownWinScore
+    # Bonus per rank advanced by a pawn of the winning side in a position known to be won
+    KnownWinPawnRankBonus = 20
+
+    # Linear features of the evaluation (used for tuning), in weight order
+    TunedPieceTypes = [Piece.Knight, Piece.Bishop, Piece.Rook, Piece.Queen]
+    MaterialFeatureOffset = 0
+    MobilityFeatureOffset = 5
+    KingAttackFeatureOffset = MobilityFeatureOffset + len(TunedPieceTypes)
+    NumFeatures = KingAttackFeatureOffset + len(TunedPieceTypes)
+
+    def __init__(self, bitbase_prober=None):
+        self.board = None
+        self.bitbase_prober = bitbase_prober
+        self.endgames = Endgames()
+        # Zobrist key and result of the last bitbase probe, shared by the searcher and the evaluation of the same position
+        self.bitbase_key = None
+        self.bitbase_result = Bitbase.Unknown
+
+    def evaluate(self, board, move_generator=None):
+        """
+        Evaluate the board from the point of view of the side to move.
+        If move_generator is given, it must have just generated moves for this board, so that its
+        opponent attack maps can be reused instead of being calculated again.
+        """
+        self.board = board
+        friendly_index = board.move_color_index
+        enemy_index = board.opponent_color_index
+
+        scale = Endgames.ScaleNormal
+        endgame = self.endgames.probe(board)
+        if endgame is not None and endgame.kind == EndgameEntry.Draw:
+            return 0
+
+        # A bitbase result only decides who wins: the specialized evaluators (which know how to make progress in their
+        # ending) still score the positions won by their strong side
+        result = self.probe_bitbase(board)
+        if result == Bitbase.Draw:
+            return 0
+        winner_index = None if result == Bitbase.Unknown else (friendly_index if result == Bitbase.Win else enemy_index)
+
+        if endgame is not None:
+            if endgame.kind == EndgameEntry.Evaluate and winner_index in (None, endgame.strong_index):
+                endgame_eval = endgame.function(board, endgame.strong_index)
+                if endgame_eval is not None:
+                    return endgame_eval if endgame.strong_index == friendly_index else -endgame_eval
+            elif endgame.kind == EndgameEntry.Scale and winner_index is None:
+                scale = endgame.function(board, endgame.strong_index)
+
+        if winner_index is not None:
+            known_win_eval = self.evaluate_known_win(winner_index)
+            return known_win_eval if winner_index == friendly_index else -known_win_eval
+
+        friendly_attacks = Evaluation.get_piece_attacks(board, friendly_index)
+        if move_generator is not None:
+            enemy_attacks = move_generator.get_opponent_attack_maps()[2]
+        else:
+            enemy_attacks = Evaluation.get_piece_attacks(board, enemy_index)
+
+        friendly_eval = self.material(friendly_index)
+        friendly_eval += self.mobility_and_king_attacks(friendly_attacks, friendly_index, enemy_index)
+
+        enemy_eval = self.material(enemy_index)
+        enemy_eval += self.mobility_and_king_attacks(enemy_attacks, enemy_index, friendly_index)
+
+        return (friendly_eval - enemy_eval) * scale // Endgames.ScaleNormal
+
+    def set_bitbase_prober(self, bitbase_prober):
+        self.bitbase_prober = bitbase_prober
+        self.bitbase_key = None
+
+    def probe_bitbase(self, board):
+        """
+        Bitbase result for the side to move, or Bitbase.Unknown if there is no prober or no table for the position
+        """
+        if self.bitbase_prober is None or board.total_piece_count_without_pawns_and_kings > self.bitbase_prober.max_non_pawn_pieces:
+            return Bitbase.Unknown
+        if board.zobrist_key != self.bitbase_key:
+            self.bitbase_key = board.zobrist_key
+            self.bitbase_result = self.bitbase_prober.probe(board)
+        return self.bitbase_result
+
+    def evaluate_known_win(self, strong_index):
+        """
+        Score (for the winning side) of a position the bitbases show to be won: the known win score and material,
+        plus rewards for driving the losing king to the edge, bringing the kings together and advancing pawns,
+        so that the search makes progress towards mate or promotion rather than shuffling
+        """
+        board = self.board
+        weak_index = 1 - strong_index
+        score = Evaluation.KnownWinScore + self.material(strong_index) - self.material(weak_index)
+        score += Endgames.mop_up(board.king_square[strong_index], board.king_square[weak_index])
+
+        pawns = board.pawns[strong_index]
+        for i in range(pawns.count):
+            rank = BoardHelper.rank_index(pawns[i])
+            score += (rank if strong_index == Board.WhiteIndex else 7 - rank) * Evaluation.KnownWinPawnRankBonus
+        return score
+
+    def material(self, color_index):
+        """
+        Sum of piece values for the given side
+        """
+        board = self.board
+        return (board.pawns[color_index].count * Evaluation.PawnValue
+                + board.knights[color_index].count * Evaluation.KnightValue
+                + board.bishops[color_index].count * Evaluation.BishopValue
+                + board.rooks[color_index].count * Evaluation.RookValue
+                + board.queens[color_index].count * Evaluation.QueenValue)
+
+    def mobility_and_king_attacks(self, piece_attacks, color_index, enemy_index):
+        """
+        Score the given (square, attack bitboard) pairs for mobility and for pressure on the enemy king zone
+        """
+        board = self.board
+        not_friendly = ~board.color_bitboards[color_index]
+        enemy_king_zone = Bits.KingSafetyMask[board.king_square[enemy_index]]
+
+        mobility_score = 0
+        king_attack_score = 0
+        for square, attacks in piece_attacks:
+            piece_type = Piece.piece_type(board.square[square])
+            mobility_score += (attacks & not_friendly).bit_count() * Evaluation.MobilityWeights[piece_type]
+            king_attack_score += (attacks & enemy_king_zone).bit_count() * Evaluation.KingAttackWeights[piece_type]
+
+        return mobility_score + king_attack_score
+
+    @staticmethod
+    def get_piece_attacks(board, color_index):
+        """
+        Calculate (square, attack bitboard) pairs for every knight and slider of the given side,
+        in the same form as MoveGenerator.get_opponent_attack_maps
+        """
+        piece_attacks = []
+        blockers = board.all_pieces_bitboard
+        color = Piece.White if color_index == Board.WhiteIndex else Piece.Black
+        queens = board.piece_bitboards[Piece.make_piece(Piece.Queen, color)]
+
+        orthogonal_sliders = board.piece_bitboards[Piece.make_piece(Piece.Rook, color)] | queens
+        for square in BitBoardUtility.iter_squares(orthogonal_sliders):
+            piece_attacks.append((square, Magic.get_slider_attacks(square, blockers, True)))
+
+        diagonal_sliders = board.piece_bitboards[Piece.make_piece(Piece.Bishop, color)] | queens
+        for square in BitBoardUtility.iter_squares(diagonal_sliders):
+            piece_attacks.append((square, Magic.get_slider_attacks(square, blockers, False)))
+
+        knights = board.piece_bitboards[Piece.make_piece(Piece.Knight, color)]
+        for square in BitBoardUtility.iter_squares(knights):
+            piece_attacks.append((square, BitBoardUtility.KnightAttacks[square]))
+
+        return piece_attacks
+
+    @staticmethod
+    def get_features(board):
+        """
+        Get the evaluation features of the position as sparse (feature index, value) pairs, from white's point of view.
+        Evaluating with these features is equal to the dot product of the values with get_weights()
+        """
+        features = [0] * Evaluation.NumFeatures
+
+        for color_index, sign in ((Board.WhiteIndex, 1), (Board.BlackIndex, -1)):
+            enemy_index = 1 - color_index
+            not_friendly = ~board.color_bitboards[color_index]
+            enemy_king_zone = Bits.KingSafetyMask[board.king_square[enemy_index]]
+
+            features[Evaluation.MaterialFeatureOffset + Piece.Pawn - 1] += sign * board.pawns[color_index].count
+            features[Evaluation.MaterialFeatureOffset + Piece.Knight - 1] += sign * board.knights[color_index].count
+            features[Evaluation.MaterialFeatureOffset + Piece.Bishop - 1] += sign * board.bishops[color_index].count
+            features[Evaluation.MaterialFeatureOffset + Piece.Rook - 1] += sign * board.rooks[color_index].count
+            features[Evaluation.MaterialFeatureOffset + Piece.Queen - 1] += sign * board.queens[color_index].count
+
+            for square, attacks in Evaluation.get_piece_attacks(board, color_index):
+                type_offset = Piece.piece_type(board.square[square]) - Piece.Knight
+                features[Evaluation.MobilityFeatureOffset + type_offset] += sign * (attacks & not_friendly).bit_count()
+                features[Evaluation.KingAttackFeatureOffset + type_offset] += sign * (attacks & enemy_king_zone).bit_count()
+
+        return [(index, value) for index, value in enumerate(features) if value != 0]
+
+    @staticmethod
+    def get_weights():
+        """
+        Get the current evaluation weights, in the same order as the features
+        """
+        weights = Evaluation.PieceValues[Piece.Pawn:Piece.Queen + 1]
+        weights += [Evaluation.MobilityWeights[piece_type] for piece_type in Evaluation.TunedPieceTypes]
+        weights += [Evaluation.KingAttackWeights[piece_type] for piece_type in Evaluation.TunedPieceTypes]
+        return weights
+
+    @staticmethod
+    def set_weights(weights):
+        """
+        Replace the evaluation weights (for example with the output of the tuner). Values are rounded to integers
+        """
+        weights = [int(round(weight)) for weight in weights]
+
+        for piece_type in range(Piece.Pawn, Piece.Queen + 1):
+            Evaluation.PieceValues[piece_type] = weights[Evaluation.MaterialFeatureOffset + piece_type - 1]
+        Evaluation.PawnValue, Evaluation.KnightValue, Evaluation.BishopValue, Evaluation.RookValue, Evaluation.QueenValue = \
+            Evaluation.PieceValues[Piece.Pawn:Piece.Queen + 1]
+
+        for i, piece_type in enumerate(Evaluation.TunedPieceTypes):
+            Evaluation.MobilityWeights[piece_type] = weights[Evaluation.MobilityFeatureOffset + i]
+            Evaluation.KingAttackWeights[piece_type] = weights[Evaluation.KingAttackFeatureOffset + i]
@@ -1,7 +1,8 @@
-from gameResult import GameResult
+from Game_Result.gameResult import GameResult
 from Move_Generation.moveGenerator import MoveGenerator
 from Board.board import Board
 from Helpers.boardHelpers import BoardHelper
+from Board.piece import Piece
 
 class Arbiter:
 
@@ -77,4 +78,100 @@ class Arbiter:
             black_bishop_is_light_square = BoardHelper.light_square(board.bishops[Board.BlackIndex][0])
             return white_bishop_is_light_square == black_bishop_is_light_square
         
-        return False
\ No newline at end of file
+        return False
+
+
+class GameArbiter:
+    """
+    Arbiter bound to a single board, for adjudicating every ply of a game cheaply.
+    Moves are made through the arbiter so it can keep repetition counts and piece counts up to date incrementally;
+    mate/stalemate detection reuses one move generator and stops at the first legal move found
+    """
+    def __init__(self, board):
+        self.board = board
+        self.move_generator = MoveGenerator()
+        self.reset()
+
+    def reset(self):
+        """
+        Recalculate the tracked state from the board (call after loading a new position)
+        """
+        board = self.board
+        self.repetition_counts = {}
+        for key in board.repetition_position_history:
+            self.repetition_counts[key] = self.repetition_counts.get(key, 0) + 1
+        # Counts saved when an irreversible move (pawn move or capture) starts a new repetition history
+        self.saved_repetition_counts = []
+
+        # Pawns, rooks and queens on the board (any of them means there is mating material), and knights + bishops
+        self.num_pawns_rooks_queens = 0
+        self.num_minors = 0
+        for color_index in (Board.WhiteIndex, Board.BlackIndex):
+            self.num_pawns_rooks_queens += board.pawns[color_index].count + board.rooks[color_index].count + board.queens[color_index].count
+            self.num_minors += board.knights[color_index].count + board.bishops[color_index].count
+
+    def make_move(self, move):
+        board = self.board
+        board.make_move(move)
+        self.update_material(board.current_game_state.captured_piece_type, move, 1)
+
+        key = board.zobrist_key
+        if board.fifty_move_counter == 0:
+            self.saved_repetition_counts.append(self.repetition_counts)
+            self.repetition_counts = {key: 1}
+        else:
+            self.repetition_counts[key] = self.repetition_counts.get(key, 0) + 1
+
+    def unmake_move(self, move):
+        board = self.board
+        key = board.zobrist_key
+        if board.fifty_move_counter == 0 and self.saved_repetition_counts:
+            self.repetition_counts = self.saved_repetition_counts.pop()
+        else:
+            count = self.repetition_counts.get(key, 0) - 1
+            if count > 0:
+                self.repetition_counts[key] = count
+            else:
+                self.repetition_counts.pop(key, None)
+
+        self.update_material(board.current_game_state.captured_piece_type, move, -1)
+        board.unmake_move(move)
+
+    def update_material(self, captured_piece_type, move, sign):
+        """
+        Apply (sign = 1) or revert (sign = -1) the change in piece counts caused by a capture and/or promotion
+        """
+        if captured_piece_type in (Piece.Pawn, Piece.Rook, Piece.Queen):
+            self.num_pawns_rooks_queens -= sign
+        elif captured_piece_type in (Piece.Knight, Piece.Bishop):
+            self.num_minors -= sign
+
+        if move.is_promotion:
+            self.num_pawns_rooks_queens -= sign
+            if move.promotion_piece_type in (Piece.Rook, Piece.Queen):
+                self.num_pawns_rooks_queens += sign
+            else:
+                self.num_minors += sign
+
+    def get_game_state(self):
+        board = self.board
+
+        # Look for mate/stalemate
+        if not self.move_generator.has_legal_moves(board):
+            if self.move_generator.in_check:
+                return GameResult.WhiteIsMated if board.is_white_to_move else GameResult.BlackIsMated
+            return GameResult.Stalemate
+
+        # Fifty move rule
+        if board.fifty_move_counter >= 100:
+            return GameResult.FiftyMoveRule
+
+        # Threefold repetition
+        if self.repetition_counts.get(board.zobrist_key, 0) >= 3:
+            return GameResult.Repetition
+
+        # Insufficient material is only possible with no pawns, rooks or queens and at most two minor pieces
+        if self.num_pawns_rooks_queens == 0 and self.num_minors <= 2 and Arbiter.insufficient_material(board):
+            return GameResult.InsufficientMaterial
+
+        return GameResult.InProgress
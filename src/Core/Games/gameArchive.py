@@ -0,0 +1,198 @@
+import argparse
+import os
+import struct
+import numpy as np
+from Board.board import Board
+from Board.move import Move
+from Helpers.fenUtility import FenUtility
+from Helpers.pgnReader import PGNReader
+from Game_Result.gameResult import GameResult
+
+class GameArchive:
+    """
+    Reader for binary game archives (see GameArchiveWriter).
+    Each game is stored as a reference to its start position plus its moves as 16 bit move values,
+    so any game can be replayed directly with Board.make_move. The file is memory-mapped; nothing is parsed up front
+    apart from the start position and player name tables.
+
+    File layout (little endian):
+    header: magic, version, number of games, number of start positions, number of players, index offset, names offset
+    moves: uint16 move values of all games, one game after another
+    index: (move offset, number of moves, start position, white player, black player, result) per game
+    names: start position FENs followed by player names, utf-8, one per line
+    """
+    Magic = b"CAGA"
+    Version = 1
+    HeaderFormat = "<4sIIIIQQ"
+    HeaderSize = struct.calcsize(HeaderFormat)
+    IndexEntryType = np.dtype([('move_offset', '<u8'), ('num_moves', '<u4'), ('start_position', '<u4'),
+                               ('white', '<u4'), ('black', '<u4'), ('result', 'u1')])
+
+    def __init__(self, path):
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, version, num_games, num_fens, num_players, index_offset, names_offset = struct.unpack_from(GameArchive.HeaderFormat, self.data, 0)
+        if magic != GameArchive.Magic or version != GameArchive.Version:
+            raise ValueError(f"{path} is not a game archive (version {GameArchive.Version})")
+
+        num_moves = (index_offset - GameArchive.HeaderSize) // 2
+        self.moves = np.frombuffer(self.data, dtype='<u2', count=num_moves, offset=GameArchive.HeaderSize)
+        self.index = np.frombuffer(self.data, dtype=GameArchive.IndexEntryType, count=num_games, offset=index_offset)
+
+        names = bytes(self.data[names_offset:]).decode('utf-8').split('\n')
+        self.start_fens = names[:num_fens]
+        self.players = names[num_fens:num_fens + num_players]
+        self.num_games = num_games
+
+    def __len__(self):
+        return self.num_games
+
+    def get_move_values(self, game_index):
+        """
+        uint16 move values of the game (a view into the memory-mapped file)
+        """
+        entry = self.index[game_index]
+        start = int(entry['move_offset'])
+        return self.moves[start:start + int(entry['num_moves'])]
+
+    def get_game_info(self, game_index):
+        """
+        (start fen, white player, black player, GameResult) of the game
+        """
+        entry = self.index[game_index]
+        return (self.start_fens[int(entry['start_position'])], self.players[int(entry['white'])],
+                self.players[int(entry['black'])], GameResult(int(entry['result'])))
+
+    def get_moves(self, game_index):
+        return [Move(move_value=int(value)) for value in self.get_move_values(game_index)]
+
+    def replay(self, game_index, board=None):
+        """
+        Play the game on the given board (or a new one) from its start position and return the board
+        """
+        board = board or Board()
+        self.load_start_position(game_index, board)
+        for value in self.get_move_values(game_index).tolist():
+            board.make_move(Move(move_value=value))
+        return board
+
+    def iter_positions(self, game_index, board=None):
+        """
+        Yield (board, move) for every move of the game, with the board in the position before the move is made
+        """
+        board = board or Board()
+        self.load_start_position(game_index, board)
+        for value in self.get_move_values(game_index).tolist():
+            move = Move(move_value=value)
+            yield board, move
+            board.make_move(move)
+
+    def load_start_position(self, game_index, board):
+        board.load_fen_fast(self.start_fens[int(self.index[game_index]['start_position'])])
+
+
+class GameArchiveWriter:
+    """
+    Writes a game archive. Moves are streamed to disk as games are added; the index and name tables are kept in memory
+    and written when the writer is closed. The archive is written to a temporary file and only moved to its final
+    path on close, so a partially written archive is never left behind
+    """
+    # PGN results don't say how the game ended, so decisive games are stored as mates and draws as arbiter draws
+    PGNResults = {"1-0": GameResult.BlackIsMated, "0-1": GameResult.WhiteIsMated, "1/2-1/2": GameResult.DrawByArbiter}
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = path + ".tmp"
+        self.file = open(self.temp_path, 'wb')
+        self.file.write(b'\0' * GameArchive.HeaderSize)
+
+        self.index = []
+        self.num_moves = 0
+        self.fen_ids = {FenUtility.StartPositionFEN: 0}
+        self.player_ids = {"?": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+            os.remove(self.temp_path)
+
+    @staticmethod
+    def get_id(ids, name):
+        if name not in ids:
+            ids[name] = len(ids)
+        return ids[name]
+
+    def add_game(self, moves, result=GameResult.InProgress, start_fen=None, white_name="?", black_name="?"):
+        """
+        Append a game. moves may be Move objects or 16 bit move values
+        """
+        move_values = np.fromiter((move if isinstance(move, int) else move.value for move in moves), dtype='<u2')
+        move_values.tofile(self.file)
+
+        start_position = GameArchiveWriter.get_id(self.fen_ids, start_fen or FenUtility.StartPositionFEN)
+        white = GameArchiveWriter.get_id(self.player_ids, white_name or "?")
+        black = GameArchiveWriter.get_id(self.player_ids, black_name or "?")
+        self.index.append((self.num_moves, len(move_values), start_position, white, black, result.value))
+        self.num_moves += len(move_values)
+
+    def add_pgn_games(self, file, board=None):
+        """
+        Append every game read from a PGN file. Games with a move that can't be resolved in its position are skipped
+        rather than stored cut short. Returns (number of games added, number skipped)
+        """
+        board = board or Board()
+        num_added = 0
+        num_skipped = 0
+        for game in PGNReader.read_games(file):
+            moves = list(PGNReader.read_game_moves(game, board))
+            if len(moves) < len(game.moves):
+                num_skipped += 1
+                continue
+            self.add_game(moves, GameArchiveWriter.PGNResults.get(game.result, GameResult.InProgress), game.start_fen,
+                          game.headers.get("White", "?"), game.headers.get("Black", "?"))
+            num_added += 1
+        return num_added, num_skipped
+
+    def close(self):
+        index_offset = self.file.tell()
+        np.array(self.index, dtype=GameArchive.IndexEntryType).tofile(self.file)
+
+        names_offset = self.file.tell()
+        names = list(self.fen_ids) + list(self.player_ids)
+        self.file.write('\n'.join(name.replace('\n', ' ') for name in names).encode('utf-8'))
+
+        self.file.seek(0)
+        self.file.write(struct.pack(GameArchive.HeaderFormat, GameArchive.Magic, GameArchive.Version, len(self.index),
+                                    len(self.fen_ids), len(self.player_ids), index_offset, names_offset))
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert PGN files to a binary game archive")
+    parser.add_argument("pgn", nargs='+', help="PGN files")
+    parser.add_argument("--output", required=True, help="output archive path")
+    args = parser.parse_args()
+
+    board = Board()
+    num_games = 0
+    num_skipped = 0
+
+    with GameArchiveWriter(args.output) as writer:
+        for path in args.pgn:
+            with open(path, 'r', errors='replace') as file:
+                added, skipped = writer.add_pgn_games(file, board)
+            num_games += added
+            num_skipped += skipped
+
+    print(f"Wrote {num_games} games to {args.output}")
+    if num_skipped:
+        print(f"Skipped {num_skipped} games with moves that could not be replayed")
+
+
+if __name__ == "__main__":
+    main()
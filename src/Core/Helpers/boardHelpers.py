@@ -1,6 +1,5 @@
 from Board.coord import Coord
 from Board.piece import Piece
-from fenUtility import FenUtility
 
 class BoardHelper:
     # Directional coordinates for Rook and Bishop moves
@@ -25,31 +24,29 @@ class BoardHelper:
         return square_index & 0b000111
     
     @staticmethod
-    def index_from_coord(file_index, rank_index):
-        """Returns the square index from given file and rank indices"""
+    def index_from_coord(file_index, rank_index=None):
+        """Returns the square index from given file and rank indices, or from a Coord object"""
+        if rank_index is None:
+            file_index, rank_index = file_index.file_index, file_index.rank_index
         return rank_index * 8 + file_index
     
-    @staticmethod
-    def index_from_coord(coord):
-        """Returns the square index from a Coord object"""
-        return BoardHelper.index_from_coord(coord.file_index, coord.rank_index)
-    
     @staticmethod
     def coord_from_index(square_index):
         """Creates a Coord object from a given square index"""
         return Coord(BoardHelper.file_index(square_index), BoardHelper.rank_index(square_index))
     
     @staticmethod
-    def light_square(file_index, rank_index):
-        """Determines if the given file and rank represent a light square"""
+    def light_square(file_index, rank_index=None):
+        """Determines if the given file and rank (or the given square index) represent a light square"""
+        if rank_index is None:
+            file_index, rank_index = BoardHelper.file_index(file_index), BoardHelper.rank_index(file_index)
         return (file_index + rank_index) % 2 != 0
     
     @staticmethod
-    def light_square(square_index):
-        return BoardHelper.light_square(BoardHelper.file_index(square_index), BoardHelper.rank_index(square_index))
-    
-    @staticmethod
-    def square_name_from_coordinate(file_index, rank_index):
+    def square_name_from_coordinate(file_index, rank_index=None):
+        """Square name (e.g. "e4") from file and rank indices, or from a Coord object"""
+        if rank_index is None:
+            file_index, rank_index = file_index.file_index, file_index.rank_index
         return BoardHelper.file_names[file_index] + str(rank_index + 1)
     
     @staticmethod
@@ -57,10 +54,6 @@ class BoardHelper:
         coord = BoardHelper.coord_from_index(square_index)
         return BoardHelper.square_name_from_coordinate(coord.file_index, coord.rank_index)
     
-    @staticmethod
-    def square_name_from_coordinate(coord):
-        return BoardHelper.square_name_from_coordinate(coord.file_index, coord.rank_index)
-    
     @staticmethod
     def square_index_from_name(name):
         file_name = name[0]
@@ -87,7 +80,7 @@ class BoardHelper:
                 file_index = x if black_at_top else 7 - x
                 square_index = BoardHelper.index_from_coord(file_index, rank_index)
                 highlight = square_index == last_move_square
-                piece = board.squares[square_index]
+                piece = board.square[square_index]
                 symbol = Piece.get_symbol(piece)
 
                 if highlight:
@@ -110,6 +103,8 @@ class BoardHelper:
                 result.append("")
 
                 if include_fen:
+                    # Imported here since fenUtility imports this module
+                    from Helpers.fenUtility import FenUtility
                     result.append(f"Fen         : {FenUtility.current_fen(board)}")
 
                 if include_zobrist_key:
@@ -0,0 +1,86 @@
+from Helpers.fileUtility import FileUtility
+
+class EpdReader:
+    """
+    Streaming reader for EPD files (test suites, training sets).
+    Each line holds the first four FEN fields followed by opcodes, e.g.
+        r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - bm Bb5; id "Ruy Lopez";
+    Lines are read lazily, so files of any size can be processed without loading them into memory
+    """
+
+    @staticmethod
+    def read(path):
+        """
+        Yield (fen, opcodes) for every position in the file, where opcodes maps each opcode to its operand string
+        """
+        with FileUtility.open_text(path) as file:
+            yield from EpdReader.read_lines(file)
+
+    @staticmethod
+    def read_lines(lines):
+        """
+        Yield (fen, opcodes) for each non-empty, non-comment line of an iterable of EPD lines
+        """
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield EpdReader.parse_line(line)
+
+    @staticmethod
+    def parse_line(line):
+        """
+        Split an EPD line into a full FEN string and a dict of opcodes.
+        The halfmove clock and fullmove number are taken from the hmvc/fmvn opcodes if present
+        """
+        fields = line.split(None, 4)
+        opcodes = EpdReader.parse_opcodes(fields[4]) if len(fields) > 4 else {}
+
+        halfmove_clock = opcodes.get("hmvc", "0")
+        fullmove_number = opcodes.get("fmvn", "1")
+        fen = ' '.join(fields[:4]) + f" {halfmove_clock} {fullmove_number}"
+        return fen, opcodes
+
+    @staticmethod
+    def parse_opcodes(text):
+        """
+        Parse 'opcode operands;' pairs. Operands in double quotes may contain spaces and semicolons
+        """
+        opcodes = {}
+        i = 0
+        length = len(text)
+
+        while i < length:
+            while i < length and text[i] in " \t;":
+                i += 1
+            if i >= length:
+                break
+
+            start = i
+            while i < length and text[i] not in " \t;":
+                i += 1
+            opcode = text[start:i]
+
+            operands = []
+            current = []
+            while i < length and text[i] != ';':
+                c = text[i]
+                if c == '"':
+                    end = text.find('"', i + 1)
+                    end = length if end == -1 else end
+                    current.append(text[i + 1:end])
+                    i = end + 1
+                    continue
+                if c in " \t":
+                    if current:
+                        operands.append(''.join(current))
+                        current = []
+                else:
+                    current.append(c)
+                i += 1
+            if current:
+                operands.append(''.join(current))
+
+            opcodes[opcode] = ' '.join(operands)
+            i += 1
+
+        return opcodes
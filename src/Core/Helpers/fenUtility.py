@@ -1,12 +1,24 @@
 from collections import namedtuple
 from Board.piece import Piece
-from boardHelpers import BoardHelper
+from Helpers.boardHelpers import BoardHelper
 from Board.coord import Coord
+from Board.move import Move
 
 # Helper class for dealing with FEN strings
 class FenUtility:
     StartPositionFEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 
+    # Piece code for each FEN piece symbol
+    PieceSymbols = {
+        'P': Piece.WhitePawn, 'N': Piece.WhiteKnight, 'B': Piece.WhiteBishop,
+        'R': Piece.WhiteRook, 'Q': Piece.WhiteQueen, 'K': Piece.WhiteKing,
+        'p': Piece.BlackPawn, 'n': Piece.BlackKnight, 'b': Piece.BlackBishop,
+        'r': Piece.BlackRook, 'q': Piece.BlackQueen, 'k': Piece.BlackKing
+    }
+
+    # Castling rights bit for each FEN castling symbol (same bits as GameState)
+    CastlingSymbols = {'K': 1, 'Q': 2, 'k': 4, 'q': 8}
+
     @staticmethod
     def position_from_fen(fen):
         """
@@ -28,7 +40,7 @@ class FenUtility:
             num_empty_files = 0
             for file in range(8):
                 i = rank * 8 + file
-                piece = board.squares[i]
+                piece = board.square[i]
                 if piece != 0:
                     if num_empty_files != 0:
                         fen += str(num_empty_files)
@@ -41,7 +53,7 @@ class FenUtility:
                     elif piece_type == Piece.Knight:
                         piece_char = 'N'
                     elif piece_type == Piece.Bishop:
-                        piece_type = 'B'
+                        piece_char = 'B'
                     elif piece_type == Piece.Queen:
                         piece_char = 'Q'
                     elif piece_type == Piece.King:
@@ -105,7 +117,7 @@ class FenUtility:
         friendly_pawn = Piece.make_piece(Piece.Pawn, board.move_color)
 
         def can_capture(from_coord):
-            if from_coord.is_valid_square() and board.squares[from_coord.square_index] == friendly_pawn:
+            if from_coord.is_valid_square() and board.square[from_coord.square_index] == friendly_pawn:
                 move = Move(from_coord.square_index, ep_capture_square, Move.EnPassantCaptureFlag)
                 board.make_move(move)
                 board.make_null_move()
@@ -120,6 +132,11 @@ class FenUtility:
     
     @staticmethod
     def flip_fen(fen):
+        def invert_case(c):
+            if c.islower():
+                return c.upper()
+            return c.lower()
+
         flipped_fen = ""
         sections = fen.split(' ')
 
@@ -148,11 +165,6 @@ class FenUtility:
         flipped_fen += " " + flipped_ep
         flipped_fen += " " + sections[4] + " " + sections[5]
 
-        def invert_case(c):
-            if c.islower():
-                return c.upper()
-            return c.lower()
-        
         return flipped_fen
     
         
@@ -203,7 +215,7 @@ class FenUtility:
             # Default values
             self.ep_file = 0
             self.fifty_move_ply_count = 0
-            self.move_count = 0
+            self.move_count = 1
 
             if len(sections) > 3:
                 en_passant_file_name = sections[3][0]
@@ -0,0 +1,15 @@
+import bz2
+import gzip
+
+class FileUtility:
+
+    @staticmethod
+    def open_text(path):
+        """
+        Open a (possibly gzip or bz2 compressed) text file for reading
+        """
+        if path.endswith(".gz"):
+            return gzip.open(path, 'rt', errors='replace')
+        if path.endswith(".bz2"):
+            return bz2.open(path, 'rt', errors='replace')
+        return open(path, 'r', errors='replace')
@@ -0,0 +1,42 @@
+import threading
+
+class LazyTable:
+    """
+    Precomputed class-level table that is only built when first read, so that importing a module doesn't pay
+    for its tables. Declare each table with its empty initial value, e.g. KingMoves = LazyTable([0] * 64):
+    the first read of any lazy table of a class runs the class's initialize method, which fills the tables in place,
+    then every lazy table is replaced by its plain value, so later reads are ordinary attribute lookups
+    """
+    # Reentrant, since initialize reads (and fills) the tables of its own class
+    lock = threading.RLock()
+    initializing = set()
+
+    def __init__(self, initial_value):
+        self.initial_value = initial_value
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        owner = owner or type(instance)
+        with LazyTable.lock:
+            if owner.__dict__.get(self.name) is self:
+                # Reads from within initialize see the tables being filled
+                if owner in LazyTable.initializing:
+                    return self.initial_value
+                LazyTable.initialize(owner)
+        return owner.__dict__[self.name]
+
+    @staticmethod
+    def initialize(owner):
+        LazyTable.initializing.add(owner)
+        try:
+            owner.initialize()
+        finally:
+            LazyTable.initializing.discard(owner)
+
+        # Tables that initialize assigned outright (rather than filling in place) have already replaced their descriptor
+        for name, value in list(vars(owner).items()):
+            if isinstance(value, LazyTable):
+                setattr(owner, name, value.initial_value)
@@ -1,14 +1,22 @@
-from boardHelpers import BoardHelper
+from Helpers.boardHelpers import BoardHelper
 from Board.piece import Piece
 from Board.coord import Coord
 from Board.move import Move
 from Move_Generation.moveGenerator import MoveGenerator
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
+from Move_Generation.Magics.magic import Magic
 
 class MoveUtility:
     """
     Helper class for handling chess moves, including conversion between
     UCI/SAN notations and internal move representations
     """
+    SanPromotionFlags = {
+        'Q': Move.PromoteToQueenFlag,
+        'R': Move.PromoteToRookFlag,
+        'B': Move.PromoteToBishopFlag,
+        'N': Move.PromoteToKnightFlag
+    }
 
     @staticmethod
     def get_move_from_uci_name(move_name, board):
@@ -21,7 +29,7 @@ class MoveUtility:
         start_square = BoardHelper.square_index_from_name(move_name[:2])
         target_square = BoardHelper.square_index_from_name(move_name[2:4])
 
-        moved_piece_type = Piece.piece_type(board.squares[start_square])
+        moved_piece_type = Piece.piece_type(board.square[start_square])
         start_coord = Coord(start_square)
         target_coord = Coord(target_square)
 
@@ -43,7 +51,7 @@ class MoveUtility:
                 flag = Move.PawnTwoUpFlag
 
             # En-passant
-            elif start_coord.file_index != target_coord.file_index and board.squares[target_square] == Piece.NoneType:
+            elif start_coord.file_index != target_coord.file_index and board.square[target_square] == Piece.NoneType:
                 flag = Move.EnPassantCaptureFlag
 
         elif moved_piece_type == Piece.King:
@@ -81,156 +89,214 @@ class MoveUtility:
         """
         if move.is_null:
             return "Null"
-        
-        move_piece_type = Piece.piece_type(board.squares[move.start_square])
-        captured_piece_type = Piece.piece_type(board.squares[move.target_square])
+
+        move_generator = MoveGenerator()
+        move_notation = MoveUtility.get_move_name_san_without_check(move, board, move_generator.generate_moves(board))
+
+        # Only a checking move needs the replies to be generated (to tell check from checkmate)
+        if move_generator.gives_check(board, move):
+            board.make_move(move, in_search=True)
+            has_legal_reply = len(move_generator.generate_moves(board)) > 0
+            board.unmake_move(move, in_search=True)
+            move_notation += "+" if has_legal_reply else "#"
+
+        return move_notation
+
+    @staticmethod
+    def moves_to_san(board, moves):
+        """
+        Get the SAN names of a sequence of moves (e.g. a game or principal variation) played from the current position.
+        Legal moves are generated once per position: the list generated after making a move decides between
+        check and checkmate for that move, and is then used to disambiguate the next move.
+        The board is left in its original position
+        """
+        move_generator = MoveGenerator()
+        legal_moves = move_generator.generate_moves(board)
+        names = []
+        made_moves = []
+
+        for move in moves:
+            if move.is_null:
+                break
+            move_notation = MoveUtility.get_move_name_san_without_check(move, board, legal_moves)
+
+            board.make_move(move, in_search=True)
+            made_moves.append(move)
+            legal_moves = move_generator.generate_moves(board)
+
+            if move_generator.in_check:
+                move_notation += "+" if legal_moves else "#"
+            names.append(move_notation)
+
+        for move in reversed(made_moves):
+            board.unmake_move(move, in_search=True)
+
+        return names
+
+    @staticmethod
+    def get_move_name_san_without_check(move, board, legal_moves):
+        """
+        SAN of the move without the check/checkmate suffix.
+        legal_moves (the legal moves in the current position) are used to find other pieces that could reach the same square
+        """
+        move_piece_type = Piece.piece_type(board.square[move.start_square])
+        captured_piece_type = Piece.piece_type(board.square[move.target_square])
 
         if move.move_flag == Move.CastleFlag:
-            delta = move.target_square - move.start_square
-            if delta == 2:
-                return "O-O"
-            elif delta == -2:
-                return "O-O-O"
-            
-        move_gen = MoveGenerator()
-        move_notation = Piece.get_symbol(move_piece_type).upper() if move_piece_type != Piece.Pawn else ""
+            return "O-O" if move.target_square > move.start_square else "O-O-O"
+
+        move_notation = Piece.get_symbol(move_piece_type) if move_piece_type != Piece.Pawn else ""
 
         # Check if ambiguity exists in notation (e.g., if e2 can be reached via Nfe2 and Nbe2)
         if move_piece_type != Piece.Pawn and move_piece_type != Piece.King:
-            all_moves = move_gen.generate_moves(board)
-
-            for alt_move in all_moves:
-                if alt_move.start_square != move.start_square and alt_move.target_square == move.target_square:
-                    if Piece.piece_type(board.squares[alt_move.start_square]) == move_piece_type:
-                        from_file_index = BoardHelper.file_index(move.start_square)
-                        alternate_from_file_index = BoardHelper.file_index(alt_move.start_square)
-                        from_rank_index = BoardHelper.rank_index(move.start_square)
-                        alternate_from_rank_index = BoardHelper.rank_index(alt_move.start_square)
-
-                        if from_file_index != alternate_from_file_index:
-                            move_notation += BoardHelper.file_names[from_file_index]
-                            break # Ambiguity resolved
-                        
-                        elif from_rank_index != alternate_from_rank_index:
-                            move_notation += BoardHelper.rank_names[from_rank_index]
-                            break # Ambiguity resolved
-        
-        if captured_piece_type != 0:
-            # Add 'x' to indicate capture
+            from_file_index = BoardHelper.file_index(move.start_square)
+            from_rank_index = BoardHelper.rank_index(move.start_square)
+            is_ambiguous = False
+            file_is_ambiguous = False
+            rank_is_ambiguous = False
+
+            for alt_move in legal_moves:
+                if (alt_move.target_square == move.target_square and alt_move.start_square != move.start_square
+                        and Piece.piece_type(board.square[alt_move.start_square]) == move_piece_type):
+                    is_ambiguous = True
+                    file_is_ambiguous |= BoardHelper.file_index(alt_move.start_square) == from_file_index
+                    rank_is_ambiguous |= BoardHelper.rank_index(alt_move.start_square) == from_rank_index
+
+            if is_ambiguous:
+                if not file_is_ambiguous:
+                    move_notation += BoardHelper.file_names[from_file_index]
+                elif not rank_is_ambiguous:
+                    move_notation += BoardHelper.rank_names[from_rank_index]
+                else:
+                    move_notation += BoardHelper.square_name_from_index(move.start_square)
+
+        if captured_piece_type != Piece.NoneType or move.move_flag == Move.EnPassantCaptureFlag:
             if move_piece_type == Piece.Pawn:
-                move_notation += BoardHelper.file_names[BoardHelper.file_index(move.start_square)] + "x"
+                move_notation += BoardHelper.file_names[BoardHelper.file_index(move.start_square)]
             move_notation += "x"
-        else:
-            # Check if capturing en passant
-            if move.move_flag == Move.EnPassantCaptureFlag:
-                move_notation += BoardHelper.file_names[BoardHelper.file_index(move.start_square)] + "x"
 
-        move_notation += BoardHelper.file_names[BoardHelper.file_index(move.target_square)]
-        move_notation += BoardHelper.rank_names[BoardHelper.rank_index(move.target_square)]
+        move_notation += BoardHelper.square_name_from_index(move.target_square)
 
-        # Add promotion piece
         if move.is_promotion:
-            promotion_piece_type = move.promotion_piece_type
-            move_notation += "=" + Piece.get_symbol(promotion_piece_type).upper()
-
-        board.make_move(move, in_search=True)
-        legal_responses = move_gen.generate_moves(board)
-        # Add check/mate symbol if applicable
-        if move_gen.in_check():
-            move_notation += "#" if not legal_responses else "+"
-
-        board.unmake_move(move, in_search=True)
+            move_notation += "=" + Piece.get_symbol(move.promotion_piece_type)
 
         return move_notation
-    
+
     @staticmethod
     def get_move_from_san(board, algebraic_move):
         """
-        Get move from the given name in SAN notation (e.g., "Nxf3", "Rad1", "O-O", etc.).
+        Get move from the given name in SAN notation (e.g., "Nxf3", "Rad1", "O-O", "exd8=Q+", etc.).
         The given board must contain the position from before the move was made.
+        Candidate start squares are found directly from the target square with reverse attack lookups
+        (a knight on the target square attacks exactly the squares a knight could have come from, and so on).
+        A single candidate is checked with MoveGenerator.is_legal; legal moves are only generated when more than one
+        candidate remains, e.g. when one of them is pinned.
+        Returns a null move if the SAN does not match a legal move in the position
         """
-        move_generator = MoveGenerator()
+        san = algebraic_move.rstrip("+#!?")
+        king_square = board.king_square[board.move_color_index]
+
+        if san in ("O-O", "0-0"):
+            return MoveUtility.legal_or_null(board, Move(king_square, king_square + 2, Move.CastleFlag))
+        if san in ("O-O-O", "0-0-0"):
+            return MoveUtility.legal_or_null(board, Move(king_square, king_square - 2, Move.CastleFlag))
+
+        promotion_flag = Move.NoFlag
+        if san[-1] in MoveUtility.SanPromotionFlags:
+            promotion_flag = MoveUtility.SanPromotionFlags[san[-1]]
+            san = san[:-2] if san[-2] == '=' else san[:-1]
+
+        if len(san) < 2 or san[-2] not in BoardHelper.file_names or san[-1] not in BoardHelper.rank_names:
+            return Move.null_move()
+        target_square = BoardHelper.square_index_from_name(san[-2:])
+
+        piece_type = Piece.get_piece_type_from_symbol(san[0]) if san[0].isupper() else Piece.Pawn
+        disambiguation = san[1 if piece_type != Piece.Pawn else 0:-2].replace('x', '')
+        friendly_pieces = board.piece_bitboards[Piece.make_piece(piece_type, board.move_color)]
+
+        if piece_type == Piece.Pawn:
+            candidates = MoveUtility.get_pawn_move_origins(board, target_square, friendly_pieces, is_capture='x' in san)
+        else:
+            candidates = MoveUtility.get_attackers_of_type(board, piece_type, target_square) & friendly_pieces
+
+        for char in disambiguation:
+            if char in BoardHelper.file_names:
+                candidates &= BitBoardUtility.FileA << BoardHelper.file_names.index(char)
+            elif char in BoardHelper.rank_names:
+                candidates &= 0xFF << (8 * BoardHelper.rank_names.index(char))
+
+        if candidates == 0:
+            return Move.null_move()
+
+        if candidates & (candidates - 1) == 0:
+            start_square = BitBoardUtility.lsb(candidates)
+            move = Move(start_square, target_square, MoveUtility.get_flag(board, piece_type, start_square, target_square, promotion_flag))
+            return MoveUtility.legal_or_null(board, move)
+
+        # Several pseudo-legal candidates: only one of them can be legal (otherwise the SAN would have been disambiguated)
+        for move in MoveGenerator().generate_moves(board):
+            if (move.target_square == target_square and (candidates >> move.start_square) & 1
+                    and (promotion_flag == Move.NoFlag or move.move_flag == promotion_flag)):
+                return move
+        return Move.null_move()
+
+    @staticmethod
+    def legal_or_null(board, move):
+        """
+        The move if it is legal in the position (a candidate found from the SAN may be pinned, or leave the king in check), else a null move
+        """
+        return move if MoveGenerator().is_legal(board, move) else Move.null_move()
+
+    @staticmethod
+    def get_attackers_of_type(board, piece_type, target_square):
+        """
+        Squares from which a piece of the given type (knight, bishop, rook, queen or king) attacks the target square
+        """
+        if piece_type == Piece.Knight:
+            return BitBoardUtility.KnightAttacks[target_square]
+        if piece_type == Piece.King:
+            return BitBoardUtility.KingMoves[target_square]
+
+        blockers = board.all_pieces_bitboard
+        if piece_type == Piece.Bishop:
+            return Magic.get_bishop_attacks(target_square, blockers)
+        if piece_type == Piece.Rook:
+            return Magic.get_rook_attacks(target_square, blockers)
+        return Magic.get_bishop_attacks(target_square, blockers) | Magic.get_rook_attacks(target_square, blockers)
+
+    @staticmethod
+    def get_pawn_move_origins(board, target_square, friendly_pawns, is_capture):
+        """
+        Squares of friendly pawns that can move to the target square: diagonally behind it for captures,
+        one (or, from the starting rank, two) squares behind it for pushes
+        """
+        if is_capture:
+            # A white pawn attacks the target square from the squares a black pawn on the target square would attack
+            attack_table = BitBoardUtility.BlackPawnAttacks if board.is_white_to_move else BitBoardUtility.WhitePawnAttacks
+            return attack_table[target_square] & friendly_pawns
+
+        direction = -8 if board.is_white_to_move else 8
+        one_behind = target_square + direction
+        if not 0 <= one_behind < 64:
+            return 0
+        if (friendly_pawns >> one_behind) & 1:
+            return 1 << one_behind
+
+        double_push_rank = 3 if board.is_white_to_move else 4
+        two_behind = one_behind + direction
+        if BoardHelper.rank_index(target_square) == double_push_rank and board.square[one_behind] == Piece.NoneType:
+            return friendly_pawns & (1 << two_behind)
+        return 0
 
-        # Remove unrequired info from move string
-        algebraic_move = algebraic_move.replace("+", "").replace("#", "").replace("x", "").replace("-", "")
-        all_moves = move_generator.generate_moves(board)
-
-        move = Move()
-
-        for move_to_test in all_moves:
-            move = move_to_test
-
-            move_from_index = move.start_square
-            move_to_index = move.target_square
-            move_piece_type = Piece.piece_type(board.squares[move_from_index])
-            from_coord = BoardHelper.coord_from_index(move_from_index)
-            to_coord = BoardHelper.coord_from_index(move_to_index)
-
-            if algebraic_move == "OO":
-                # Castle kingside
-                if move_piece_type == Piece.King and move_to_index - move_from_index == 2:
-                    return move
-            elif algebraic_move == "OOO":
-                # Castle queenside
-                if move_piece_type == Piece.King and move_to_index - move_from_index == -2:
-                    return move
-            # Is pawn move if starts with any file indicator (e.g., 'e'4. Note that uppercase B is used for bishops)
-            elif algebraic_move[0] in BoardHelper.file_names:
-                if move_piece_type != Piece.Pawn:
-                    continue
-                if BoardHelper.file_names.index(algebraic_move[0]) == from_coord.file_index:
-                    # Correct starting file
-                    if '=' in algebraic_move:
-                        # Is promotion
-                        if to_coord.rank_index == 0 or to_coord.rank_index == 7:
-                            if len(algebraic_move) == 5:  # Pawn is capturing to promote
-                                target_file = algebraic_move[1]
-                                if BoardHelper.file_names.index(target_file) != to_coord.file_index:
-                                    # Skip if not moving to correct file
-                                    continue
-
-                            promotion_char = algebraic_move[-1]
-
-                            if move.promotion_piece_type != Piece.get_piece_type_from_symbol(promotion_char):
-                                continue  # Skip this move, incorrect promotion type
-
-                            return move
-                    else:
-                        target_file = algebraic_move[-2]
-                        target_rank = algebraic_move[-1]
-
-                        if BoardHelper.file_names.index(target_file) == to_coord.file_index:
-                            # Correct ending file
-                            if target_rank == str(to_coord.rank_index + 1):
-                                # Correct ending rank
-                                break
-            else:
-                # Regular piece move
-                move_piece_char = algebraic_move[0]
-                if Piece.get_piece_type_from_symbol(move_piece_char) != move_piece_type:
-                    continue  # Skip this move, incorrect move piece type
-
-                target_file = algebraic_move[-2]
-                target_rank = algebraic_move[-1]
-                if BoardHelper.file_names.index(target_file) == to_coord.file_index:
-                    # Correct ending file
-                    if target_rank == str(to_coord.rank_index + 1):
-                        # Correct ending rank
-                        if len(algebraic_move) == 4:
-                            # Additional char present for disambiguation (e.g., Nbd7 or R7e2)
-                            disambiguation_char = algebraic_move[1]
-
-                            if disambiguation_char in BoardHelper.file_names:
-                                # Is file disambiguation
-                                if BoardHelper.file_names.index(disambiguation_char) != from_coord.file_index:
-                                    # Incorrect starting file
-                                    continue
-                            else:
-                                # Is rank disambiguation
-                                if disambiguation_char != str(from_coord.rank_index + 1):
-                                    # Incorrect starting rank
-                                    continue
-
-                        return move  # Move has been found
-
-        return move  # Return the found move or a default move if not found
\ No newline at end of file
+    @staticmethod
+    def get_flag(board, piece_type, start_square, target_square, promotion_flag):
+        if piece_type == Piece.Pawn:
+            if promotion_flag != Move.NoFlag:
+                return promotion_flag
+            if abs(target_square - start_square) == 16:
+                return Move.PawnTwoUpFlag
+            if (target_square - start_square) % 8 != 0 and board.square[target_square] == Piece.NoneType:
+                return Move.EnPassantCaptureFlag
+        elif piece_type == Piece.King and abs(target_square - start_square) == 2:
+            return Move.CastleFlag
+        return Move.NoFlag
@@ -0,0 +1,124 @@
+import re
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+
+class PGNGame:
+    """
+    A game read from a PGN file: tag pairs, mainline moves (in SAN), comments and result
+    """
+    def __init__(self):
+        self.headers = {}
+        self.moves = []
+        # (ply, text) pairs, where ply is the number of mainline moves played before the comment
+        self.comments = []
+        self.result = "*"
+
+    @property
+    def start_fen(self):
+        return self.headers.get("FEN", FenUtility.StartPositionFEN)
+
+    @property
+    def is_empty(self):
+        return not self.headers and not self.moves
+
+
+class PGNReader:
+    """
+    Incremental PGN reader. Games are yielded one at a time as the file is read line by line,
+    so databases of any size can be processed without loading them into memory.
+    Variations (including any comments inside them) and NAGs are skipped; only the mainline is kept
+    """
+    HeaderPattern = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+
+    # Movetext tokens: comment start, rest-of-line comment, variation start/end, NAG, result, move number, SAN move
+    TokenPattern = re.compile(r'(\{)|(;)|(\()|(\))|(\$\d+)|(1-0|0-1|1/2-1/2|\*)|(\d+\.+)|([A-Za-z0-9][A-Za-z0-9=+#\-]*)[!?]*')
+
+    @staticmethod
+    def read_games(file):
+        """
+        Yield a PGNGame for every game in the given file handle (or any iterable of lines)
+        """
+        game = PGNGame()
+        has_movetext = False
+        comment = None
+        variation_depth = 0
+
+        for line in file:
+            # Continuation of a multi-line {...} comment
+            if comment is not None:
+                end = line.find('}')
+                if end == -1:
+                    comment.append(line.strip())
+                    continue
+                comment.append(line[:end].strip())
+                if variation_depth == 0:
+                    game.comments.append((len(game.moves), ' '.join(comment).strip()))
+                comment = None
+                line = line[end + 1:]
+
+            stripped = line.strip()
+            if not stripped or stripped[0] == '%':
+                continue
+
+            if stripped[0] == '[' and comment is None:
+                header = PGNReader.HeaderPattern.match(stripped)
+                if header is not None:
+                    # Tag pairs after movetext belong to the next game (the previous one had no result token)
+                    if has_movetext:
+                        yield game
+                        game = PGNGame()
+                        has_movetext = False
+                        variation_depth = 0
+                    game.headers[header.group(1)] = header.group(2).replace('\\"', '"')
+                    continue
+
+            has_movetext = True
+            position = 0
+            while position < len(line):
+                token = PGNReader.TokenPattern.search(line, position)
+                if token is None:
+                    break
+                position = token.end()
+                comment_start, line_comment, variation_start, variation_end, nag, result, move_number, san = token.groups()
+
+                if comment_start:
+                    end = line.find('}', position)
+                    if end == -1:
+                        comment = [line[position:].strip()]
+                        break
+                    if variation_depth == 0:
+                        game.comments.append((len(game.moves), line[position:end].strip()))
+                    position = end + 1
+                elif line_comment:
+                    if variation_depth == 0:
+                        game.comments.append((len(game.moves), line[position:].strip()))
+                    break
+                elif variation_start:
+                    variation_depth += 1
+                elif variation_end:
+                    variation_depth = max(0, variation_depth - 1)
+                elif result:
+                    if variation_depth == 0:
+                        game.result = result
+                        yield game
+                        game = PGNGame()
+                        has_movetext = False
+                elif san and variation_depth == 0:
+                    game.moves.append(san)
+
+        if not game.is_empty:
+            yield game
+
+    @staticmethod
+    def read_game_moves(game, board):
+        """
+        Load the game's start position on the board and yield each mainline move just before it is made.
+        Stops early if a move cannot be resolved
+        """
+        board.load_fen_fast(game.start_fen)
+        for san in game.moves:
+            move = MoveUtility.get_move_from_san(board, san)
+            if move.is_null:
+                return
+            yield move
+            board.make_move(move)
@@ -0,0 +1,129 @@
+from Board.board import Board
+from Helpers.moveUtility import MoveUtility
+from Helpers.fenUtility import FenUtility
+from Game_Result.gameResult import GameResult
+
+class PGNWriter:
+    """
+    Writes games as PGN to a file handle, one after another. A single board is reused for every game
+    (to render the moves in SAN) and the output is flushed every few games, so very large numbers of games
+    can be written without holding them in memory
+    """
+    SevenTagRoster = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+    MaxLineLength = 80
+
+    WhiteWinsResults = {GameResult.BlackIsMated, GameResult.BlackTimeout, GameResult.BlackIllegalMove}
+    BlackWinsResults = {GameResult.WhiteIsMated, GameResult.WhiteTimeout, GameResult.WhiteIllegalMove}
+    DrawResults = {GameResult.Stalemate, GameResult.Repetition, GameResult.FiftyMoveRule,
+                   GameResult.InsufficientMaterial, GameResult.DrawByArbiter}
+
+    def __init__(self, output, flush_interval=100):
+        """
+        output is either a path (opened for appending) or a writable text file handle
+        """
+        self.owns_file = isinstance(output, str)
+        self.file = open(output, 'a', buffering=1 << 16) if self.owns_file else output
+        self.flush_interval = flush_interval
+        self.board = Board()
+        self.num_games_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.file.flush()
+        if self.owns_file:
+            self.file.close()
+
+    @staticmethod
+    def get_result_token(result):
+        """
+        PGN result token ("1-0", "0-1", "1/2-1/2" or "*") for a GameResult
+        """
+        if result in PGNWriter.WhiteWinsResults:
+            return "1-0"
+        if result in PGNWriter.BlackWinsResults:
+            return "0-1"
+        if result in PGNWriter.DrawResults:
+            return "1/2-1/2"
+        return "*"
+
+    @staticmethod
+    def escape_tag_value(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ').replace('\r', '')
+
+    def write_game(self, moves, result=None, start_fen=None, white_name="?", black_name="?", headers=None, comments=None):
+        """
+        Append a game to the output.
+        headers: additional (or overriding) tag pairs, e.g. {"Event": "Self-play", "Round": "12"}
+        comments: optional list of comments (or None) aligned with moves, written after the corresponding move
+        """
+        start_fen = (start_fen or FenUtility.StartPositionFEN).replace("\n", "").replace("\r", "")
+        result_token = result if isinstance(result, str) else PGNWriter.get_result_token(result)
+
+        tags = dict.fromkeys(PGNWriter.SevenTagRoster, "?")
+        tags["Date"] = "????.??.??"
+        tags["White"] = white_name or "?"
+        tags["Black"] = black_name or "?"
+        if start_fen != FenUtility.StartPositionFEN:
+            tags["SetUp"] = "1"
+            tags["FEN"] = start_fen
+        if headers:
+            tags.update(headers)
+        tags["Result"] = result_token
+
+        lines = [f'[{name} "{PGNWriter.escape_tag_value(value)}"]' for name, value in tags.items()]
+        lines.append("")
+
+        self.board.load_fen_fast(start_fen)
+        start_ply = self.board.ply_count
+        move_names = MoveUtility.moves_to_san(self.board, moves)
+        lines.extend(PGNWriter.format_movetext(move_names, result_token, start_ply, comments))
+        lines.append("")
+
+        self.file.write('\n'.join(lines) + '\n')
+        self.num_games_written += 1
+        if self.num_games_written % self.flush_interval == 0:
+            self.file.flush()
+
+    def write_board(self, board, result, white_name="?", black_name="?", headers=None):
+        """
+        Append the game played on the given board (from its start position)
+        """
+        self.write_game(board.all_game_moves, result, board.game_start_fen, white_name, black_name, headers)
+
+    @staticmethod
+    def format_movetext(move_names, result_token, start_ply, comments=None):
+        """
+        Movetext lines (wrapped at MaxLineLength), with move numbers, comments and the result token
+        """
+        tokens = []
+        needs_move_number = True
+        for i, move_name in enumerate(move_names):
+            ply = start_ply + i
+            if ply % 2 == 0:
+                tokens.append(f"{ply // 2 + 1}.")
+            elif needs_move_number:
+                tokens.append(f"{ply // 2 + 1}...")
+            tokens.append(move_name)
+            needs_move_number = False
+
+            comment = comments[i] if comments is not None and i < len(comments) else None
+            if comment:
+                tokens.append("{" + comment.replace("}", ")") + "}")
+                needs_move_number = True
+        tokens.append(result_token)
+
+        lines = []
+        current = ""
+        for token in tokens:
+            if current and len(current) + 1 + len(token) > PGNWriter.MaxLineLength:
+                lines.append(current)
+                current = token
+            else:
+                current = f"{current} {token}" if current else token
+        lines.append(current)
+        return lines
@@ -1,4 +1,4 @@
-import numpy as np
+from Helpers.lazyTable import LazyTable
 
 class BitBoardUtility:
     # Constants representing files and ranks
@@ -16,23 +16,70 @@ class BitBoardUtility:
     notAFile = ~FileA & ((1 << 64) - 1) # Masking to ensure 64-bit
     notHFile = ~(FileA << 7) & ((1 << 64) - 1) # Masking to ensure 64 bit
 
-    # Static variables for attack bitboards
-    KnightAttacks = [0] * 64
-    KingMoves = [0] * 64
-    WhitePawnAttacks = [0] * 64
-    BlackPawnAttacks = [0] * 64
+    # Static variables for attack bitboards (built by initialize on first use)
+    KnightAttacks = LazyTable([0] * 64)
+    KingMoves = LazyTable([0] * 64)
+    WhitePawnAttacks = LazyTable([0] * 64)
+    BlackPawnAttacks = LazyTable([0] * 64)
+
+    # Square indices of the set bits of every 16 bit value, in ascending order
+    SquareChunks = LazyTable([()] * (1 << 16))
 
     @staticmethod
-    def pop_lsb(bitboard):
+    def lsb(bitboard):
         """
-        Get index of least significant set bit in given 64bit value. Also clears the bit to zero
+        Index of the least significant set bit (-1 for an empty bitboard)
         """
-        if bitboard == 0:
-            return -1
-        
-        lsb_index = (bitboard & -bitboard).bit_length() - 1
-        bitboard &= bitboard - 1
-        return lsb_index
+        return (bitboard & -bitboard).bit_length() - 1
+
+    # Same as lsb. Note that python ints are immutable, so the bit is not cleared in the caller's bitboard:
+    # loop over squares with iter_squares or get_squares instead
+    pop_lsb = lsb
+
+    @staticmethod
+    def msb(bitboard):
+        """
+        Index of the most significant set bit (-1 for an empty bitboard)
+        """
+        return bitboard.bit_length() - 1
+
+    @staticmethod
+    def popcount(bitboard):
+        """
+        Number of set bits
+        """
+        return bitboard.bit_count()
+
+    @staticmethod
+    def iter_squares(bitboard):
+        """
+        Yield the index of every set bit, from least to most significant.
+        Best for sparse bitboards (such as the pieces of one type)
+        """
+        while bitboard:
+            lowest_bit = bitboard & -bitboard
+            yield lowest_bit.bit_length() - 1
+            bitboard ^= lowest_bit
+
+    @staticmethod
+    def get_squares(bitboard):
+        """
+        List of the indices of every set bit, in ascending order, looked up 16 bits at a time.
+        Best for dense bitboards (such as attack sets of sliding pieces)
+        """
+        chunks = BitBoardUtility.SquareChunks
+        squares = list(chunks[bitboard & 0xFFFF])
+        offset = 16
+        bitboard >>= 16
+
+        while bitboard:
+            chunk = bitboard & 0xFFFF
+            if chunk:
+                squares.extend([offset + square for square in chunks[chunk]])
+            bitboard >>= 16
+            offset += 16
+
+        return squares
     
     @staticmethod
     def set_square(bitboard, square_index):
@@ -101,6 +148,10 @@ class BitBoardUtility:
         for y in range(8):
             for x in range(8):
                 BitBoardUtility.process_square(x, y, ortho_dir, diag_dir, knight_jumps)
+
+        # Each chunk's squares are its lowest square followed by the squares of the chunk with that bit cleared
+        for chunk in range(1, 1 << 16):
+            BitBoardUtility.SquareChunks[chunk] = ((chunk & -chunk).bit_length() - 1,) + BitBoardUtility.SquareChunks[chunk & (chunk - 1)]
     
     @staticmethod
     def process_square(x, y, ortho_dir, diag_dir, knight_jumps):
@@ -157,6 +208,3 @@ class BitBoardUtility:
         Check if the given coordinates correspond to a valid square index
         """
         return 0 <= x < 8 and 0 <= y < 8
-    
-# Initialize the bitboards
-BitBoardUtility.initialize()
\ No newline at end of file
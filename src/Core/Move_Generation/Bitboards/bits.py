@@ -1,7 +1,6 @@
-import numpy as np
-from math import clamp
 from Helpers.boardHelpers import BoardHelper
-from bitBoardUtility import BitBoardUtility
+from Helpers.lazyTable import LazyTable
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
 
 class Bits:
     # Constants representing file masks and kingside/queenside masks
@@ -16,17 +15,17 @@ class Bits:
     WhiteQueensideMask = WhiteQueensideMask2 | (1 << BoardHelper.b1)
     BlackQueensideMask = BlackQueensideMask2 | (1 << BoardHelper.b8)
 
-    # Static variables for various bitboard masks
-    WhitePassedPawnMask = [0] * 64
-    BlackPassedPawnMask = [0] * 64
-    WhitePawnSupportMask = [0] * 64
-    BlackPawnSupportMask = [0] * 64
-    FileMask = [0] * 8
-    AdjacentFileMasks = [0] * 8
-    KingSafetyMask = [0] * 64
-    WhiteForwardFileMask = [0] * 64
-    BlackForwardFileMask = [0] * 64
-    TripleFileMask = [0] * 8
+    # Static variables for various bitboard masks (built by initialize on first use)
+    WhitePassedPawnMask = LazyTable([0] * 64)
+    BlackPassedPawnMask = LazyTable([0] * 64)
+    WhitePawnSupportMask = LazyTable([0] * 64)
+    BlackPawnSupportMask = LazyTable([0] * 64)
+    FileMask = LazyTable([0] * 8)
+    AdjacentFileMasks = LazyTable([0] * 8)
+    KingSafetyMask = LazyTable([0] * 64)
+    WhiteForwardFileMask = LazyTable([0] * 64)
+    BlackForwardFileMask = LazyTable([0] * 64)
+    TripleFileMask = LazyTable([0] * 8)
 
     @staticmethod
     def initialize():
@@ -39,7 +38,7 @@ class Bits:
 
         # Initialize triple file masks
         for i in range(8):
-            clamped_file = clamp(i, 1, 6)
+            clamped_file = max(1, min(6, i))
             Bits.TripleFileMask[i] = Bits.FileMask[clamped_file] | Bits.AdjacentFileMasks[clamped_file]
 
         # Initialize passed pawn masks, pawn support masks, and forward file masks
@@ -49,16 +48,16 @@ class Bits:
             adjacent_files = Bits.FileA << max(0, file - 1) | Bits.FileA << min(7, file + 1)
 
             # Passed pawn mask
-            white_forward_mask = ~((1 << (64 - 8 * (rank + 1))) - 1)
+            white_forward_mask = 0xFFFFFFFFFFFFFFFF ^ ((1 << (8 * (rank + 1))) - 1)
             black_forward_mask = (1 << (8 * rank)) - 1
 
             Bits.WhitePassedPawnMask[square] = (Bits.FileA << file | adjacent_files) & white_forward_mask
             Bits.BlackPassedPawnMask[square] = (Bits.FileA << file | adjacent_files) & black_forward_mask
 
             # Pawn support mask
-            adjacent = ((1 << (square - 1)) | (1 << (square + 1))) & adjacent_files
+            adjacent = ((1 << square >> 1) | (1 << (square + 1))) & adjacent_files
             Bits.WhitePawnSupportMask[square] = adjacent | BitBoardUtility.shift(adjacent, -8)
-            Bits.BlackPawnSupportMask[square] = adjacent | BitBoardUtility.shift(adjacent, 8)
+            Bits.BlackPawnSupportMask[square] = (adjacent | BitBoardUtility.shift(adjacent, 8)) & 0xFFFFFFFFFFFFFFFF
 
             Bits.WhiteForwardFileMask[square] = white_forward_mask & Bits.FileMask[file]
             Bits.BlackForwardFileMask[square] = black_forward_mask & Bits.FileMask[file]
@@ -66,6 +65,3 @@ class Bits:
         # Initialize king safety masks
         for i in range(64):
             Bits.KingSafetyMask[i] = BitBoardUtility.KingMoves[i] | (1 << i)
-
-# Initialize the bitboard masks
-Bits.initialize()
\ No newline at end of file
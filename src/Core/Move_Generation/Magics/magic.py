@@ -1,5 +1,6 @@
-from PrecomputedMagics import PrecomputedMagics
-from magicHelper import MagicHelper
+from Move_Generation.Magics.PrecomputedMagics import PrecomputedMagics
+from Move_Generation.Magics.magicHelper import MagicHelper
+from Helpers.lazyTable import LazyTable
 
 RookShifts = PrecomputedMagics.RookShifts
 BishopShifts = PrecomputedMagics.BishopShifts
@@ -8,11 +9,12 @@ BishopMagics = PrecomputedMagics.BishopMagics
 
 class Magic:
     # Rook and bishop mask bitboards for each origin square
-    RookMask = [0] * 64
-    BishopMask = [0] * 64
+    RookMask = LazyTable([0] * 64)
+    BishopMask = LazyTable([0] * 64)
 
-    RookAttacks = [None] * 64
-    BishopAttacks = [None] * 64
+    # Built by initialize on first use
+    RookAttacks = LazyTable([None] * 64)
+    BishopAttacks = LazyTable([None] * 64)
 
     @staticmethod
     def get_slider_attacks(square, blockers, ortho):
@@ -26,7 +28,7 @@ class Magic:
         """
         Get rook attacks for a given square and blocker bitboard
         """
-        key = ((blockers & Magic.RookMask[square]) * RookMagics[square]) >> RookShifts[square]
+        key = (((blockers & Magic.RookMask[square]) * RookMagics[square]) & 0xFFFFFFFFFFFFFFFF) >> RookShifts[square]
         return Magic.RookAttacks[square][key]
     
     @staticmethod
@@ -34,7 +36,7 @@ class Magic:
         """
         Get bishop attacks for a given square and blocker bitboard
         """
-        key = ((blockers & Magic.BishopMask[square]) * BishopMagics[square]) >> BishopShifts[square]
+        key = (((blockers & Magic.BishopMask[square]) * BishopMagics[square]) & 0xFFFFFFFFFFFFFFFF) >> BishopShifts[square]
         return Magic.BishopAttacks[square][key]
     
     @staticmethod
@@ -63,11 +65,9 @@ class Magic:
         blocker_patterns = MagicHelper.create_all_blocker_bitboards(movement_mask)
 
         for pattern in blocker_patterns:
-            index = (pattern * magic) >> left_shift
+            # The multiplication overflows in 64 bits (the magic numbers rely on it), so mask before shifting
+            index = ((pattern * magic) & 0xFFFFFFFFFFFFFFFF) >> left_shift
             moves = MagicHelper.legal_move_bitboard_from_blockers(square, pattern, rook)
             table[index] = moves
 
         return table
-    
-# Initialize the Magic class (this mimics the static constructor in C#)
-Magic.initialize()
\ No newline at end of file
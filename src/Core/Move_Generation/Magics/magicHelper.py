@@ -1,6 +1,6 @@
 from Helpers.boardHelpers import BoardHelper
 from Board.coord import Coord
-from Bitboards.bitBoardUtility import BitBoardUtility
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
 
 class MagicHelper:
     @staticmethod
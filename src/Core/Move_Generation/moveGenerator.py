@@ -1,11 +1,11 @@
 from enum import Enum
 from Board.piece import Piece
-from Bitboards.bitBoardUtility import BitBoardUtility
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
 from Board.move import Move
-from Bitboards.bits import Bits
+from Move_Generation.Bitboards.bits import Bits
 from Helpers.boardHelpers import BoardHelper
-from Magics.magic import Magic
-from precomputedMoveData import PrecomputedMoveData
+from Move_Generation.Magics.magic import Magic
+from Move_Generation.precomputedMoveData import PrecomputedMoveData
 
 class PromotionMode(Enum):
     ALL = 1
@@ -32,6 +32,9 @@ class MoveGenerator():
         self.opponent_attack_map = 0
         self.opponent_pawn_attack_map = 0
         self.opponent_sliding_attack_map = 0
+        self.opponent_knight_attack_map = 0
+        self.opponent_king_attack_map = 0
+        self.opponent_piece_attacks = []
         self.generate_quiet_moves = True
         self.board = None
         self.curr_move_index = 0
@@ -42,6 +45,15 @@ class MoveGenerator():
         self.empty_or_enemy_squares = 0
         self.move_type_mask = 0
 
+        # Zobrist key of the position the attack data (pins, checks, attack maps) was last calculated for
+        self.attack_data_key = None
+
+        # Check info for gives_check, calculated once per position: for each piece type, the squares from which
+        # it would attack the enemy king, and the friendly pieces whose move could uncover a check from a friendly slider
+        self.check_info_key = None
+        self.check_squares = [0] * (Piece.King + 1)
+        self.discovered_check_candidates = 0
+
     def generate_moves(self, board, captures_only=False):
         moves = []
         self._generate_moves(board, moves, captures_only)
@@ -62,9 +74,253 @@ class MoveGenerator():
 
         return len(moves)
     
+    def has_legal_moves(self, board):
+        """
+        Whether the side to move has any legal move (i.e. the position is not mate or stalemate).
+        Piece types are generated one at a time, cheapest first, stopping as soon as one of them has a legal move
+        """
+        self.board = board
+        self.generate_quiet_moves = True
+        self._init()
+
+        moves = []
+        self._generate_king_moves(moves)
+        if moves or self.in_double_check:
+            return bool(moves)
+
+        for generate in (self._generate_knight_moves, self._generate_pawn_moves, self._generate_sliding_moves):
+            generate(moves)
+            if moves:
+                return True
+        return False
+
     def is_in_check(self):
         return self.in_check
+
+    def get_opponent_attack_maps(self):
+        """
+        Attack data for the opponent of the side to move, as computed during the last call to generate_moves.
+        Returns (attack map, pawn attack map, per-piece attacks) where per-piece attacks is a list of
+        (square, attack bitboard) pairs for every enemy knight and slider (queens appear once per slide direction).
+        Note that the attack map is computed with the friendly king removed from the sliders' blockers, while the
+        per-piece attacks use the real blockers (the same as Evaluation.get_piece_attacks).
+        """
+        return self.opponent_attack_map, self.opponent_pawn_attack_map, self.opponent_piece_attacks
     
+    def gives_check(self, board, move):
+        """
+        Whether the given (legal) move puts the opponent in check, directly or by discovery, without making it
+        """
+        self._update_check_info(board)
+        start_square = move.start_square
+        target_square = move.target_square
+        flag = move.move_flag
+
+        # Promotions, castling and en passant change the blockers in ways the check squares don't account for
+        if flag != Move.NoFlag and flag != Move.PawnTwoUpFlag:
+            return self._gives_check_special(board, move)
+
+        piece_type = Piece.piece_type(board.square[start_square])
+        if (self.check_squares[piece_type] >> target_square) & 1:
+            return True
+
+        # Discovered check: a piece moves off the line between a friendly slider and the enemy king
+        if (self.discovered_check_candidates >> start_square) & 1:
+            enemy_king_square = board.king_square[1 - board.move_color_index]
+            return (PrecomputedMoveData.align_mask[start_square][enemy_king_square] >> target_square) & 1 == 0
+        return False
+
+    def is_legal(self, board, move):
+        """
+        Whether an arbitrary move (e.g. from the transposition table or a killer slot, which may belong to another position)
+        is legal in the current position. Uses the pin and check data of the position rather than generating all moves
+        """
+        if move is None or move.is_null:
+            return False
+        self._ensure_attack_data(board)
+
+        start_square = move.start_square
+        target_square = move.target_square
+        flag = move.move_flag
+        piece = board.square[start_square]
+        target_bit = 1 << target_square
+
+        if piece == Piece.NoneType or Piece.piece_color(piece) != self.friendly_color or self.friendly_pieces & target_bit:
+            return False
+        if target_square == board.king_square[self.enemy_index]:
+            return False
+
+        piece_type = Piece.piece_type(piece)
+        if piece_type == Piece.King:
+            if flag == Move.CastleFlag:
+                return self._is_legal_castle(start_square, target_square)
+            if flag != Move.NoFlag or not BitBoardUtility.KingMoves[start_square] & target_bit:
+                return False
+            return not self.opponent_attack_map & target_bit
+
+        if self.in_double_check:
+            return False
+
+        if piece_type == Piece.Pawn:
+            if not self._is_pseudo_legal_pawn_move(start_square, target_square, flag):
+                return False
+            if flag == Move.EnPassantCaptureFlag:
+                captured_pawn_square = target_square - (8 if self.is_white_to_move else -8)
+                if not (self.check_ray_bitmask >> captured_pawn_square) & 1 and not self.check_ray_bitmask & target_bit:
+                    return False
+                if self._in_check_after_en_passant(start_square, target_square, captured_pawn_square):
+                    return False
+            elif not self.check_ray_bitmask & target_bit:
+                return False
+        else:
+            if flag != Move.NoFlag:
+                return False
+            if piece_type == Piece.Knight:
+                attacks = BitBoardUtility.KnightAttacks[start_square]
+            elif piece_type == Piece.Bishop:
+                attacks = Magic.get_bishop_attacks(start_square, self.all_pieces)
+            elif piece_type == Piece.Rook:
+                attacks = Magic.get_rook_attacks(start_square, self.all_pieces)
+            else:
+                attacks = Magic.get_bishop_attacks(start_square, self.all_pieces) | Magic.get_rook_attacks(start_square, self.all_pieces)
+            if not attacks & self.check_ray_bitmask & target_bit:
+                return False
+
+        # A pinned piece may only move along the line through its king
+        if self._is_pinned(start_square):
+            align_mask = PrecomputedMoveData.align_mask[start_square][self.friendly_king_square]
+            return (align_mask >> target_square) & 1 != 0
+        return True
+
+    def _ensure_attack_data(self, board):
+        if self.board is not board or self.attack_data_key != board.zobrist_key:
+            self.board = board
+            self.generate_quiet_moves = True
+            self._init()
+
+    def _is_legal_castle(self, start_square, target_square):
+        board = self.board
+        if self.in_check or abs(target_square - start_square) != 2:
+            return False
+
+        white = self.is_white_to_move
+        if start_square != (BoardHelper.e1 if white else BoardHelper.e8):
+            return False
+
+        if target_square > start_square:
+            if not board.current_game_state.has_kingside_castle_right(white):
+                return False
+            path_mask = Bits.WhiteKingsideMask if white else Bits.BlackKingsideMask
+            return not path_mask & (self.all_pieces | self.opponent_attack_map)
+
+        if not board.current_game_state.has_queenside_castle_right(white):
+            return False
+        empty_mask = Bits.WhiteQueensideMask if white else Bits.BlackQueensideMask
+        safe_mask = Bits.WhiteQueensideMask2 if white else Bits.BlackQueensideMask2
+        return not empty_mask & self.all_pieces and not safe_mask & self.opponent_attack_map
+
+    def _is_pseudo_legal_pawn_move(self, start_square, target_square, flag):
+        board = self.board
+        push_offset = 8 if self.is_white_to_move else -8
+        target_rank = BoardHelper.rank_index(target_square)
+        is_promotion_rank = target_rank == (7 if self.is_white_to_move else 0)
+        is_promotion = flag >= Move.PromoteToQueenFlag
+
+        if is_promotion != is_promotion_rank:
+            return False
+
+        if flag == Move.PawnTwoUpFlag:
+            start_rank = 1 if self.is_white_to_move else 6
+            return (BoardHelper.rank_index(start_square) == start_rank and target_square == start_square + 2 * push_offset
+                    and board.square[start_square + push_offset] == Piece.NoneType and board.square[target_square] == Piece.NoneType)
+
+        pawn_attacks = BitBoardUtility.WhitePawnAttacks if self.is_white_to_move else BitBoardUtility.BlackPawnAttacks
+        if flag == Move.EnPassantCaptureFlag:
+            ep_file = board.current_game_state.en_passant_file
+            ep_square = (5 if self.is_white_to_move else 2) * 8 + ep_file - 1
+            return ep_file > 0 and target_square == ep_square and (pawn_attacks[start_square] >> target_square) & 1 != 0
+
+        if flag != Move.NoFlag and not is_promotion:
+            return False
+        if target_square == start_square + push_offset:
+            return board.square[target_square] == Piece.NoneType
+        return ((pawn_attacks[start_square] & self.enemy_pieces) >> target_square) & 1 != 0
+
+    def _update_check_info(self, board):
+        if self.check_info_key == board.zobrist_key and self.board is board:
+            return
+        self.board = board
+        self.check_info_key = board.zobrist_key
+
+        friendly_index = board.move_color_index
+        enemy_king_square = board.king_square[1 - friendly_index]
+        all_pieces = board.all_pieces_bitboard
+        bishop_checks = Magic.get_bishop_attacks(enemy_king_square, all_pieces)
+        rook_checks = Magic.get_rook_attacks(enemy_king_square, all_pieces)
+
+        # Our pawns attack the king from the squares an enemy pawn on the king square would attack
+        pawn_attacks = BitBoardUtility.BlackPawnAttacks if board.is_white_to_move else BitBoardUtility.WhitePawnAttacks
+        check_squares = self.check_squares
+        check_squares[Piece.Pawn] = pawn_attacks[enemy_king_square]
+        check_squares[Piece.Knight] = BitBoardUtility.KnightAttacks[enemy_king_square]
+        check_squares[Piece.Bishop] = bishop_checks
+        check_squares[Piece.Rook] = rook_checks
+        check_squares[Piece.Queen] = bishop_checks | rook_checks
+        check_squares[Piece.King] = 0
+
+        # A friendly piece is a discovered check candidate if it is the only piece between the enemy king and a friendly slider
+        candidates = 0
+        friendly_pieces = board.color_bitboards[friendly_index]
+        snipers = ((Magic.get_bishop_attacks(enemy_king_square, 0) & board.friendly_diagonal_sliders)
+                   | (Magic.get_rook_attacks(enemy_king_square, 0) & board.friendly_orthogonal_sliders))
+        for sniper_square in BitBoardUtility.iter_squares(snipers):
+            # With exactly one piece between them, the rays from the king and from the slider both stop on that piece
+            ortho = (Magic.get_rook_attacks(enemy_king_square, 0) >> sniper_square) & 1 == 1
+            line = PrecomputedMoveData.align_mask[sniper_square][enemy_king_square]
+            blockers = Magic.get_slider_attacks(sniper_square, all_pieces, ortho) & (rook_checks if ortho else bishop_checks) & line & all_pieces
+            candidates |= blockers & friendly_pieces
+        self.discovered_check_candidates = candidates
+
+    @staticmethod
+    def _gives_check_special(board, move):
+        """
+        gives_check for promotions, castling and en passant: the attacks on the enemy king are calculated
+        from the occupancy after the move
+        """
+        start_square = move.start_square
+        target_square = move.target_square
+        start_bit = 1 << start_square
+        target_bit = 1 << target_square
+        enemy_king_square = board.king_square[1 - board.move_color_index]
+
+        occupancy = (board.all_pieces_bitboard & ~start_bit) | target_bit
+        diagonal_sliders = board.friendly_diagonal_sliders & ~start_bit
+        orthogonal_sliders = board.friendly_orthogonal_sliders & ~start_bit
+
+        if move.move_flag == Move.EnPassantCaptureFlag:
+            occupancy &= ~(1 << (target_square + (-8 if board.is_white_to_move else 8)))
+            pawn_attacks = BitBoardUtility.WhitePawnAttacks if board.is_white_to_move else BitBoardUtility.BlackPawnAttacks
+            if (pawn_attacks[target_square] >> enemy_king_square) & 1:
+                return True
+        elif move.move_flag == Move.CastleFlag:
+            kingside = target_square > start_square
+            rook_start = start_square + 3 if kingside else start_square - 4
+            rook_target = start_square + 1 if kingside else start_square - 1
+            occupancy = (occupancy & ~(1 << rook_start)) | (1 << rook_target)
+            orthogonal_sliders = (orthogonal_sliders & ~(1 << rook_start)) | (1 << rook_target)
+        elif move.is_promotion:
+            promotion_piece_type = move.promotion_piece_type
+            if promotion_piece_type == Piece.Knight and (BitBoardUtility.KnightAttacks[target_square] >> enemy_king_square) & 1:
+                return True
+            if promotion_piece_type in (Piece.Bishop, Piece.Queen):
+                diagonal_sliders |= target_bit
+            if promotion_piece_type in (Piece.Rook, Piece.Queen):
+                orthogonal_sliders |= target_bit
+
+        if Magic.get_bishop_attacks(enemy_king_square, occupancy) & diagonal_sliders:
+            return True
+        return (Magic.get_rook_attacks(enemy_king_square, occupancy) & orthogonal_sliders) != 0
+
     def _init(self):
         self.curr_move_index = 0
         self.in_check = False
@@ -82,25 +338,33 @@ class MoveGenerator():
         self.enemy_pieces = self.board.color_bitboards[self.enemy_index]
         self.friendly_pieces = self.board.color_bitboards[self.friendly_index]
         self.all_pieces = self.board.all_pieces_bitboard
-        self.empty_squares = ~self.all_pieces
+        self.empty_squares = ~self.all_pieces & 0xFFFFFFFFFFFFFFFF
         self.empty_or_enemy_squares = self.empty_squares | self.enemy_pieces
         self.move_type_mask = self.generate_quiet_moves and 0xFFFFFFFFFFFFFFFF or self.enemy_pieces
 
         self._calculate_attack_data()
+        self.attack_data_key = self.board.zobrist_key
 
     def _generate_king_moves(self, moves):
         legal_mask = ~(self.opponent_attack_map | self.friendly_pieces)
         king_moves = BitBoardUtility.KingMoves[self.friendly_king_square] & legal_mask & self.move_type_mask
-        while king_moves:
-            target_square = BitBoardUtility.pop_lsb(king_moves)
+        for target_square in BitBoardUtility.iter_squares(king_moves):
             moves.append(Move(self.friendly_king_square, target_square))
         
         # Castling
         if not self.in_check and self.generate_quiet_moves:
             castle_blockers = self.opponent_attack_map | self.board.all_pieces_bitboard
-            if self.board.current_game_state.has_kingside_castle_rights(self.board.is_white_to_move):
+            if self.board.current_game_state.has_kingside_castle_right(self.board.is_white_to_move):
                 castle_mask = Bits.WhiteKingsideMask if self.board.is_white_to_move else Bits.BlackKingsideMask
                 if (castle_mask & castle_blockers) == 0:
+                    target_square = BoardHelper.g1 if self.board.is_white_to_move else BoardHelper.g8
+                    moves.append(Move(self.friendly_king_square, target_square, Move.CastleFlag))
+
+            if self.board.current_game_state.has_queenside_castle_right(self.board.is_white_to_move):
+                # The king passes through c and d, which must be safe; b must only be empty
+                castle_mask = Bits.WhiteQueensideMask2 if self.board.is_white_to_move else Bits.BlackQueensideMask2
+                castle_block_mask = Bits.WhiteQueensideMask if self.board.is_white_to_move else Bits.BlackQueensideMask
+                if (castle_mask & castle_blockers) == 0 and (castle_block_mask & self.board.all_pieces_bitboard) == 0:
                     target_square = BoardHelper.c1 if self.board.is_white_to_move else BoardHelper.c8
                     moves.append(Move(self.friendly_king_square, target_square, Move.CastleFlag))
 
@@ -114,26 +378,22 @@ class MoveGenerator():
             orthogonal_sliders &= ~self.pin_rays
             diagonal_sliders &= ~self.pin_rays
 
-        while orthogonal_sliders:
-            start_square = BitBoardUtility.pop_lsb(orthogonal_sliders)
+        for start_square in BitBoardUtility.iter_squares(orthogonal_sliders):
             move_squares = Magic.get_rook_attacks(start_square, self.all_pieces) & move_mask
 
             if self._is_pinned(start_square):
-                move_squares &= PrecomputedMoveData.align_mask[start_square, self.friendly_king_square]
+                move_squares &= PrecomputedMoveData.align_mask[start_square][self.friendly_king_square]
 
-            while move_squares:
-                target_square = BitBoardUtility.pop_lsb(move_squares)
+            for target_square in BitBoardUtility.get_squares(move_squares):
                 moves.append(Move(start_square, target_square))
 
-        while diagonal_sliders:
-            start_square = BitBoardUtility.pop_lsb(diagonal_sliders)
+        for start_square in BitBoardUtility.iter_squares(diagonal_sliders):
             move_squares = Magic.get_bishop_attacks(start_square, self.all_pieces) & move_mask
 
             if self._is_pinned(start_square):
-                move_squares &= PrecomputedMoveData.align_mask[start_square, self.friendly_king_square]
+                move_squares &= PrecomputedMoveData.align_mask[start_square][self.friendly_king_square]
 
-            while move_squares:
-                target_square = BitBoardUtility.pop_lsb(move_squares)
+            for target_square in BitBoardUtility.get_squares(move_squares):
                 moves.append(Move(start_square, target_square))
 
     def _generate_knight_moves(self, moves):
@@ -141,12 +401,10 @@ class MoveGenerator():
         knights = self.board.piece_bitboards[friendly_knight_piece] & self.not_pin_rays
         move_mask = self.empty_or_enemy_squares & self.check_ray_bitmask & self.move_type_mask
 
-        while knights:
-            knight_square = BitBoardUtility.pop_lsb(knights)
+        for knight_square in BitBoardUtility.iter_squares(knights):
             move_squares = BitBoardUtility.KnightAttacks[knight_square] & move_mask
 
-            while move_squares:
-                target_square = BitBoardUtility.pop_lsb(move_squares)
+            for target_square in BitBoardUtility.iter_squares(move_squares):
                 moves.append(Move(knight_square, target_square))
     
     def _generate_pawn_moves(self, moves):
@@ -173,58 +431,51 @@ class MoveGenerator():
         capture_promotions_b = capture_b & promotion_rank_mask & self.check_ray_bitmask
 
         capture_a &= self.check_ray_bitmask & ~promotion_rank_mask
-        capture_b &= self.check_ray_bitmask & promotion_rank_mask
+        capture_b &= self.check_ray_bitmask & ~promotion_rank_mask
 
         if self.generate_quiet_moves:
-            while single_push_no_promotions:
-                target_square = BitBoardUtility.pop_lsb(single_push_no_promotions)
+            for target_square in BitBoardUtility.get_squares(single_push_no_promotions):
                 start_square = target_square - push_offset
-                if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square, self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square, self.friendly_king_square]:
+                if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square][self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square][self.friendly_king_square]:
                     moves.append(Move(start_square, target_square))
 
             double_push_target_rank_mask = BitBoardUtility.Rank4 if self.board.is_white_to_move else BitBoardUtility.Rank5
             double_push = BitBoardUtility.shift(single_push, push_offset) & self.empty_squares & double_push_target_rank_mask & self.check_ray_bitmask
 
-            while double_push:
-                target_square = BitBoardUtility.pop_lsb(double_push)
+            for target_square in BitBoardUtility.iter_squares(double_push):
                 start_square = target_square - push_offset * 2
-                if not self.is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square, self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square, self.friendly_king_square]:
+                if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square][self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square][self.friendly_king_square]:
                     moves.append(Move(start_square, target_square, Move.PawnTwoUpFlag))
         
         # Captures
-        while capture_a:
-            target_square = BitBoardUtility.pop_lsb(capture_a)
+        for target_square in BitBoardUtility.iter_squares(capture_a):
             start_square = target_square - push_dir * 7
 
-            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square, self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square, self.friendly_king_square]:
+            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square][self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square][self.friendly_king_square]:
                 moves.append(Move(start_square, target_square))
         
-        while capture_b:
-            target_square = BitBoardUtility.pop_lsb(capture_b)
+        for target_square in BitBoardUtility.iter_squares(capture_b):
             start_square = target_square - push_dir * 9
 
-            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square, self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square, self.friendly_king_square]:
+            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square][self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square][self.friendly_king_square]:
                 moves.append(Move(start_square, target_square))
         
         # Promotions
-        while push_promotions:
-            target_square = BitBoardUtility.pop_lsb(push_promotions)
+        for target_square in BitBoardUtility.iter_squares(push_promotions):
             start_square = target_square - push_offset
             if not self._is_pinned(start_square):
                 self._generate_promotions(start_square, target_square, moves)
         
-        while capture_promotions_a:
-            target_square = BitBoardUtility.pop_lsb(capture_promotions_a)
+        for target_square in BitBoardUtility.iter_squares(capture_promotions_a):
             start_square = target_square - push_dir * 7
 
-            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square, self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square, self.friendly_king_square]:
+            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square][self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square][self.friendly_king_square]:
                 self._generate_promotions(start_square, target_square, moves)
         
-        while capture_promotions_b:
-            target_square = BitBoardUtility.pop_lsb(capture_promotions_b)
+        for target_square in BitBoardUtility.iter_squares(capture_promotions_b):
             start_square = target_square - push_dir * 9
 
-            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square, self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square, self.friendly_king_square]:
+            if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square][self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square][self.friendly_king_square]:
                 self._generate_promotions(start_square, target_square, moves)
 
         # En passant
@@ -234,12 +485,12 @@ class MoveGenerator():
             target_square = ep_rank_index * 8 + ep_file_index
             captured_pawn_square = target_square - push_offset
 
-            if BitBoardUtility.contains_square(self.check_ray_bitmask, captured_pawn_square):
+            # When in check, the capture must take the checking pawn or block the check by landing on the target square
+            if BitBoardUtility.contains_square(self.check_ray_bitmask, captured_pawn_square) or BitBoardUtility.contains_square(self.check_ray_bitmask, target_square):
                 pawns_that_can_capture_ep = pawns & BitBoardUtility.pawn_attacks(1 << target_square, not self.board.is_white_to_move)
 
-                while pawns_that_can_capture_ep:
-                    start_square = BitBoardUtility.pop_lsb(pawns_that_can_capture_ep)
-                    if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square, self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square, self.friendly_king_square]:
+                for start_square in BitBoardUtility.iter_squares(pawns_that_can_capture_ep):
+                    if not self._is_pinned(start_square) or PrecomputedMoveData.align_mask[start_square][self.friendly_king_square] == PrecomputedMoveData.align_mask[target_square][self.friendly_king_square]:
                         if not self._in_check_after_en_passant(start_square, target_square, captured_pawn_square):
                             moves.append(Move(start_square, target_square, Move.EnPassantCaptureFlag))
     
@@ -258,14 +509,21 @@ class MoveGenerator():
     
     def _generate_sliding_attack_map(self):
         self.opponent_sliding_attack_map = 0
+        self.opponent_piece_attacks = []
 
         def update_slide_attack(piece_board, ortho):
-            blockers = self.board.all_pieces_bitboard & ~(1 << self.friendly_king_square)
+            king_bit = 1 << self.friendly_king_square
+            blockers = self.board.all_pieces_bitboard & ~king_bit
 
-            while piece_board:
-                start_square = BitBoardUtility.pop_lsb(piece_board)
+            for start_square in BitBoardUtility.iter_squares(piece_board):
+                # The attack map sees through the friendly king (so that the king can't step back along the ray),
+                # but the per-piece attacks use the real blockers; they only differ for a slider attacking the king
                 move_board = Magic.get_slider_attacks(start_square, blockers, ortho)
                 self.opponent_sliding_attack_map |= move_board
+                if move_board & king_bit:
+                    self.opponent_piece_attacks.append((start_square, Magic.get_slider_attacks(start_square, self.board.all_pieces_bitboard, ortho)))
+                else:
+                    self.opponent_piece_attacks.append((start_square, move_board))
         
         update_slide_attack(self.board.enemy_orthogonal_sliders, True)
         update_slide_attack(self.board.enemy_diagonal_sliders, False)
@@ -276,9 +534,9 @@ class MoveGenerator():
         start_dir_index = 0
         end_dir_index = 8
 
-        if not self.board.queens[self.enemy_index]:
-            start_dir_index = 0 if self.board.rooks[self.enemy_index] else 4
-            end_dir_index = 8 if self.board.bishops[self.enemy_index] else 4
+        if self.board.queens[self.enemy_index].count == 0:
+            start_dir_index = 0 if self.board.rooks[self.enemy_index].count > 0 else 4
+            end_dir_index = 8 if self.board.bishops[self.enemy_index].count > 0 else 4
 
         for dir in range(start_dir_index, end_dir_index):
             is_diagonal = dir > 3
@@ -332,16 +590,16 @@ class MoveGenerator():
             if self.in_double_check:
                 break
         
-        self.not_pin_rays = ~self.pin_rays
+        self.not_pin_rays = ~self.pin_rays & 0xFFFFFFFFFFFFFFFF
 
         opponent_knight_attacks = 0
-        knights = self.board.piece_bitbooards[Piece.make_piece(Piece.Knight, self.board.opponent_color)]
+        knights = self.board.piece_bitboards[Piece.make_piece(Piece.Knight, self.board.opponent_color)]
         friendly_king_board = self.board.piece_bitboards[Piece.make_piece(Piece.King, self.board.move_color)]
 
-        while knights:
-            knight_square = BitBoardUtility.pop_lsb(knights)
+        for knight_square in BitBoardUtility.iter_squares(knights):
             knight_attacks = BitBoardUtility.KnightAttacks[knight_square]
             opponent_knight_attacks |= knight_attacks
+            self.opponent_piece_attacks.append((knight_square, knight_attacks))
 
             if knight_attacks & friendly_king_board:
                 self.in_double_check = self.in_check
@@ -349,7 +607,7 @@ class MoveGenerator():
                 self.check_ray_bitmask |= 1 << knight_square
 
         # Pawn attacks
-        opponent_pawn_attack_map = BitBoardUtility.pawn_attacks(self.board.piece_bitboards[Piece.make_piece(Piece.Pawn, self.board.opponent_color)], not self.is_white_to_move)
+        self.opponent_pawn_attack_map = opponent_pawn_attack_map = BitBoardUtility.pawn_attacks(self.board.piece_bitboards[Piece.make_piece(Piece.Pawn, self.board.opponent_color)], not self.is_white_to_move)
 
         if BitBoardUtility.contains_square(opponent_pawn_attack_map, self.friendly_king_square):
             self.in_double_check = self.in_check
@@ -359,19 +617,29 @@ class MoveGenerator():
             self.check_ray_bitmask |= pawn_check_map
 
         enemy_king_square = self.board.king_square[self.enemy_index]
+        self.opponent_knight_attack_map = opponent_knight_attacks
+        self.opponent_king_attack_map = BitBoardUtility.KingMoves[enemy_king_square]
 
-        self.opponent_attack_map_no_pawns = self.opponent_sliding_attack_map | opponent_knight_attacks | BitBoardUtility.KingMoves[enemy_king_square]
+        self.opponent_attack_map_no_pawns = self.opponent_sliding_attack_map | opponent_knight_attacks | self.opponent_king_attack_map
         self.opponent_attack_map = self.opponent_attack_map_no_pawns | opponent_pawn_attack_map
 
         if not self.in_check:
             self.check_ray_bitmask = 0xFFFFFFFFFFFFFFFF
     
     def _in_check_after_en_passant(self, start_square, target_square, ep_capture_square):
+        # Both pawns leave their squares, which can uncover a slider along the rank or (through the captured pawn) a diagonal
         enemy_ortho = self.board.enemy_orthogonal_sliders
+        enemy_diagonal = self.board.enemy_diagonal_sliders
+        masked_blockers = (self.all_pieces ^ (1 << ep_capture_square | 1 << start_square | 1 << target_square))
 
         if enemy_ortho:
-            masked_blockers = (self.all_pieces ^ (1 << ep_capture_square | 1 << start_square | 1 << target_square))
             rook_attacks = Magic.get_rook_attacks(self.friendly_king_square, masked_blockers)
-            return (rook_attacks & enemy_ortho) != 0
-        
+            if rook_attacks & enemy_ortho:
+                return True
+
+        if enemy_diagonal:
+            bishop_attacks = Magic.get_bishop_attacks(self.friendly_king_square, masked_blockers)
+            if bishop_attacks & enemy_diagonal:
+                return True
+
         return False
\ No newline at end of file
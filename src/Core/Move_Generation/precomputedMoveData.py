@@ -1,11 +1,12 @@
-import numpy as np
-from math import abs, max
 from Helpers.boardHelpers import BoardHelper
 from Board.coord import Coord
+from Helpers.lazyTable import LazyTable
 
 class PrecomputedMoveData:
-    align_mask = np.zeros((64, 64), dtype=np.uint64)
-    dir_ray_mask = np.zeros((8, 64), dtype=np.uint64)
+    # Tables are built by initialize on first use. Tables indexed by two squares are lists of rows ([square_a][square_b]),
+    # and bitboards are plain ints, so that they combine directly with the board's bitboards
+    align_mask = LazyTable([[0] * 64 for _ in range(64)])
+    dir_ray_mask = LazyTable([[0] * 64 for _ in range(8)])
     direction_offsets = [8, -8, -1, 1, 7, -7, 9, -9]
 
     dir_offsets_2d = [
@@ -19,30 +20,30 @@ class PrecomputedMoveData:
         (-1, -1) # SW
     ]
 
-    num_squares_to_edge = np.zeros((64, 8), dtype=int)
-    knight_moves = [[] for i in range(64)]
-    king_moves = [[] for i in range(64)]
+    num_squares_to_edge = LazyTable([[0] * 8 for _ in range(64)])
+    knight_moves = LazyTable([[] for i in range(64)])
+    king_moves = LazyTable([[] for i in range(64)])
     pawn_attack_directions = [[4, 6], [7, 5]]
-    pawn_attacks_white = [[] for _ in range(64)]
-    pawn_attacks_black = [[] for _ in range(64)]
-    direction_lookup = np.zeros(127, dtype=int)
-    king_attack_bitboards = np.zeros(64, dtype=np.uint64)
-    knight_attack_bitboards = np.zeros(64, dtype=np.uint64)
-    pawn_attack_bitboards = [np.zeros(2, dtype=np.uint64) for _ in range(64)]
-    rook_moves = np.zeros(64, dtype=np.uint64)
-    bishop_moves = np.zeros(64, dtype=np.uint64)
-    queen_moves = np.zeros(64, dtype=np.uint64)
-    orthogonal_distance = np.zeros((64, 64), dtype=int)
-    king_distance = np.zeros((64, 64), dtype=int)
-    centre_manhattan_distance = np.zeros(64, dtype=int)
+    pawn_attacks_white = LazyTable([[] for _ in range(64)])
+    pawn_attacks_black = LazyTable([[] for _ in range(64)])
+    direction_lookup = LazyTable([0] * 127)
+    king_attack_bitboards = LazyTable([0] * 64)
+    knight_attack_bitboards = LazyTable([0] * 64)
+    pawn_attack_bitboards = LazyTable([[0, 0] for _ in range(64)])
+    rook_moves = LazyTable([0] * 64)
+    bishop_moves = LazyTable([0] * 64)
+    queen_moves = LazyTable([0] * 64)
+    orthogonal_distance = LazyTable([[0] * 64 for _ in range(64)])
+    king_distance = LazyTable([[0] * 64 for _ in range(64)])
+    centre_manhattan_distance = LazyTable([0] * 64)
 
     @staticmethod
     def num_rook_moves_to_reach_square(start_square, target_square):
-        return PrecomputedMoveData.orthogonal_distance[start_square, target_square]
+        return PrecomputedMoveData.orthogonal_distance[start_square][target_square]
     
     @staticmethod
     def num_king_moves_to_reach_square(start_square, target_square):
-        return PrecomputedMoveData.king_distance[start_square, target_square]
+        return PrecomputedMoveData.king_distance[start_square][target_square]
     
     @staticmethod
     def initialize():
@@ -147,7 +148,7 @@ class PrecomputedMoveData:
             elif abs_offset % 7 == 0:
                 abs_dir = 7
 
-            PrecomputedMoveData.direction_lookup[i] = abs_dir * np.sign(offset)
+            PrecomputedMoveData.direction_lookup[i] = abs_dir * ((offset > 0) - (offset < 0))
 
         # Distance lookup initialization
         for square_a in range(64):
@@ -160,8 +161,8 @@ class PrecomputedMoveData:
                 coord_b = BoardHelper.coord_from_index(square_b)
                 rank_distance = abs(coord_a.rank_index - coord_b.rank_index)
                 file_distance = abs(coord_a.file_index - coord_b.file_index)
-                PrecomputedMoveData.orthogonal_distance[square_a, square_b] = file_distance + rank_distance
-                PrecomputedMoveData.king_distance[square_a, square_b] = max(file_distance, rank_distance)
+                PrecomputedMoveData.orthogonal_distance[square_a][square_b] = file_distance + rank_distance
+                PrecomputedMoveData.king_distance[square_a][square_b] = max(file_distance, rank_distance)
 
         # Align mask initialization
         for square_a in range(64):
@@ -169,12 +170,12 @@ class PrecomputedMoveData:
                 coord_a = BoardHelper.coord_from_index(square_a)
                 coord_b = BoardHelper.coord_from_index(square_b)
                 delta = coord_b - coord_a
-                dir = Coord(np.sign(delta.file_index), np.sign(delta.rank_index))
+                dir = Coord((delta.file_index > 0) - (delta.file_index < 0), (delta.rank_index > 0) - (delta.rank_index < 0))
 
                 for i in range(-8, 8):
                     coord = coord_a + dir * i
                     if coord.is_valid_square():
-                        PrecomputedMoveData.align_mask[square_a, square_b] |= 1 << BoardHelper.index_from_coord(coord)
+                        PrecomputedMoveData.align_mask[square_a][square_b] |= 1 << BoardHelper.index_from_coord(coord)
 
         # Dir ray mask initialization
         for dir_index, dir_offset_2d in enumerate(PrecomputedMoveData.dir_offsets_2d):
@@ -182,11 +183,8 @@ class PrecomputedMoveData:
                 square = BoardHelper.coord_from_index(square_index)
 
                 for i in range(8):
-                    coord = square + dir_offset_2d * i
+                    coord = square + Coord(*dir_offset_2d) * i
                     if coord.is_valid_square():
-                        PrecomputedMoveData.dir_ray_mask[dir_index, square_index] |= 1 << BoardHelper.index_from_coord(coord)
+                        PrecomputedMoveData.dir_ray_mask[dir_index][square_index] |= 1 << BoardHelper.index_from_coord(coord)
                     else:
                         break
-
-# Initialize PrecomputedMoveData
-PrecomputedMoveData.initialize()
\ No newline at end of file
@@ -0,0 +1,347 @@
+import time
+from Board.piece import Piece
+from Board.move import Move
+from Move_Generation.moveGenerator import MoveGenerator
+from Evaluation.evaluation import Evaluation
+from Endgames.bitbase import Bitbase
+from Search.transpositionTable import TranspositionTable
+from Search.timeManager import TimeManager
+
+class SearchInfo:
+    """
+    Summary of a completed iteration of the search, passed to Searcher.on_info
+    """
+    def __init__(self, depth, score, nodes, time_ms, pv):
+        self.depth = depth
+        self.score = score
+        self.nodes = nodes
+        self.time_ms = time_ms
+        self.pv = pv
+
+    @property
+    def nps(self):
+        return self.nodes * 1000 // max(1, self.time_ms)
+
+
+class Searcher:
+    """
+    Iterative deepening alpha-beta (negamax) search with a transposition table and a quiescence search.
+    The search runs until the maximum depth or node count is reached, the time manager (if any) stops it,
+    or end_search is called (typically from another thread)
+    """
+    MaxDepth = 64
+    MaxExtensions = 16
+    MaxPly = MaxDepth + MaxExtensions + 1
+
+    ImmediateMateScore = 100000
+    PositiveInfinity = 9999999
+    NegativeInfinity = -PositiveInfinity
+
+    # Move ordering scores
+    HashMoveScore = 100_000_000
+    CaptureScore = 10_000_000
+    PromotionScore = 5_000_000
+    KillerScore = 1_000_000
+
+    def __init__(self, board, tt_size_mb=64, bitbase_prober=None):
+        self.board = board
+        self.move_generator = MoveGenerator()
+        self.evaluation = Evaluation(bitbase_prober)
+        self.transposition_table = TranspositionTable(tt_size_mb)
+        self.bitbase_prober = bitbase_prober
+
+        # Callbacks: on_info(SearchInfo) after each completed iteration, on_search_complete(move) when the search ends
+        self.on_info = None
+        self.on_search_complete = None
+
+        self.search_cancelled = False
+        self.max_nodes = None
+        self.time_manager = None
+        # Values of the root moves to search (as with UCI go searchmoves), or None for every move
+        self.search_moves = None
+        self.nodes = 0
+        # Node count at which the node and time limits are next checked
+        self.next_limit_check = 0
+        # Nodes searched below each root move in the current iteration (by move value)
+        self.root_move_nodes = {}
+        self.search_start_time = 0.0
+
+        self.best_move = None
+        self.best_eval = 0
+        self.pv = []
+        self.current_depth = 0
+        self.best_move_this_iteration = None
+        self.best_eval_this_iteration = 0
+
+        self.pv_table = [[] for _ in range(Searcher.MaxPly + 1)]
+        self.killer_moves = [[0, 0] for _ in range(Searcher.MaxPly + 1)]
+        self.search_path_keys = []
+
+    def set_bitbase_prober(self, bitbase_prober):
+        self.bitbase_prober = bitbase_prober
+        self.evaluation.set_bitbase_prober(bitbase_prober)
+
+    def start_search(self, max_depth=None, max_nodes=None, time_manager=None, search_moves=None):
+        """
+        Search the current position by iterative deepening and return the best move found.
+        If search_moves is given, only those root moves are searched
+        """
+        max_depth = min(max_depth or Searcher.MaxDepth, Searcher.MaxDepth)
+        self.max_nodes = max_nodes
+        self.time_manager = time_manager
+        self.search_moves = None if search_moves is None else {move.value for move in search_moves}
+        self.search_cancelled = False
+        self.nodes = 0
+        self.next_limit_check = min(TimeManager.CheckIntervalNodes, max_nodes) if max_nodes is not None else TimeManager.CheckIntervalNodes
+        self.search_start_time = time.perf_counter()
+        self.best_move = None
+        self.best_eval = 0
+        self.pv = []
+        self.current_depth = 0
+        self.killer_moves = [[0, 0] for _ in range(Searcher.MaxPly + 1)]
+        self.search_path_keys = []
+
+        for depth in range(1, max_depth + 1):
+            self.best_move_this_iteration = None
+            self.best_eval_this_iteration = Searcher.NegativeInfinity
+            self.root_move_nodes = {}
+            self.search(depth, 0, Searcher.NegativeInfinity, Searcher.PositiveInfinity)
+
+            if self.search_cancelled:
+                # Moves at the root are ordered with the previous best move first, so a move found in the
+                # unfinished iteration is at least as good as the previous best
+                if self.best_move_this_iteration is not None:
+                    self.best_move = self.best_move_this_iteration
+                    self.best_eval = self.best_eval_this_iteration
+                break
+
+            self.best_move = self.best_move_this_iteration
+            self.best_eval = self.best_eval_this_iteration
+            self.pv = list(self.pv_table[0]) or ([self.best_move] if self.best_move is not None else [])
+            self.current_depth = depth
+
+            if self.on_info is not None:
+                self.on_info(SearchInfo(depth, self.best_eval, self.nodes, self.elapsed_ms(), self.pv))
+
+            # Stop once a forced mate has been found within the searched depth
+            if Searcher.is_mate_score(self.best_eval) and Searcher.num_ply_to_mate(self.best_eval) <= depth:
+                break
+
+            if time_manager is not None and self.best_move is not None:
+                best_move_nodes = self.root_move_nodes.get(self.best_move.value, 0)
+                if time_manager.on_iteration_complete(self.best_move, self.best_eval, best_move_nodes, sum(self.root_move_nodes.values())):
+                    break
+
+        if self.best_move is None:
+            moves = self.root_moves(self.move_generator.generate_moves(self.board))
+            self.best_move = moves[0] if moves else Move.null_move()
+
+        if self.on_search_complete is not None:
+            self.on_search_complete(self.best_move)
+        return self.best_move
+
+    def end_search(self):
+        self.search_cancelled = True
+
+    def clear_for_new_position(self):
+        self.transposition_table.clear()
+        self.killer_moves = [[0, 0] for _ in range(Searcher.MaxPly + 1)]
+
+    def check_limits(self):
+        """
+        Called every TimeManager.CheckIntervalNodes nodes (and exactly at the node limit) rather than at every node,
+        so the clock is read rarely
+        """
+        self.next_limit_check = self.nodes + TimeManager.CheckIntervalNodes
+        if self.max_nodes is not None:
+            if self.nodes >= self.max_nodes:
+                self.search_cancelled = True
+            self.next_limit_check = min(self.next_limit_check, self.max_nodes)
+        if self.time_manager is not None and self.time_manager.is_hard_limit_reached():
+            self.search_cancelled = True
+
+    def elapsed_ms(self):
+        return int((time.perf_counter() - self.search_start_time) * 1000)
+
+    def search(self, depth, ply_from_root, alpha, beta, num_extensions=0):
+        if self.search_cancelled:
+            return 0
+
+        self.nodes += 1
+        if self.nodes >= self.next_limit_check:
+            self.check_limits()
+
+        board = self.board
+        zobrist_key = board.zobrist_key
+        self.pv_table[ply_from_root] = []
+
+        if ply_from_root > 0:
+            if board.fifty_move_counter >= 100 or self.is_repetition(zobrist_key):
+                return 0
+
+            # Known drawn material configurations and bitbase draws need no further search. Won and lost bitbase positions
+            # are searched on (and scored by the evaluation, which rewards progress), so that the mate is still found
+            if board.total_piece_count_without_pawns_and_kings <= 2 and self.evaluation.endgames.is_known_draw(board):
+                return 0
+            if self.bitbase_prober is not None and self.evaluation.probe_bitbase(board) == Bitbase.Draw:
+                return 0
+
+            # Skip this position if a mating sequence has already been found earlier in the search, which would be shorter
+            # than any mate we could find from here
+            alpha = max(alpha, -Searcher.ImmediateMateScore + ply_from_root)
+            beta = min(beta, Searcher.ImmediateMateScore - ply_from_root)
+            if alpha >= beta:
+                return alpha
+
+            # Transposition table cutoffs are only taken below the root: at the root every move is searched, for a full pv
+            # (and ponder move), per-move node counts for the time manager, and repetition checks against the game history.
+            # The stored root move is still used for move ordering
+            tt_value = self.transposition_table.lookup_evaluation(zobrist_key, depth, ply_from_root, alpha, beta)
+            if tt_value is not TranspositionTable.LookupFailed:
+                # Keep the stored move as this node's pv, so the pv through a transposition still has the expected reply
+                tt_move = self.transposition_table.try_get_stored_move(zobrist_key)
+                if tt_move is not None:
+                    self.pv_table[ply_from_root] = [tt_move]
+                return tt_value
+
+        if depth <= 0:
+            return self.quiescence_search(alpha, beta, ply_from_root)
+
+        moves = self.move_generator.generate_moves(board)
+        in_check = self.move_generator.in_check
+        if not moves:
+            return -(Searcher.ImmediateMateScore - ply_from_root) if in_check else 0
+        if ply_from_root == 0:
+            moves = self.root_moves(moves)
+
+        hash_move = self.best_move if ply_from_root == 0 else None
+        if hash_move is None:
+            hash_move = self.transposition_table.try_get_stored_move(zobrist_key)
+        self.order_moves(moves, hash_move, ply_from_root)
+
+        node_type = TranspositionTable.UpperBound
+        best_move_in_position = None
+        self.search_path_keys.append(zobrist_key)
+
+        for move in moves:
+            is_capture = board.square[move.target_square] != Piece.NoneType
+            board.make_move(move, in_search=True)
+
+            extension = 1 if num_extensions < Searcher.MaxExtensions and board.is_in_check() else 0
+            nodes_before = self.nodes
+            score = -self.search(depth - 1 + extension, ply_from_root + 1, -beta, -alpha, num_extensions + extension)
+            board.unmake_move(move, in_search=True)
+            if ply_from_root == 0:
+                self.root_move_nodes[move.value] = self.nodes - nodes_before
+
+            if self.search_cancelled:
+                self.search_path_keys.pop()
+                return 0
+
+            if score >= beta:
+                self.transposition_table.store_evaluation(zobrist_key, depth, ply_from_root, beta, TranspositionTable.LowerBound, move)
+                if not is_capture:
+                    self.store_killer(move, ply_from_root)
+                self.search_path_keys.pop()
+                return beta
+
+            if score > alpha:
+                node_type = TranspositionTable.Exact
+                best_move_in_position = move
+                alpha = score
+                self.pv_table[ply_from_root] = [move] + self.pv_table[ply_from_root + 1]
+
+                if ply_from_root == 0:
+                    self.best_move_this_iteration = move
+                    self.best_eval_this_iteration = score
+
+        self.search_path_keys.pop()
+        # The score of a restricted root search isn't the score of the position
+        if ply_from_root > 0 or self.search_moves is None:
+            self.transposition_table.store_evaluation(zobrist_key, depth, ply_from_root, alpha, node_type, best_move_in_position)
+        return alpha
+
+    def root_moves(self, moves):
+        if self.search_moves is None:
+            return moves
+        return [move for move in moves if move.value in self.search_moves]
+
+    def quiescence_search(self, alpha, beta, ply_from_root):
+        """
+        Search captures only until a quiet position is reached, to avoid evaluating in the middle of an exchange
+        """
+        if self.search_cancelled:
+            return 0
+
+        self.nodes += 1
+        if self.nodes >= self.next_limit_check:
+            self.check_limits()
+
+        board = self.board
+        moves = self.move_generator.generate_moves(board, captures_only=True)
+
+        # Captures are not forced, so the side to move can 'stand pat' with the static evaluation
+        evaluation = self.evaluation.evaluate(board, self.move_generator)
+        if evaluation >= beta:
+            return beta
+        if evaluation > alpha:
+            alpha = evaluation
+
+        self.order_moves(moves, None, Searcher.MaxPly)
+        for move in moves:
+            board.make_move(move, in_search=True)
+            score = -self.quiescence_search(-beta, -alpha, ply_from_root + 1)
+            board.unmake_move(move, in_search=True)
+
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def order_moves(self, moves, hash_move, ply_from_root):
+        """
+        Sort moves so that the most promising are searched first: hash move, captures (most valuable victim,
+        least valuable attacker), promotions, killer moves, then everything else
+        """
+        board = self.board
+        piece_values = Evaluation.PieceValues
+        hash_move_value = hash_move.value if hash_move is not None else -1
+        killers = self.killer_moves[ply_from_root]
+
+        def score_move(move):
+            if move.value == hash_move_value:
+                return Searcher.HashMoveScore
+
+            captured_piece_type = Piece.piece_type(board.square[move.target_square])
+            if captured_piece_type != Piece.NoneType:
+                moved_piece_type = Piece.piece_type(board.square[move.start_square])
+                return Searcher.CaptureScore + 10 * piece_values[captured_piece_type] - piece_values[moved_piece_type]
+            if move.is_promotion:
+                return Searcher.PromotionScore + piece_values[move.promotion_piece_type]
+            if move.value == killers[0] or move.value == killers[1]:
+                return Searcher.KillerScore
+            return 0
+
+        moves.sort(key=score_move, reverse=True)
+
+    def store_killer(self, move, ply_from_root):
+        killers = self.killer_moves[ply_from_root]
+        if killers[0] != move.value:
+            killers[1] = killers[0]
+            killers[0] = move.value
+
+    def is_repetition(self, zobrist_key):
+        """
+        A position repeated on the current search path or in the game history is scored as a draw
+        """
+        return zobrist_key in self.search_path_keys or zobrist_key in self.board.repetition_position_history
+
+    @staticmethod
+    def is_mate_score(score):
+        return abs(score) > TranspositionTable.MateThreshold
+
+    @staticmethod
+    def num_ply_to_mate(score):
+        return Searcher.ImmediateMateScore - abs(score)
@@ -0,0 +1,118 @@
+import time
+
+class TimeManager:
+    """
+    Think time limits for one search, derived from the clock state (UCI wtime/btime/winc/binc/movestogo) or a fixed move time.
+
+    The soft limit is checked by the searcher between iterations: no new iteration is started once it has passed.
+    It is stretched while the best move keeps changing or the score drops, and shrunk when one move takes nearly all
+    of the search effort. The hard limit ends the search outright; the searcher only reads the clock every
+    CheckIntervalNodes nodes to check it.
+    The move overhead is held back from the remaining time to cover the latency between the GUI and the engine
+    """
+    DefaultMoveOverheadMs = 30
+    CheckIntervalNodes = 256
+
+    # Moves the remaining time is spread over when the time control doesn't say (and the upper bound when it does)
+    DefaultMovesToGo = 40
+    IncrementFraction = 0.8
+    # The hard limit is this many times the soft limit, and never more than MaxHardFraction of the remaining time
+    HardLimitFactor = 4.0
+    MaxHardFraction = 0.5
+    MinThinkTimeMs = 10
+
+    # Soft limit scaling from best move instability, score drops and best move dominance
+    InstabilityScale = 0.4
+    InstabilityDecay = 0.5
+    ScoreDropThreshold = 20
+    ScoreDropScale = 0.005
+    MaxScoreDropFactor = 1.5
+    DominantMoveNodeFraction = 0.9
+    DominantMoveFactor = 0.4
+    MaxSoftLimitFactor = 2.5
+
+    def __init__(self, soft_limit_ms=None, hard_limit_ms=None):
+        """
+        Limits of None mean the search is not limited by time (e.g. go infinite or a depth/node limited search)
+        """
+        self.soft_limit_ms = soft_limit_ms
+        self.hard_limit_ms = hard_limit_ms
+        self.is_pondering = False
+        self.start_time = time.monotonic()
+
+        self.previous_best_move_value = None
+        self.previous_score = None
+        self.best_move_instability = 0.0
+        self.scaled_soft_limit_ms = soft_limit_ms
+
+    @staticmethod
+    def for_clock(time_remaining_ms, increment_ms=0, moves_to_go=None, move_overhead_ms=DefaultMoveOverheadMs, max_think_time_ms=None):
+        """
+        Limits for the side to move given its remaining time and increment (and the moves until the next time control, if any)
+        """
+        available_ms = max(1, time_remaining_ms - move_overhead_ms)
+        moves_to_go = min(moves_to_go or TimeManager.DefaultMovesToGo, TimeManager.DefaultMovesToGo)
+
+        soft_limit_ms = available_ms / moves_to_go
+        if available_ms > increment_ms * 2:
+            soft_limit_ms += increment_ms * TimeManager.IncrementFraction
+        if max_think_time_ms is not None:
+            soft_limit_ms = min(soft_limit_ms, max_think_time_ms)
+
+        hard_limit_ms = min(soft_limit_ms * TimeManager.HardLimitFactor, available_ms * TimeManager.MaxHardFraction)
+        hard_limit_ms = max(hard_limit_ms, min(TimeManager.MinThinkTimeMs, available_ms))
+        return TimeManager(min(soft_limit_ms, hard_limit_ms), hard_limit_ms)
+
+    @staticmethod
+    def for_move_time(move_time_ms, move_overhead_ms=DefaultMoveOverheadMs):
+        """
+        Limits for a fixed time per move: the full time (less the overhead) is used, without any scaling
+        """
+        think_time_ms = max(1, move_time_ms - move_overhead_ms)
+        return TimeManager(think_time_ms, think_time_ms)
+
+    @property
+    def is_time_limited(self):
+        return self.hard_limit_ms is not None
+
+    def start_clock(self):
+        """
+        Restart the clock (at the start of the search, or on ponder hit, when the think time starts counting)
+        """
+        self.start_time = time.monotonic()
+
+    def ponder_hit(self):
+        self.start_clock()
+        self.is_pondering = False
+
+    def elapsed_ms(self):
+        return (time.monotonic() - self.start_time) * 1000
+
+    def is_hard_limit_reached(self):
+        if self.is_pondering or self.hard_limit_ms is None:
+            return False
+        return self.elapsed_ms() >= self.hard_limit_ms
+
+    def on_iteration_complete(self, best_move, score, best_move_nodes, total_nodes):
+        """
+        Update the soft limit with the result of an iteration of the search. Returns whether the search should stop
+        """
+        if self.previous_best_move_value is not None:
+            self.best_move_instability *= TimeManager.InstabilityDecay
+            if best_move.value != self.previous_best_move_value:
+                self.best_move_instability += 1
+        factor = 1 + self.best_move_instability * TimeManager.InstabilityScale
+
+        if self.previous_score is not None and self.previous_score - score > TimeManager.ScoreDropThreshold:
+            factor *= min(TimeManager.MaxScoreDropFactor, 1 + (self.previous_score - score) * TimeManager.ScoreDropScale)
+
+        if total_nodes > 0 and best_move_nodes >= total_nodes * TimeManager.DominantMoveNodeFraction:
+            factor *= TimeManager.DominantMoveFactor
+
+        self.previous_best_move_value = best_move.value
+        self.previous_score = score
+
+        if self.soft_limit_ms is None:
+            return False
+        self.scaled_soft_limit_ms = min(self.soft_limit_ms * min(factor, TimeManager.MaxSoftLimitFactor), self.hard_limit_ms)
+        return not self.is_pondering and self.elapsed_ms() >= self.scaled_soft_limit_ms
@@ -0,0 +1,96 @@
+from Board.move import Move
+
+class TranspositionTable:
+    """
+    Stores the results of previous searches, indexed by zobrist key, so that positions reached again
+    (through transpositions or in the next iteration of iterative deepening) don't have to be searched again
+    """
+    LookupFailed = None
+
+    # The value for this position is the exact evaluation
+    Exact = 0
+    # A move was found during the search that was too good, meaning the opponent will play a different move earlier on,
+    # not allowing the position where this move was available to be reached. Because the search cuts off at
+    # this point (beta cut-off), an even better move may exist. This means that the evaluation for the
+    # position could be even higher, making the stored value the lower bound of the actual value.
+    LowerBound = 1
+    # No move during the search resulted in a position that was better than the current player could get from playing a
+    # different move in an earlier position (i.e eval was <= alpha for all moves in the position).
+    # Due to the way alpha-beta search works, the value we get here won't be the exact evaluation of the position,
+    # but rather the upper bound of the evaluation. This means that the evaluation is, at most, equal to this value.
+    UpperBound = 2
+
+    # Scores beyond this are mate scores (see Searcher.ImmediateMateScore)
+    MateThreshold = 99000
+
+    # Rough size of a stored entry (a tuple of five ints) in bytes, used to convert the size in MB to a number of entries
+    BytesPerEntry = 120
+
+    def __init__(self, size_mb=64):
+        self.count = max(1, size_mb * 1024 * 1024 // TranspositionTable.BytesPerEntry)
+        self.entries = [None] * self.count
+        self.enabled = True
+
+    def clear(self):
+        self.entries = [None] * self.count
+
+    def index(self, zobrist_key):
+        return zobrist_key % self.count
+
+    def try_get_stored_move(self, zobrist_key):
+        """
+        Best move stored for this position, or None
+        """
+        entry = self.entries[zobrist_key % self.count]
+        if entry is not None and entry[0] == zobrist_key and entry[4]:
+            return Move(move_value=entry[4])
+        return None
+
+    def lookup_evaluation(self, zobrist_key, depth, ply_from_root, alpha, beta):
+        """
+        Stored evaluation of the position if it was searched at least as deep and the stored bound
+        is usable within the alpha-beta window; otherwise LookupFailed
+        """
+        if not self.enabled:
+            return TranspositionTable.LookupFailed
+
+        entry = self.entries[zobrist_key % self.count]
+        if entry is None or entry[0] != zobrist_key or entry[2] < depth:
+            return TranspositionTable.LookupFailed
+
+        corrected_score = TranspositionTable.correct_retrieved_mate_score(entry[1], ply_from_root)
+        node_type = entry[3]
+
+        if node_type == TranspositionTable.Exact:
+            return corrected_score
+        if node_type == TranspositionTable.UpperBound and corrected_score <= alpha:
+            return corrected_score
+        if node_type == TranspositionTable.LowerBound and corrected_score >= beta:
+            return corrected_score
+        return TranspositionTable.LookupFailed
+
+    def store_evaluation(self, zobrist_key, depth, num_ply_searched, evaluation, node_type, move):
+        if not self.enabled:
+            return
+
+        move_value = move.value if move is not None else 0
+        stored_eval = TranspositionTable.correct_mate_score_for_storage(evaluation, num_ply_searched)
+        self.entries[zobrist_key % self.count] = (zobrist_key, stored_eval, depth, node_type, move_value)
+
+    @staticmethod
+    def correct_mate_score_for_storage(score, num_ply_searched):
+        """
+        Mate scores are stored as distance from this position (rather than from the root), so they stay
+        correct when the position is reached at a different ply
+        """
+        if abs(score) > TranspositionTable.MateThreshold:
+            sign = 1 if score > 0 else -1
+            return (score * sign + num_ply_searched) * sign
+        return score
+
+    @staticmethod
+    def correct_retrieved_mate_score(score, num_ply_searched):
+        if abs(score) > TranspositionTable.MateThreshold:
+            sign = 1 if score > 0 else -1
+            return (score * sign - num_ply_searched) * sign
+        return score
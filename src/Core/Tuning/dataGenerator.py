@@ -0,0 +1,265 @@
+import argparse
+import glob
+import os
+import random
+import numpy as np
+from multiprocessing import Pool
+from Board.board import Board
+from Board.move import Move
+from Board.piece import Piece
+from Book.bookCompiler import BookCompiler
+from Book.openingBook import OpeningBook
+from Endgames.bitbase import BitbaseProber
+from Game_Result.arbiter import Arbiter, GameArbiter
+from Game_Result.gameResult import GameResult
+from Helpers.fenUtility import FenUtility
+from Move_Generation.moveGenerator import MoveGenerator
+from Search.searcher import Searcher
+
+class DataGenerator:
+    """
+    Generates training data for the evaluation (e.g. for the Texel tuner or a network trainer) from fixed-node self-play.
+    Games start from a random walk through the opening book followed by a few random moves. Quiet positions
+    (side to move not in check, best move neither a capture nor a promotion, no mate score) are sampled along the way
+    and labelled with the search score and the final result of the game.
+
+    Every worker process writes its own sequence of chunk files of packed records (RecordType), with no header,
+    so a chunk is read with np.fromfile(path, dtype=DataGenerator.RecordType). A chunk is written to a temporary file
+    and renamed once complete, so chunk files are never partially written
+    """
+    # pieces: one bitboard per piece, in Piece.PieceIndices order. side_to_move: 0 = white, 1 = black.
+    # castling_rights and en_passant_file as in GameState. score: search score (centipawns) for the side to move.
+    # result: final result of the game from white's perspective (1 = white won, 0 = draw, -1 = black won)
+    RecordType = np.dtype([('pieces', '<u8', (12,)), ('side_to_move', 'u1'), ('castling_rights', 'u1'),
+                           ('en_passant_file', 'u1'), ('fifty_move_counter', 'u1'), ('score', '<i2'), ('result', 'i1')])
+    ChunkFilePattern = "data_{worker:03d}_{chunk:05d}.bin"
+
+    MaxGamePly = 400
+    # Games are adjudicated as a win once the score has been at least this high (for the same side)
+    # for WinAdjudicationPly consecutive plies
+    WinAdjudicationScore = 1500
+    WinAdjudicationPly = 8
+    MaxScore = 32000
+
+    # State of the current worker process (created by init_worker)
+    worker_generator = None
+
+    def __init__(self, output_dir, max_nodes=5000, book=None, opening_ply=8, random_ply=4, min_sample_ply=16,
+                 sample_rate=0.5, chunk_size=100_000, tt_size_mb=16, seed=0, bitbase_path=None):
+        self.output_dir = output_dir
+        self.max_nodes = max_nodes
+        # Compiled book positions (see BookCompiler.compile_positions), or None to start from random moves only
+        self.book = book or {}
+        self.opening_ply = opening_ply
+        self.random_ply = random_ply
+        self.min_sample_ply = min_sample_ply
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.tt_size_mb = tt_size_mb
+        self.seed = seed
+        # Directory of bitbases to probe during search, or None
+        self.bitbase_path = bitbase_path
+
+        self.board = None
+        self.searcher = None
+        self.arbiter = None
+        self.move_generator = None
+        self.rng = None
+        self.worker_index = 0
+        self.chunk_index = 0
+        self.records = None
+        self.num_records = 0
+
+    def start_worker(self, worker_index):
+        """
+        Create the board, searcher and output buffer of a worker process
+        """
+        self.board = Board()
+        self.searcher = Searcher(self.board, self.tt_size_mb, BitbaseProber.load(self.bitbase_path) if self.bitbase_path else None)
+        self.arbiter = GameArbiter(self.board)
+        self.move_generator = MoveGenerator()
+        self.rng = random.Random(self.seed * 1000003 + worker_index)
+        self.worker_index = worker_index
+        self.chunk_index = 0
+        self.records = np.zeros(self.chunk_size, dtype=DataGenerator.RecordType)
+        self.num_records = 0
+
+        # Continue after the chunks written by a previous run, rather than overwriting them
+        while os.path.exists(self.get_chunk_path(self.chunk_index)):
+            self.chunk_index += 1
+
+    @staticmethod
+    def init_worker(generator):
+        DataGenerator.worker_generator = generator
+
+    @staticmethod
+    def run_worker(job):
+        """
+        Play the given number of games in the current worker process. Returns the number of positions written
+        """
+        worker_index, num_games = job
+        generator = DataGenerator.worker_generator
+        generator.start_worker(worker_index)
+
+        num_samples = 0
+        for _ in range(num_games):
+            num_samples += generator.play_game()
+        generator.flush()
+        return num_samples
+
+    def generate(self, num_games, num_workers=None):
+        """
+        Play num_games games spread over the workers. Returns the total number of positions written
+        """
+        num_workers = num_workers or os.cpu_count()
+        os.makedirs(self.output_dir, exist_ok=True)
+        jobs = [(worker_index, num_games // num_workers + (worker_index < num_games % num_workers)) for worker_index in range(num_workers)]
+
+        with Pool(num_workers, DataGenerator.init_worker, (self,)) as pool:
+            return sum(pool.imap_unordered(DataGenerator.run_worker, jobs))
+
+    def play_opening(self):
+        """
+        Load the start position and play the randomized opening: a weighted random walk through the book,
+        then a few uniformly random moves. Returns False if the opening ended the game
+        """
+        board = self.board
+        board.load_fen_fast(FenUtility.StartPositionFEN)
+        self.arbiter.reset()
+
+        for _ in range(self.opening_ply):
+            book_moves = self.book.get(OpeningBook.position_key(board))
+            if not book_moves:
+                break
+            move_value = self.rng.choices(list(book_moves), weights=list(book_moves.values()))[0]
+            self.arbiter.make_move(Move(move_value=move_value))
+
+        for _ in range(self.random_ply):
+            moves = self.move_generator.generate_moves(board)
+            if not moves:
+                return False
+            self.arbiter.make_move(self.rng.choice(moves))
+
+        return self.arbiter.get_game_state() == GameResult.InProgress
+
+    def play_game(self):
+        """
+        Play one self-play game and store its sampled positions. Returns the number of positions sampled
+        """
+        board = self.board
+        searcher = self.searcher
+        while not self.play_opening():
+            pass
+
+        searcher.clear_for_new_position()
+        samples = []
+        winning_side = 0
+        num_winning_ply = 0
+
+        result = GameResult.InProgress
+        while result == GameResult.InProgress:
+            move = searcher.start_search(max_nodes=self.max_nodes)
+            score = searcher.best_eval
+            if move.is_null:
+                break
+
+            if (board.ply_count >= self.min_sample_ply and not Searcher.is_mate_score(score) and not board.is_in_check()
+                    and board.square[move.target_square] == Piece.NoneType and not move.is_promotion
+                    and move.move_flag != Move.EnPassantCaptureFlag and self.rng.random() < self.sample_rate):
+                samples.append(self.get_record(score))
+
+            # Adjudicate once one side has been clearly winning for a while
+            white_score = score if board.is_white_to_move else -score
+            side = 0
+            if abs(white_score) >= DataGenerator.WinAdjudicationScore:
+                side = 1 if white_score > 0 else -1
+            num_winning_ply = num_winning_ply + 1 if side == winning_side else 1
+            winning_side = side
+            if winning_side != 0 and num_winning_ply >= DataGenerator.WinAdjudicationPly:
+                result = GameResult.BlackIsMated if winning_side > 0 else GameResult.WhiteIsMated
+                break
+
+            self.arbiter.make_move(move)
+            result = self.arbiter.get_game_state()
+            if result == GameResult.InProgress and board.ply_count >= DataGenerator.MaxGamePly:
+                result = GameResult.DrawByArbiter
+
+        if result == GameResult.InProgress:
+            result = GameResult.DrawByArbiter
+        white_result = 0 if Arbiter.is_draw_result(result) else (1 if Arbiter.is_white_wins_result(result) else -1)
+
+        for record in samples:
+            record[-1] = white_result
+            self.add_record(record)
+        return len(samples)
+
+    def get_record(self, score):
+        """
+        Record fields (in RecordType order) for the current position, with the result still to be filled in
+        """
+        board = self.board
+        game_state = board.current_game_state
+        pieces = [board.piece_bitboards[piece] for piece in Piece.PieceIndices]
+        score = max(-DataGenerator.MaxScore, min(DataGenerator.MaxScore, score))
+        return [pieces, board.move_color_index, game_state.castling_rights, game_state.en_passant_file,
+                min(255, game_state.fifty_move_counter), score, 0]
+
+    def add_record(self, record):
+        self.records[self.num_records] = tuple(record)
+        self.num_records += 1
+        if self.num_records == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered records as the next chunk file
+        """
+        if self.num_records == 0:
+            return
+        path = self.get_chunk_path(self.chunk_index)
+        temp_path = path + ".tmp"
+        self.records[:self.num_records].tofile(temp_path)
+        os.replace(temp_path, path)
+        self.chunk_index += 1
+        self.num_records = 0
+
+    def get_chunk_path(self, chunk_index):
+        return os.path.join(self.output_dir, DataGenerator.ChunkFilePattern.format(worker=self.worker_index, chunk=chunk_index))
+
+    @staticmethod
+    def load(path, mmap=False):
+        """
+        Records of a chunk file, or of every chunk file in a directory, as a structured array
+        """
+        paths = sorted(glob.glob(os.path.join(path, "*.bin"))) if os.path.isdir(path) else [path]
+        if mmap:
+            return [np.memmap(chunk_path, dtype=DataGenerator.RecordType, mode='r') for chunk_path in paths]
+        return np.concatenate([np.fromfile(chunk_path, dtype=DataGenerator.RecordType) for chunk_path in paths]
+                              or [np.zeros(0, dtype=DataGenerator.RecordType)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate training positions from fixed-node self-play games")
+    parser.add_argument("output", help="output directory for the chunk files")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--nodes", type=int, default=5000, help="node limit per move")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--book", default=None, help="text opening book to start games from")
+    parser.add_argument("--opening-ply", type=int, default=8, help="maximum number of book moves")
+    parser.add_argument("--random-ply", type=int, default=4, help="random moves played after the book moves")
+    parser.add_argument("--sample-rate", type=float, default=0.5, help="fraction of quiet positions written")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="positions per chunk file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bitbases", default=None, help="directory of bitbases to probe during search")
+    args = parser.parse_args()
+
+    book = BookCompiler.compile_positions(BookCompiler.read_text_book(args.book)) if args.book else None
+    generator = DataGenerator(args.output, args.nodes, book, args.opening_ply, args.random_ply,
+                              sample_rate=args.sample_rate, chunk_size=args.chunk_size, seed=args.seed,
+                              bitbase_path=args.bitbases)
+    num_positions = generator.generate(args.games, args.workers)
+    print(f"Wrote {num_positions} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import json
+import re
+import numpy as np
+from multiprocessing import Pool
+from Board.board import Board
+from Evaluation.evaluation import Evaluation
+
+class TexelTuner:
+    """
+    Tunes the evaluation weights on a set of labelled positions (FEN + game result) by minimising
+    the squared error between the game result and a sigmoid of the evaluation.
+
+    The features of every position are extracted only once into a sparse CSR matrix
+    (indptr, indices, data arrays), so that each epoch is a couple of vectorized numpy operations
+    rather than a full evaluation of every position.
+    """
+    # Matches the result of a position line, e.g. [1.0], [0.5], "1-0", "1/2-1/2", c9 "0-1";
+    ResultPattern = re.compile(r'\[(1\.0|0\.5|0\.0|1|0)\]|"?(1-0|0-1|1/2-1/2)"?')
+    ResultValues = {'1.0': 1.0, '1': 1.0, '0.5': 0.5, '0.0': 0.0, '0': 0.0, '1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5}
+
+    ChunkSize = 10000
+
+    def __init__(self):
+        self.num_positions = 0
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.float64)
+        self.results = np.zeros(0, dtype=np.float64)
+
+        # Row index of every stored value, used to compute matrix products with bincount
+        self.rows = np.zeros(0, dtype=np.int64)
+
+    def load_positions(self, path, num_workers=1, max_positions=None):
+        """
+        Load labelled positions from a file with one position per line and extract their features.
+        With num_workers > 1, feature extraction is split across a process pool in chunks of lines
+        """
+        chunks = TexelTuner.read_chunks(path, max_positions)
+
+        if num_workers > 1:
+            with Pool(num_workers) as pool:
+                extracted = list(pool.imap(TexelTuner.extract_chunk, chunks))
+        else:
+            extracted = [TexelTuner.extract_chunk(chunk) for chunk in chunks]
+
+        counts = [np.asarray(chunk_counts, dtype=np.int64) for chunk_counts, _, _, _ in extracted]
+        self.indices = np.concatenate([np.asarray(chunk_indices, dtype=np.int32) for _, chunk_indices, _, _ in extracted] or [self.indices])
+        self.data = np.concatenate([np.asarray(chunk_data, dtype=np.float64) for _, _, chunk_data, _ in extracted] or [self.data])
+        self.results = np.concatenate([np.asarray(chunk_results, dtype=np.float64) for _, _, _, chunk_results in extracted] or [self.results])
+
+        row_counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+        self.num_positions = len(row_counts)
+        self.indptr = np.zeros(self.num_positions + 1, dtype=np.int64)
+        np.cumsum(row_counts, out=self.indptr[1:])
+        self.rows = np.repeat(np.arange(self.num_positions, dtype=np.int64), row_counts)
+
+    @staticmethod
+    def read_chunks(path, max_positions=None):
+        """
+        Yield lists of lines from the dataset file, ChunkSize lines at a time
+        """
+        chunk = []
+        num_read = 0
+        with open(path, 'r') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                chunk.append(line)
+                num_read += 1
+
+                if len(chunk) == TexelTuner.ChunkSize:
+                    yield chunk
+                    chunk = []
+                if max_positions is not None and num_read >= max_positions:
+                    break
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def extract_chunk(lines):
+        """
+        Extract features for a chunk of position lines.
+        Returns (non-zero count per position, feature indices, feature values, results)
+        """
+        board = Board()
+        counts = []
+        indices = []
+        data = []
+        results = []
+
+        for line in lines:
+            parsed = TexelTuner.parse_line(line)
+            if parsed is None:
+                continue
+            fen, result = parsed
+
+            board.load_fen_fast(fen)
+            features = Evaluation.get_features(board)
+
+            counts.append(len(features))
+            for index, value in features:
+                indices.append(index)
+                data.append(value)
+            results.append(result)
+
+        return counts, indices, data, results
+
+    @staticmethod
+    def parse_line(line):
+        """
+        Split a dataset line into (fen, result) where result is 1.0, 0.5 or 0.0 from white's point of view.
+        Returns None if no result could be found
+        """
+        match = TexelTuner.ResultPattern.search(line)
+        if match is None:
+            return None
+
+        fen_fields = line[:match.start()].replace(';', ' ').split()
+        if len(fen_fields) < 4:
+            return None
+
+        # Keep board, side to move, castling rights, ep square and (if present) the move counters
+        fen_fields = fen_fields[:6] if len(fen_fields) >= 6 and fen_fields[4].isdigit() else fen_fields[:4]
+        result = TexelTuner.ResultValues[match.group(1) or match.group(2)]
+        return ' '.join(fen_fields), result
+
+    def evaluate_all(self, weights):
+        """
+        Evaluation of every position (from white's point of view) for the given weights: the product of the feature matrix and the weights
+        """
+        return np.bincount(self.rows, weights=self.data * weights[self.indices], minlength=self.num_positions)
+
+    @staticmethod
+    def sigmoid(evals, k):
+        return 1.0 / (1.0 + np.power(10.0, -k * evals / 400.0))
+
+    def loss(self, weights, k):
+        """
+        Mean squared error between results and predicted results
+        """
+        errors = self.results - TexelTuner.sigmoid(self.evaluate_all(weights), k)
+        return float(np.mean(errors * errors))
+
+    def gradient(self, weights, k):
+        """
+        Gradient of the loss with respect to the weights
+        """
+        predicted = TexelTuner.sigmoid(self.evaluate_all(weights), k)
+        # d(loss)/d(eval) for every position
+        eval_gradient = -2.0 * (self.results - predicted) * predicted * (1.0 - predicted) * k * np.log(10.0) / 400.0
+        feature_gradient = np.bincount(self.indices, weights=self.data * eval_gradient[self.rows], minlength=Evaluation.NumFeatures)
+        return feature_gradient / max(1, self.num_positions)
+
+    def find_scaling_constant(self, weights, low=0.1, high=3.0, iterations=30):
+        """
+        Find the scaling constant k which minimises the loss for the given (untuned) weights, with a golden section search
+        """
+        ratio = (np.sqrt(5.0) - 1.0) / 2.0
+        a = high - ratio * (high - low)
+        b = low + ratio * (high - low)
+        loss_a = self.loss(weights, a)
+        loss_b = self.loss(weights, b)
+
+        for _ in range(iterations):
+            if loss_a < loss_b:
+                high, b, loss_b = b, a, loss_a
+                a = high - ratio * (high - low)
+                loss_a = self.loss(weights, a)
+            else:
+                low, a, loss_a = a, b, loss_b
+                b = low + ratio * (high - low)
+                loss_b = self.loss(weights, b)
+
+        return (low + high) / 2.0
+
+    def tune(self, weights, k, epochs=1000, learning_rate=1.0, log_interval=50):
+        """
+        Fit the weights by gradient descent (with Adam step sizes, since features are on very different scales).
+        Returns the tuned weights
+        """
+        weights = np.asarray(weights, dtype=np.float64).copy()
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        momentum = np.zeros_like(weights)
+        velocity = np.zeros_like(weights)
+
+        for epoch in range(1, epochs + 1):
+            gradient = self.gradient(weights, k)
+            momentum = beta1 * momentum + (1.0 - beta1) * gradient
+            velocity = beta2 * velocity + (1.0 - beta2) * gradient * gradient
+            momentum_hat = momentum / (1.0 - beta1 ** epoch)
+            velocity_hat = velocity / (1.0 - beta2 ** epoch)
+            weights -= learning_rate * momentum_hat / (np.sqrt(velocity_hat) + epsilon)
+
+            if log_interval and epoch % log_interval == 0:
+                print(f"Epoch {epoch}: loss {self.loss(weights, k):.6f}")
+
+        return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune evaluation weights on a set of labelled positions")
+    parser.add_argument("dataset", help="file with one position per line: FEN followed by the result, e.g. [1.0] or \"1/2-1/2\"")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes used for feature extraction")
+    parser.add_argument("--max-positions", type=int, default=None)
+    parser.add_argument("--epochs", type=int, default=1000)
+    parser.add_argument("--learning-rate", type=float, default=1.0)
+    parser.add_argument("--k", type=float, default=None, help="sigmoid scaling constant (fitted if not given)")
+    parser.add_argument("--output", default=None, help="write the tuned weights to this JSON file (for program.py's weights= option)")
+    args = parser.parse_args()
+
+    tuner = TexelTuner()
+    tuner.load_positions(args.dataset, args.workers, args.max_positions)
+    print(f"Loaded {tuner.num_positions} positions")
+
+    weights = np.asarray(Evaluation.get_weights(), dtype=np.float64)
+    k = args.k if args.k is not None else tuner.find_scaling_constant(weights)
+    print(f"Scaling constant k = {k:.4f}, initial loss {tuner.loss(weights, k):.6f}")
+
+    weights = tuner.tune(weights, k, args.epochs, args.learning_rate)
+    Evaluation.set_weights(weights)
+    print("Tuned weights:", Evaluation.get_weights())
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(Evaluation.get_weights(), file)
+        print(f"Wrote weights to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import os
+import threading
+from Board.board import Board
+from Book.openingBook import OpeningBook
+from Endgames.bitbase import BitbaseProber
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from Move_Generation.moveGenerator import MoveGenerator
+from Search.searcher import Searcher
+from Search.timeManager import TimeManager
+
+class Bot:
+    """
+    Owns the board and searcher, and runs searches on a background thread so that
+    commands (such as stop) can be handled while the bot is thinking
+    """
+    UseOpeningBook = True
+    MaxBookPly = 16
+    BookPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources", "Book.bin")
+    # Bitbases (see BitbaseGenerator) probed during search, if the directory has any; can be changed with set_bitbase_path
+    BitbasePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources", "Bitbases")
+
+    # Limit think time when playing with a clock, even if a lot of time remains
+    UseMaxThinkTime = False
+    MaxThinkTimeMs = 2500
+
+    def __init__(self, tt_size_mb=64):
+        self.board = Board.create_board()
+        self.searcher = Searcher(self.board, tt_size_mb, BitbaseProber.load(Bot.BitbasePath))
+        self.move_generator = MoveGenerator()
+        self.book = OpeningBook(Bot.BookPath) if Bot.UseOpeningBook and os.path.exists(Bot.BookPath) else None
+
+        # Called with the UCI names of the chosen move and the expected reply (or None) when thinking ends
+        self.on_move_chosen = None
+
+        self.is_thinking = False
+        self.latest_move_is_book_move = False
+        self.search_thread = None
+        self.time_manager = None
+        # Time (ms) held back from the clock for communication latency
+        self.move_overhead_ms = TimeManager.DefaultMoveOverheadMs
+
+        # While pondering the search runs without a time limit on the opponent's clock. The think time only starts
+        # counting at ponder_hit, and a search that finishes early holds its move until ponder_hit or stop_thinking
+        self.is_pondering = False
+        self.deferred_move = None
+        self.ponder_lock = threading.Lock()
+
+        # Position as last set by set_position: start fen and UCI names of the moves played from it
+        self.position_fen = FenUtility.StartPositionFEN
+        self.position_moves = []
+
+    def notify_new_game(self):
+        self.stop_thinking()
+        self.searcher.clear_for_new_position()
+
+    def set_bitbase_path(self, path):
+        """
+        Probe the bitbases in the given directory during search (or none, if the path is empty or has no tables)
+        """
+        self.stop_thinking()
+        self.searcher.set_bitbase_prober(BitbaseProber.load(path) if path else None)
+
+    def set_position(self, fen, move_names=()):
+        """
+        Set the position to the given fen followed by the given moves (UCI names).
+        If the fen is unchanged, moves that the new list shares with the current position are kept,
+        so when the move list extends the previous one only the new moves are made.
+        Moves are played up to the first one that is not legal; returns the name of that move (None if all were legal)
+        """
+        self.stop_thinking()
+        move_names = list(move_names)
+
+        if fen != self.position_fen:
+            self.board.load_position(fen)
+            self.position_fen = fen
+            self.position_moves = []
+
+        num_common = 0
+        while (num_common < len(self.position_moves) and num_common < len(move_names)
+               and self.position_moves[num_common] == move_names[num_common]):
+            num_common += 1
+
+        while len(self.position_moves) > num_common:
+            self.board.unmake_move(self.board.all_game_moves[-1])
+            self.position_moves.pop()
+
+        for move_name in move_names[num_common:]:
+            if not self.make_move(move_name):
+                return move_name
+        return None
+
+    def make_move(self, move_name):
+        """
+        Make the move with the given UCI name if it is legal in the current position; returns whether it was made
+        """
+        uci_name = move_name.lower().replace("=", "")
+        for move in self.move_generator.generate_moves(self.board):
+            if MoveUtility.get_move_name_uci(move) == uci_name:
+                self.board.make_move(move)
+                self.position_moves.append(move_name)
+                return True
+        return False
+
+    def create_time_manager(self, time_remaining_white_ms, time_remaining_black_ms, increment_white_ms, increment_black_ms, moves_to_go=None):
+        """
+        Time manager for the side to move, given the clock state
+        """
+        my_time_remaining_ms = time_remaining_white_ms if self.board.is_white_to_move else time_remaining_black_ms
+        my_increment_ms = increment_white_ms if self.board.is_white_to_move else increment_black_ms
+        max_think_time_ms = Bot.MaxThinkTimeMs if Bot.UseMaxThinkTime else None
+        return TimeManager.for_clock(my_time_remaining_ms, my_increment_ms, moves_to_go, self.move_overhead_ms, max_think_time_ms)
+
+    def create_move_time_manager(self, move_time_ms):
+        return TimeManager.for_move_time(move_time_ms, self.move_overhead_ms)
+
+    def think(self, time_manager=None, max_depth=None, max_nodes=None, ponder=False):
+        """
+        Start thinking on a background thread. The search ends when the time manager (if any) stops it,
+        the depth or node limit is reached, or stop_thinking is called.
+        When pondering, the think time only starts counting once ponder_hit is called
+        """
+        self.stop_thinking()
+        self.latest_move_is_book_move = False
+        self.is_thinking = True
+        self.is_pondering = ponder
+        self.deferred_move = None
+        self.time_manager = time_manager
+        if time_manager is not None:
+            time_manager.is_pondering = ponder
+            time_manager.start_clock()
+
+        book_move = None if ponder else self.try_get_opening_book_move()
+        if book_move is not None:
+            self.latest_move_is_book_move = True
+            self.on_search_complete(book_move)
+            return
+
+        self.searcher.on_search_complete = self.on_search_complete
+        self.search_thread = threading.Thread(target=self.searcher.start_search, args=(max_depth, max_nodes, time_manager), daemon=True)
+        self.search_thread.start()
+
+    def ponder_hit(self):
+        """
+        The opponent played the expected move: the ponder search carries on as a normal timed search
+        (keeping its transposition table and iteration state), with the think time starting now
+        """
+        with self.ponder_lock:
+            if not self.is_pondering:
+                return
+            self.is_pondering = False
+            deferred_move = self.deferred_move
+            self.deferred_move = None
+
+        if deferred_move is not None:
+            self.report_move(deferred_move)
+        elif self.time_manager is not None:
+            self.time_manager.ponder_hit()
+
+    def stop_thinking(self):
+        """
+        End the current search (if any) and wait for it to report its move
+        """
+        # A ponder search that has already finished is waiting to report its move
+        with self.ponder_lock:
+            self.is_pondering = False
+            deferred_move = self.deferred_move
+            self.deferred_move = None
+        if deferred_move is not None:
+            self.report_move(deferred_move)
+
+        if self.search_thread is not None:
+            self.searcher.end_search()
+            if self.search_thread is not threading.current_thread():
+                self.search_thread.join()
+            self.search_thread = None
+
+    def quit(self):
+        self.stop_thinking()
+
+    def on_search_complete(self, move):
+        # The best move must not be reported while pondering, even if the search has finished
+        with self.ponder_lock:
+            if self.is_pondering:
+                self.deferred_move = move
+                return
+        self.report_move(move)
+
+    def report_move(self, move):
+        self.is_thinking = False
+
+        if self.on_move_chosen is not None:
+            ponder_move = self.get_ponder_move(move)
+            ponder_move_name = MoveUtility.get_move_name_uci(ponder_move) if ponder_move is not None else None
+            self.on_move_chosen(MoveUtility.get_move_name_uci(move), ponder_move_name)
+
+    def get_ponder_move(self, move):
+        """
+        Expected reply to the chosen move (the second move of the principal variation), or None if unknown
+        """
+        if self.latest_move_is_book_move:
+            return None
+        pv = self.searcher.pv
+        if len(pv) > 1 and pv[0].value == move.value:
+            return pv[1]
+        return None
+
+    def try_get_opening_book_move(self):
+        if self.book is not None and self.board.ply_count <= Bot.MaxBookPly:
+            return self.book.try_get_book_move(self.board)
+        return None
+
+    def get_board_diagram(self):
+        return str(self.board)
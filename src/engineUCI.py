@@ -0,0 +1,184 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Core"))
+
+from bot import Bot
+from Benchmarks.profiler import Profiler
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from Search.searcher import Searcher
+from Search.timeManager import TimeManager
+
+class EngineUCI:
+    """
+    Universal Chess Interface front end: reads commands from stdin and responds on stdout.
+    Searches run on the bot's background thread, so stop/isready/quit are answered while thinking
+    """
+    Name = "Chess-AI"
+    Author = "RayhanRizqi"
+
+    # Minimum time between info lines (the info for the final iteration is always sent before bestmove)
+    InfoIntervalSeconds = 0.1
+
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.bot = Bot()
+        self.bot.on_move_chosen = self.on_move_chosen
+        self.bot.searcher.on_info = self.on_search_info
+
+        self.last_info_time = 0.0
+        self.pending_info = None
+        self.is_quitting = False
+
+    def run(self):
+        for line in sys.stdin:
+            self.receive_command(line)
+            if self.is_quitting:
+                break
+
+    def receive_command(self, message):
+        message = message.strip()
+        if not message:
+            return
+
+        tokens = message.split()
+        message_type = tokens[0].lower()
+
+        if message_type == "uci":
+            self.respond(f"id name {EngineUCI.Name}")
+            self.respond(f"id author {EngineUCI.Author}")
+            self.respond("option name Ponder type check default true")
+            self.respond(f"option name Move Overhead type spin default {TimeManager.DefaultMoveOverheadMs} min 0 max 5000")
+            self.respond(f"option name BitbasePath type string default {os.path.normpath(Bot.BitbasePath)}")
+            self.respond("uciok")
+        elif message_type == "setoption":
+            self.process_setoption_command(message)
+        elif message_type == "isready":
+            self.respond("readyok")
+        elif message_type == "ucinewgame":
+            self.bot.notify_new_game()
+        elif message_type == "position":
+            self.process_position_command(tokens)
+        elif message_type == "go":
+            self.process_go_command(tokens)
+        elif message_type == "ponderhit":
+            self.bot.ponder_hit()
+        elif message_type == "stop":
+            if self.bot.is_thinking:
+                self.bot.stop_thinking()
+        elif message_type == "quit":
+            self.is_quitting = True
+            self.bot.quit()
+        elif message_type == "d":
+            self.respond(self.bot.get_board_diagram())
+
+    def process_position_command(self, tokens):
+        """
+        position startpos [moves ...] / position fen <fen> [moves ...]
+        """
+        moves_index = tokens.index("moves") if "moves" in tokens else len(tokens)
+
+        if len(tokens) > 1 and tokens[1] == "fen":
+            fen = ' '.join(tokens[2:moves_index])
+        else:
+            fen = FenUtility.StartPositionFEN
+
+        illegal_move_name = self.bot.set_position(fen, tokens[moves_index + 1:])
+        if illegal_move_name is not None:
+            self.respond(f"info string illegal move {illegal_move_name}: position set up to the previous move")
+
+    def process_setoption_command(self, message):
+        """
+        setoption name <name> [value <value>]
+        """
+        name, _, value = message[len("setoption"):].strip().partition(" value ")
+        name = name.strip()[len("name"):].strip().lower()
+        if name == "move overhead":
+            try:
+                self.bot.move_overhead_ms = max(0, int(value))
+            except ValueError:
+                pass
+        elif name == "bitbasepath":
+            self.bot.set_bitbase_path(value.strip())
+
+    def process_go_command(self, tokens):
+        """
+        go [ponder] [depth d] [nodes n] [movetime ms] [wtime ms] [btime ms] [winc ms] [binc ms] [movestogo n] [infinite]
+        """
+        limits = EngineUCI.parse_go_limits(tokens)
+
+        time_manager = None
+        if "movetime" in limits:
+            time_manager = self.bot.create_move_time_manager(limits["movetime"])
+        elif ("wtime" in limits or "btime" in limits) and "infinite" not in limits:
+            time_manager = self.bot.create_time_manager(limits.get("wtime", 0), limits.get("btime", 0), limits.get("winc", 0),
+                                                        limits.get("binc", 0), limits.get("movestogo"))
+
+        self.last_info_time = 0.0
+        self.pending_info = None
+        self.bot.think(time_manager, limits.get("depth"), limits.get("nodes"), limits.get("ponder", False))
+
+    @staticmethod
+    def parse_go_limits(tokens):
+        limits = {}
+        for name in ("depth", "nodes", "movetime", "wtime", "btime", "winc", "binc", "movestogo"):
+            if name in tokens:
+                index = tokens.index(name)
+                if index + 1 < len(tokens):
+                    limits[name] = int(tokens[index + 1])
+        if "infinite" in tokens:
+            limits["infinite"] = True
+        if "ponder" in tokens:
+            limits["ponder"] = True
+        return limits
+
+    def on_search_info(self, info):
+        """
+        Called from the search thread after each iteration. Info lines are rate limited: if one was sent recently,
+        this one is held back (and replaced by later ones) until the interval has passed or the search ends
+        """
+        now = time.perf_counter()
+        if now - self.last_info_time < EngineUCI.InfoIntervalSeconds:
+            self.pending_info = info
+            return
+
+        self.pending_info = None
+        self.last_info_time = now
+        self.respond(EngineUCI.format_info(info))
+
+    @staticmethod
+    def format_info(info):
+        if Searcher.is_mate_score(info.score):
+            num_ply = Searcher.num_ply_to_mate(info.score)
+            mate_in_moves = (num_ply + 1) // 2
+            score = f"mate {mate_in_moves if info.score > 0 else -mate_in_moves}"
+        else:
+            score = f"cp {info.score}"
+
+        pv = ' '.join(MoveUtility.get_move_name_uci(move) for move in info.pv)
+        return f"info depth {info.depth} score {score} nodes {info.nodes} nps {info.nps} time {info.time_ms} pv {pv}"
+
+    def on_move_chosen(self, move_name, ponder_move_name=None):
+        if self.pending_info is not None:
+            self.respond(EngineUCI.format_info(self.pending_info))
+            self.pending_info = None
+
+        if ponder_move_name is not None:
+            self.respond(f"bestmove {move_name} ponder {ponder_move_name}")
+        else:
+            self.respond(f"bestmove {move_name}")
+
+    def respond(self, message):
+        with self.output_lock:
+            self.output.write(message + "\n")
+            self.output.flush()
+
+
+if __name__ == "__main__":
+    # Swap in the instrumented hot paths when profiling is requested; otherwise nothing is wrapped
+    Profiler.enable_from_environment()
+    EngineUCI().run()
@@ -0,0 +1,321 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Core"))
+
+from Board.board import Board
+from Board.move import Move
+from Book.bookCompiler import BookCompiler
+from Book.openingBook import OpeningBook
+from Endgames.bitbase import BitbaseProber
+from Evaluation.evaluation import Evaluation
+from Game_Result.arbiter import Arbiter, GameArbiter
+from Game_Result.gameResult import GameResult
+from Helpers.fenUtility import FenUtility
+from Helpers.pgnWriter import PGNWriter
+from Search.searcher import Searcher
+from Search.timeManager import TimeManager
+
+class EngineConfig:
+    """
+    Settings of one of the engines in a match. Configurations are plain data so they can be sent to worker processes
+    """
+    def __init__(self, name, tt_size_mb=16, max_depth=None, max_nodes=None, weights=None, bitbase_path=None):
+        self.name = name
+        self.tt_size_mb = tt_size_mb
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        # Evaluation weights (see Evaluation.get_weights), or None for the built-in weights
+        self.weights = weights
+        # Directory of bitbases to probe during search, or None
+        self.bitbase_path = bitbase_path
+
+    @staticmethod
+    def from_string(text):
+        """
+        Parse "name[,key=value...]", e.g. "tuned,weights=weights.json,hash=32" or "base,depth=6,bitbases=resources/Bitbases"
+        """
+        name, *options = text.split(',')
+        config = EngineConfig(name)
+        for option in options:
+            key, value = option.split('=', 1)
+            if key == "hash":
+                config.tt_size_mb = int(value)
+            elif key == "depth":
+                config.max_depth = int(value)
+            elif key == "nodes":
+                config.max_nodes = int(value)
+            elif key == "weights":
+                with open(value, 'r') as file:
+                    config.weights = json.load(file)
+            elif key == "bitbases":
+                config.bitbase_path = value
+            else:
+                raise ValueError(f"Unknown engine option '{key}'")
+        return config
+
+
+class MatchPlayer:
+    """
+    An engine playing in a worker process: a searcher over the shared game board, using its own evaluation weights
+    """
+    # Weights of the built-in evaluation, restored before configs without their own weights search
+    DefaultWeights = Evaluation.get_weights()
+
+    def __init__(self, config, board):
+        self.config = config
+        bitbase_prober = BitbaseProber.load(config.bitbase_path) if config.bitbase_path else None
+        self.searcher = Searcher(board, config.tt_size_mb, bitbase_prober)
+
+    def choose_move(self, time_remaining_ms, increment_ms):
+        Evaluation.set_weights(self.config.weights if self.config.weights is not None else MatchPlayer.DefaultWeights)
+
+        # Games are played in-process, so no time needs to be held back for communication
+        time_manager = TimeManager.for_clock(time_remaining_ms, increment_ms, move_overhead_ms=0)
+        return self.searcher.start_search(self.config.max_depth, self.config.max_nodes, time_manager)
+
+
+class MatchRunner:
+    """
+    Plays games between two engine configurations on a pool of worker processes.
+    Each opening is played twice, with the engines swapping colours. Results are streamed to a PGN file
+    and summarised as an Elo difference with a 95% confidence interval and (optionally) an SPRT verdict
+    """
+    MaxGamePly = 400
+
+    # Per-process state of the workers
+    worker_board = None
+    worker_arbiter = None
+    worker_players = None
+
+    def __init__(self, config_a, config_b, base_time_ms=10000, increment_ms=100, num_workers=None,
+                 book_path=None, opening_ply=8, seed=0):
+        self.configs = (config_a, config_b)
+        self.base_time_ms = base_time_ms
+        self.increment_ms = increment_ms
+        self.num_workers = num_workers or os.cpu_count()
+        self.opening_ply = opening_ply
+        self.rng = random.Random(seed)
+        self.book = BookCompiler.compile_positions(BookCompiler.read_text_book(book_path)) if book_path else {}
+
+        # Results from engine A's point of view
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def pick_opening(self):
+        """
+        Random walk through the book (weighted by play count) for up to opening_ply moves. Returns the move values
+        """
+        board = Board.create_board()
+        move_values = []
+
+        for _ in range(self.opening_ply):
+            book_moves = self.book.get(OpeningBook.position_key(board))
+            if not book_moves:
+                break
+            move_value = self.rng.choices(list(book_moves), weights=list(book_moves.values()))[0]
+            board.make_move(Move(move_value=move_value))
+            move_values.append(move_value)
+
+        return move_values
+
+    def game_specs(self, num_games):
+        """
+        (game index, opening, white config, black config, engine A plays white) for each game
+        """
+        for pair_index in range((num_games + 1) // 2):
+            opening = self.pick_opening()
+            for swap in (False, True):
+                game_index = pair_index * 2 + swap
+                if game_index >= num_games:
+                    return
+                white, black = (self.configs[1], self.configs[0]) if swap else self.configs
+                yield game_index, opening, white, black, not swap, self.base_time_ms, self.increment_ms
+
+    @staticmethod
+    def init_worker():
+        MatchRunner.worker_board = Board()
+        MatchRunner.worker_arbiter = GameArbiter(MatchRunner.worker_board)
+        MatchRunner.worker_players = {}
+
+    @staticmethod
+    def get_worker_player(config):
+        """
+        Players (and their transposition tables) are kept for the lifetime of the worker and reused from game to game
+        """
+        players = MatchRunner.worker_players
+        key = json.dumps(vars(config), sort_keys=True)
+        if key not in players:
+            players[key] = MatchPlayer(config, MatchRunner.worker_board)
+        return players[key]
+
+    @staticmethod
+    def play_game(spec):
+        """
+        Play one game in a worker process. Returns (game index, move values, GameResult, engine A plays white)
+        """
+        game_index, opening, white_config, black_config, a_is_white, base_time_ms, increment_ms = spec
+        board = MatchRunner.worker_board
+        arbiter = MatchRunner.worker_arbiter
+        board.load_fen_fast(FenUtility.StartPositionFEN)
+        arbiter.reset()
+        for move_value in opening:
+            arbiter.make_move(Move(move_value=move_value))
+
+        players = [MatchRunner.get_worker_player(white_config), MatchRunner.get_worker_player(black_config)]
+        for player in players:
+            player.searcher.clear_for_new_position()
+        time_remaining_ms = [base_time_ms, base_time_ms]
+
+        result = arbiter.get_game_state()
+        while result == GameResult.InProgress:
+            color_index = board.move_color_index
+            player = players[color_index]
+
+            start_time = time.perf_counter()
+            move = player.choose_move(time_remaining_ms[color_index], increment_ms)
+            time_remaining_ms[color_index] -= (time.perf_counter() - start_time) * 1000
+
+            if time_remaining_ms[color_index] < 0:
+                result = GameResult.WhiteTimeout if board.is_white_to_move else GameResult.BlackTimeout
+                break
+            if move.is_null:
+                result = GameResult.WhiteIllegalMove if board.is_white_to_move else GameResult.BlackIllegalMove
+                break
+
+            time_remaining_ms[color_index] += increment_ms
+            arbiter.make_move(move)
+            result = arbiter.get_game_state()
+            if result == GameResult.InProgress and len(board.all_game_moves) >= MatchRunner.MaxGamePly:
+                result = GameResult.DrawByArbiter
+
+        return game_index, [move.value for move in board.all_game_moves], result, a_is_white
+
+    def record_result(self, result, a_is_white):
+        if Arbiter.is_draw_result(result):
+            self.draws += 1
+        elif Arbiter.is_white_wins_result(result) == a_is_white:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def run(self, num_games, pgn_path=None, sprt=None):
+        """
+        Play the match. sprt is an optional (elo0, elo1, alpha, beta) tuple: the match stops as soon as the
+        SPRT accepts either hypothesis. Returns the SPRT verdict ("H0", "H1") or None
+        """
+        writer = PGNWriter(pgn_path) if pgn_path else None
+        verdict = None
+
+        with Pool(self.num_workers, MatchRunner.init_worker) as pool:
+            for game_index, move_values, result, a_is_white in pool.imap_unordered(MatchRunner.play_game, self.game_specs(num_games)):
+                self.record_result(result, a_is_white)
+
+                if writer is not None:
+                    white, black = (self.configs[0], self.configs[1]) if a_is_white else (self.configs[1], self.configs[0])
+                    moves = [Move(move_value=value) for value in move_values]
+                    writer.write_game(moves, result, white_name=white.name, black_name=black.name,
+                                      headers={"Event": "Match", "Round": str(game_index + 1), "Termination": result.name})
+
+                print(self.get_summary(), flush=True)
+                if sprt is not None:
+                    verdict = MatchRunner.sprt_verdict(self.wins, self.draws, self.losses, *sprt)
+                    if verdict is not None:
+                        pool.terminate()
+                        break
+
+        if writer is not None:
+            writer.close()
+        return verdict
+
+    def get_summary(self):
+        num_games = self.wins + self.draws + self.losses
+        elo, error = MatchRunner.elo_difference(self.wins, self.draws, self.losses)
+        return (f"Games: {num_games}  {self.configs[0].name} vs {self.configs[1].name}: "
+                f"+{self.wins} ={self.draws} -{self.losses}  Elo: {elo:+.1f} +/- {error:.1f}")
+
+    @staticmethod
+    def elo_from_score(score):
+        score = min(max(score, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / score - 1)
+
+    @staticmethod
+    def elo_difference(wins, draws, losses):
+        """
+        Elo difference and the half-width of its 95% confidence interval
+        """
+        num_games = wins + draws + losses
+        if num_games == 0:
+            return 0.0, 0.0
+
+        score = (wins + 0.5 * draws) / num_games
+        variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / num_games
+        margin = 1.96 * math.sqrt(variance / num_games)
+        elo = MatchRunner.elo_from_score(score)
+        error = (MatchRunner.elo_from_score(score + margin) - MatchRunner.elo_from_score(score - margin)) / 2
+        return elo, error
+
+    @staticmethod
+    def sprt_llr(wins, draws, losses, elo0, elo1):
+        """
+        Log likelihood ratio of H1 (elo = elo1) against H0 (elo = elo0), using the normal approximation
+        of the per-game score distribution
+        """
+        num_games = wins + draws + losses
+        if num_games == 0 or wins == num_games or losses == num_games:
+            return 0.0
+
+        score = (wins + 0.5 * draws) / num_games
+        variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / num_games
+        if variance <= 0:
+            return 0.0
+
+        score0 = 1 / (1 + 10 ** (-elo0 / 400))
+        score1 = 1 / (1 + 10 ** (-elo1 / 400))
+        return num_games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+    @staticmethod
+    def sprt_verdict(wins, draws, losses, elo0, elo1, alpha=0.05, beta=0.05):
+        llr = MatchRunner.sprt_llr(wins, draws, losses, elo0, elo1)
+        if llr >= math.log((1 - beta) / alpha):
+            return "H1"
+        if llr <= math.log(beta / (1 - alpha)):
+            return "H0"
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a match between two engine configurations")
+    parser.add_argument("engine_a", help='engine config, e.g. "new,weights=tuned.json" (options: hash, depth, nodes, weights, bitbases)')
+    parser.add_argument("engine_b", help='engine config, e.g. "base"')
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--time", type=float, default=10.0, help="base time per game in seconds")
+    parser.add_argument("--inc", type=float, default=0.1, help="increment per move in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--book", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources", "Book.txt"))
+    parser.add_argument("--opening-ply", type=int, default=8)
+    parser.add_argument("--pgn", default=None, help="write games to this PGN file")
+    parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"), default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    runner = MatchRunner(EngineConfig.from_string(args.engine_a), EngineConfig.from_string(args.engine_b),
+                         int(args.time * 1000), int(args.inc * 1000), args.workers,
+                         args.book if os.path.exists(args.book) else None, args.opening_ply, args.seed)
+    verdict = runner.run(args.games, args.pgn, tuple(args.sprt) if args.sprt else None)
+
+    print(runner.get_summary())
+    if args.sprt:
+        llr = MatchRunner.sprt_llr(runner.wins, runner.draws, runner.losses, *args.sprt)
+        print(f"SPRT: LLR {llr:.2f}, {verdict or 'inconclusive'}")
+
+
+if __name__ == "__main__":
+    main()
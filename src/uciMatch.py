@@ -0,0 +1,344 @@
+import argparse
+import asyncio
+import os
+import random
+import shlex
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Core"))
+
+from Board.board import Board
+from Game_Result.arbiter import Arbiter, GameArbiter
+from Game_Result.gameResult import GameResult
+from Helpers.epdReader import EpdReader
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from Helpers.pgnWriter import PGNWriter
+from Move_Generation.moveGenerator import MoveGenerator
+from program import MatchRunner
+
+class UCIEngineSpec:
+    """
+    How to launch a UCI engine: display name, command line and the options sent to it after startup
+    """
+    # Command of this project's own UCI engine
+    OwnEngineCommand = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "engineUCI.py")]
+
+    def __init__(self, name, command, options=None):
+        self.name = name
+        self.command = command
+        self.options = options or {}
+
+    @staticmethod
+    def from_string(text):
+        """
+        Parse "name:command[;Option=Value...]", e.g. "stockfish:/usr/bin/stockfish;Hash=16;Threads=1".
+        A command of "self" (or no command) launches engineUCI.py
+        """
+        name, _, rest = text.partition(':')
+        command, *options = rest.split(';')
+        command = shlex.split(command)
+        if not command or command == ["self"]:
+            command = list(UCIEngineSpec.OwnEngineCommand)
+        return UCIEngineSpec(name, command, dict(option.split('=', 1) for option in options if option))
+
+
+class UCIEngine:
+    """
+    A running UCI engine subprocess, driven through non-blocking pipes
+    """
+    StartupTimeoutSeconds = 10.0
+    ReadyTimeoutSeconds = 10.0
+    QuitTimeoutSeconds = 2.0
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.process = None
+        # Set once the process has been killed, since its return code is only known after it has been waited for
+        self.killed = False
+
+    @property
+    def is_alive(self):
+        return self.process is not None and self.process.returncode is None and not self.killed
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(*self.spec.command, stdin=asyncio.subprocess.PIPE,
+                                                            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        await self.send("uci")
+        await self.wait_for("uciok", UCIEngine.StartupTimeoutSeconds)
+        for name, value in self.spec.options.items():
+            await self.send(f"setoption name {name} value {value}")
+        await self.wait_until_ready()
+
+    async def send(self, command):
+        self.process.stdin.write((command + "\n").encode())
+        await self.process.stdin.drain()
+
+    async def wait_for(self, token, timeout_seconds):
+        """
+        Read lines until one starts with the given token and return it (output such as info lines is skipped).
+        Raises asyncio.TimeoutError if the token isn't received in time, or EOFError if the engine exits
+        """
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            line = await asyncio.wait_for(self.process.stdout.readline(), max(0.0, deadline - time.monotonic()))
+            if not line:
+                raise EOFError(f"{self.spec.name} exited")
+            line = line.decode(errors='replace').strip()
+            if line.split(' ', 1)[0] == token:
+                return line
+
+    async def wait_until_ready(self):
+        await self.send("isready")
+        await self.wait_for("readyok", UCIEngine.ReadyTimeoutSeconds)
+
+    async def new_game(self):
+        await self.send("ucinewgame")
+        await self.wait_until_ready()
+
+    async def go(self, start_fen, move_names, time_remaining_ms, increment_ms, timeout_seconds):
+        """
+        Ask for a move in the position given by the start fen and moves. Returns the UCI name of the move
+        """
+        position = "startpos" if start_fen == FenUtility.StartPositionFEN else f"fen {start_fen}"
+        if move_names:
+            position += " moves " + ' '.join(move_names)
+        await self.send(f"position {position}")
+        await self.send(f"go wtime {int(time_remaining_ms[0])} btime {int(time_remaining_ms[1])} "
+                        f"winc {increment_ms} binc {increment_ms}")
+
+        line = await self.wait_for("bestmove", timeout_seconds)
+        tokens = line.split()
+        return tokens[1] if len(tokens) > 1 else "0000"
+
+    async def quit(self):
+        if self.process is None:
+            return
+        if self.is_alive:
+            try:
+                await self.send("quit")
+                await asyncio.wait_for(self.process.wait(), UCIEngine.QuitTimeoutSeconds)
+                return
+            except (asyncio.TimeoutError, ConnectionError):
+                self.kill()
+        # Reap a process which exited or was killed
+        await self.process.wait()
+
+    def kill(self):
+        if self.is_alive:
+            self.process.kill()
+            self.killed = True
+
+
+class UCIEnginePool:
+    """
+    Idle processes of one engine, reused from game to game so engines are only started once per concurrent game
+    """
+    def __init__(self, spec):
+        self.spec = spec
+        self.idle_engines = []
+        self.all_engines = []
+
+    async def acquire(self):
+        while self.idle_engines:
+            engine = self.idle_engines.pop()
+            if engine.is_alive:
+                return engine
+
+        engine = UCIEngine(self.spec)
+        self.all_engines.append(engine)
+        try:
+            await engine.start()
+        except BaseException:
+            # Left in all_engines, so that close reaps the process
+            engine.kill()
+            raise
+        return engine
+
+    def release(self, engine):
+        if engine.is_alive:
+            self.idle_engines.append(engine)
+
+    async def close(self):
+        await asyncio.gather(*(engine.quit() for engine in self.all_engines))
+        self.idle_engines = []
+        self.all_engines = []
+
+
+class UCIMatchHarness:
+    """
+    Gauntlet between external UCI engines: the first engine plays every other engine, with each opening played twice
+    and colours swapped. Games run concurrently on a single asyncio event loop; every engine is a subprocess driven
+    through its pipes, so waiting on one engine never blocks the others. Moves are checked for legality before they
+    are played, and games are adjudicated by the arbiter
+    """
+    MaxGamePly = 400
+    # Extra time given to an engine to reply beyond its remaining clock, before it is stopped and loses on time
+    TimeoutGraceMs = 1000
+
+    def __init__(self, specs, base_time_ms=10000, increment_ms=100, concurrency=None, openings=None, seed=0):
+        self.specs = specs
+        self.base_time_ms = base_time_ms
+        self.increment_ms = increment_ms
+        self.concurrency = concurrency or os.cpu_count()
+        self.openings = openings or [FenUtility.StartPositionFEN]
+        self.rng = random.Random(seed)
+        self.pools = {spec.name: UCIEnginePool(spec) for spec in specs}
+
+        # (wins, draws, losses) of the first engine against each opponent
+        self.scores = {spec.name: [0, 0, 0] for spec in specs[1:]}
+
+    def game_specs(self, games_per_opponent):
+        """
+        (round, start fen, white spec, black spec) for each game
+        """
+        tested, opponents = self.specs[0], self.specs[1:]
+        round_number = 0
+        for opponent in opponents:
+            for pair_index in range((games_per_opponent + 1) // 2):
+                start_fen = self.rng.choice(self.openings)
+                for swap in (False, True):
+                    if pair_index * 2 + swap >= games_per_opponent:
+                        break
+                    round_number += 1
+                    yield (round_number, start_fen, opponent, tested) if swap else (round_number, start_fen, tested, opponent)
+
+    async def play_game(self, start_fen, white_spec, black_spec):
+        """
+        Play one game. Returns (board, GameResult), with the game's moves in board.all_game_moves
+        """
+        board = Board()
+        board.load_fen_fast(start_fen)
+        arbiter = GameArbiter(board)
+        move_generator = MoveGenerator()
+        move_names = []
+        time_remaining_ms = [self.base_time_ms, self.base_time_ms]
+
+        engines = [None, None]
+        try:
+            for color_index, spec in enumerate((white_spec, black_spec)):
+                try:
+                    engines[color_index] = await self.pools[spec.name].acquire()
+                    await engines[color_index].new_game()
+                except (asyncio.TimeoutError, EOFError, ConnectionError) as error:
+                    # An engine which doesn't start (or doesn't get ready for the game) loses it
+                    print(f"{spec.name} failed to start a game: {error!r}", file=sys.stderr, flush=True)
+                    if engines[color_index] is not None:
+                        engines[color_index].kill()
+                    if isinstance(error, asyncio.TimeoutError):
+                        return board, GameResult.WhiteTimeout if color_index == Board.WhiteIndex else GameResult.BlackTimeout
+                    return board, GameResult.WhiteIllegalMove if color_index == Board.WhiteIndex else GameResult.BlackIllegalMove
+
+            result = arbiter.get_game_state()
+            while result == GameResult.InProgress:
+                color_index = board.move_color_index
+                engine = engines[color_index]
+                timeout_seconds = (max(0, time_remaining_ms[color_index]) + UCIMatchHarness.TimeoutGraceMs) / 1000
+
+                start_time = time.monotonic()
+                try:
+                    move_name = await engine.go(start_fen, move_names, time_remaining_ms, self.increment_ms, timeout_seconds)
+                except asyncio.TimeoutError:
+                    # The engine may still reply, but it can't be trusted with another game
+                    engine.kill()
+                    result = GameResult.WhiteTimeout if board.is_white_to_move else GameResult.BlackTimeout
+                    break
+                except (EOFError, ConnectionError):
+                    result = GameResult.WhiteIllegalMove if board.is_white_to_move else GameResult.BlackIllegalMove
+                    break
+
+                time_remaining_ms[color_index] -= (time.monotonic() - start_time) * 1000
+                if time_remaining_ms[color_index] < 0:
+                    result = GameResult.WhiteTimeout if board.is_white_to_move else GameResult.BlackTimeout
+                    break
+                time_remaining_ms[color_index] += self.increment_ms
+
+                try:
+                    move = MoveUtility.get_move_from_uci_name(move_name, board)
+                except (ValueError, IndexError):
+                    move = None
+                if move is None or not move_generator.is_legal(board, move):
+                    result = GameResult.WhiteIllegalMove if board.is_white_to_move else GameResult.BlackIllegalMove
+                    break
+
+                arbiter.make_move(move)
+                move_names.append(move_name)
+                result = arbiter.get_game_state()
+                if result == GameResult.InProgress and len(move_names) >= UCIMatchHarness.MaxGamePly:
+                    result = GameResult.DrawByArbiter
+        finally:
+            for engine, spec in zip(engines, (white_spec, black_spec)):
+                if engine is not None:
+                    self.pools[spec.name].release(engine)
+
+        return board, result
+
+    def record_result(self, result, opponent_name, tested_is_white):
+        score = self.scores[opponent_name]
+        if Arbiter.is_draw_result(result):
+            score[1] += 1
+        elif Arbiter.is_white_wins_result(result) == tested_is_white:
+            score[0] += 1
+        else:
+            score[2] += 1
+
+    async def run(self, games_per_opponent, pgn_path=None):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        writer = PGNWriter(pgn_path) if pgn_path else None
+        tested = self.specs[0]
+
+        async def play(round_number, start_fen, white_spec, black_spec):
+            async with semaphore:
+                board, result = await self.play_game(start_fen, white_spec, black_spec)
+                return round_number, start_fen, white_spec, black_spec, board.all_game_moves, result
+
+        tasks = [asyncio.ensure_future(play(*spec)) for spec in self.game_specs(games_per_opponent)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                round_number, start_fen, white_spec, black_spec, moves, result = await task
+                tested_is_white = white_spec is tested
+                self.record_result(result, (black_spec if tested_is_white else white_spec).name, tested_is_white)
+
+                if writer is not None:
+                    writer.write_game(moves, result, start_fen, white_spec.name, black_spec.name,
+                                      headers={"Event": "Gauntlet", "Round": str(round_number), "Termination": result.name})
+                print(self.get_summary(), flush=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*(pool.close() for pool in self.pools.values()))
+            if writer is not None:
+                writer.close()
+
+    def get_summary(self):
+        lines = []
+        for opponent_name, (wins, draws, losses) in self.scores.items():
+            elo, error = MatchRunner.elo_difference(wins, draws, losses)
+            lines.append(f"{self.specs[0].name} vs {opponent_name}: +{wins} ={draws} -{losses}  Elo: {elo:+.1f} +/- {error:.1f}")
+        return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a gauntlet between UCI engines (the first engine plays all the others)")
+    parser.add_argument("engines", nargs='+', help='engines as "name:command[;Option=Value...]"; command "self" runs engineUCI.py')
+    parser.add_argument("--games", type=int, default=100, help="games against each opponent")
+    parser.add_argument("--time", type=float, default=10.0, help="base time per game in seconds")
+    parser.add_argument("--inc", type=float, default=0.1, help="increment per move in seconds")
+    parser.add_argument("--concurrency", type=int, default=None, help="games played at once (default: number of cores)")
+    parser.add_argument("--openings", default=None, help="EPD/FEN file of start positions (default: the standard start position)")
+    parser.add_argument("--pgn", default=None, help="write games to this PGN file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    specs = [UCIEngineSpec.from_string(text) for text in args.engines]
+    if len(specs) < 2:
+        parser.error("at least two engines are needed")
+    openings = [fen for fen, _ in EpdReader.read(args.openings)] if args.openings else None
+
+    harness = UCIMatchHarness(specs, int(args.time * 1000), int(args.inc * 1000), args.concurrency, openings, args.seed)
+    asyncio.run(harness.run(args.games, args.pgn))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Same import roots as the entry points in src (which add src/Core to sys.path)
+SrcDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SrcDir)
+sys.path.insert(0, os.path.join(SrcDir, "Core"))
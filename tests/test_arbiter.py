@@ -0,0 +1,93 @@
+from Board.board import Board
+from Game_Result.arbiter import Arbiter, GameArbiter
+from Game_Result.gameResult import GameResult
+from Helpers.moveUtility import MoveUtility
+
+
+def play(arbiter, move_names):
+    """
+    Make the moves (UCI names) through the arbiter, returning them
+    """
+    moves = []
+    for move_name in move_names.split():
+        move = MoveUtility.get_move_from_uci_name(move_name, arbiter.board)
+        arbiter.make_move(move)
+        moves.append(move)
+    return moves
+
+
+def assert_matches_fresh_arbiter(arbiter):
+    fresh = GameArbiter(arbiter.board)
+    assert (arbiter.num_pawns_rooks_queens, arbiter.num_minors) == (fresh.num_pawns_rooks_queens, fresh.num_minors)
+    assert arbiter.get_game_state() == Arbiter.get_game_state(arbiter.board)
+
+
+def test_threefold_repetition_by_knight_shuffles():
+    arbiter = GameArbiter(Board.create_board())
+    play(arbiter, "g1f3 g8f6 f3g1 f6g8")
+    play(arbiter, "g1f3 g8f6 f3g1")
+    assert arbiter.get_game_state() == GameResult.InProgress
+
+    play(arbiter, "f6g8")
+    assert arbiter.repetition_counts[arbiter.board.zobrist_key] == 3
+    assert arbiter.get_game_state() == GameResult.Repetition
+    assert_matches_fresh_arbiter(arbiter)
+
+
+def test_irreversible_moves_reset_the_repetition_history():
+    arbiter = GameArbiter(Board.create_board())
+    play(arbiter, "g1f3 g8f6 f3g1 f6g8 g1f3 g8f6 f3g1")
+    counts = dict(arbiter.repetition_counts)
+
+    # A pawn move starts a new history, so shuffling back and forth after it starts the count again
+    pawn_move, = play(arbiter, "e7e5")
+    assert arbiter.repetition_counts == {arbiter.board.zobrist_key: 1}
+    shuffle = play(arbiter, "g1f3 b8c6 f3g1 c6b8 g1f3 b8c6 f3g1")
+    assert arbiter.get_game_state() == GameResult.InProgress
+
+    # Unmaking back across the pawn move restores the earlier history, where one more move repeats three times
+    for move in reversed(shuffle + [pawn_move]):
+        arbiter.unmake_move(move)
+    assert arbiter.repetition_counts == counts
+    play(arbiter, "f6g8")
+    assert arbiter.get_game_state() == GameResult.Repetition
+
+    # Captures reset it too
+    arbiter = GameArbiter(Board.create_board("4k3/8/8/8/8/2n5/8/3RK2B b - - 0 1"))
+    play(arbiter, "c3d1")
+    assert arbiter.repetition_counts == {arbiter.board.zobrist_key: 1}
+    assert not arbiter.saved_repetition_counts[-1].get(arbiter.board.zobrist_key)
+
+
+def test_insufficient_material_after_captures():
+    # Rook taken by the knight (bishop against knight can still mate), then the knight by the king
+    arbiter = GameArbiter(Board.create_board("4k3/8/8/8/8/2n5/8/3RK2B b - - 0 1"))
+    states = [arbiter.get_game_state()]
+    moves = []
+    for move_name in ("c3d1", "e1d1"):
+        moves += play(arbiter, move_name)
+        states.append(arbiter.get_game_state())
+        assert_matches_fresh_arbiter(arbiter)
+    assert states == [GameResult.InProgress, GameResult.InProgress, GameResult.InsufficientMaterial]
+
+    for move, state in zip(reversed(moves), reversed(states[:-1])):
+        arbiter.unmake_move(move)
+        assert arbiter.get_game_state() == state
+        assert_matches_fresh_arbiter(arbiter)
+
+    # The last pawn captures and underpromotes: bishop against lone king
+    arbiter = GameArbiter(Board.create_board("4k3/8/8/8/8/8/1p6/2N1K3 b - - 0 1"))
+    move, = play(arbiter, "b2c1b")
+    assert arbiter.get_game_state() == GameResult.InsufficientMaterial
+    assert_matches_fresh_arbiter(arbiter)
+    arbiter.unmake_move(move)
+    assert arbiter.get_game_state() == GameResult.InProgress
+    assert_matches_fresh_arbiter(arbiter)
+
+    # Bishops on the same colour squares can't mate; on opposite colours they can
+    for fen, state in (("4k3/8/8/8/8/1b6/8/3RK2B w - - 0 1", GameResult.InsufficientMaterial),
+                       ("4k3/8/8/8/8/2b5/8/3RK2B w - - 0 1", GameResult.InProgress)):
+        arbiter = GameArbiter(Board.create_board(fen))
+        play(arbiter, "d1d8 e8d8")
+        assert arbiter.get_game_state() == state
+        assert_matches_fresh_arbiter(arbiter)
@@ -0,0 +1,181 @@
+import random
+import numpy as np
+import pytest
+from Board.board import Board
+from Board.piece import Piece
+from Endgames.bitbase import Bitbase, BitbaseGenerator, BitbaseProber
+from Evaluation.evaluation import Evaluation
+from Move_Generation.moveGenerator import MoveGenerator
+from Search.searcher import Searcher
+
+# (fen, result for the side to move)
+KnownPositions = [
+    # King on the sixth rank in front of its pawn wins with either side to move
+    ("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1", Bitbase.Win),
+    ("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1", Bitbase.Loss),
+    # Rook pawn with the defending king in the corner
+    ("k7/8/8/8/8/8/P7/7K w - - 0 1", Bitbase.Draw),
+    # The black king takes the undefended pawn
+    ("8/8/8/8/8/8/kP6/7K b - - 0 1", Bitbase.Draw),
+    # Outside the square of the pawn
+    ("8/8/8/8/8/k7/7P/7K w - - 0 1", Bitbase.Win),
+    # King in front of its pawn: wins with the opposition, draws without it
+    ("8/8/8/4k3/8/4K3/4P3/8 b - - 0 1", Bitbase.Loss),
+    ("8/8/8/4k3/8/4K3/4P3/8 w - - 0 1", Bitbase.Draw),
+    # The same positions with colours swapped
+    ("8/4p3/4k3/8/4K3/8/8/8 w - - 0 1", Bitbase.Loss),
+    ("8/4p3/4k3/8/4K3/8/8/8 b - - 0 1", Bitbase.Draw),
+    # Checkmate and stalemate
+    ("7k/5K2/8/8/8/8/8/7R b - - 0 1", Bitbase.Loss),
+    ("7k/5KR1/8/8/8/8/8/8 b - - 0 1", Bitbase.Draw),
+    ("k7/8/1Q6/8/8/8/8/7K b - - 0 1", Bitbase.Draw),
+    # The king takes the undefended rook
+    ("8/8/8/8/8/8/8/Kr5k w - - 0 1", Bitbase.Draw),
+    ("7k/8/8/8/8/8/8/R6K w - - 0 1", Bitbase.Win),
+    ("7k/8/8/8/8/8/8/R6K b - - 0 1", Bitbase.Loss),
+]
+
+
+@pytest.fixture(scope="module")
+def prober(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("bitbases")
+    BitbaseGenerator(str(directory)).generate(["KPK", "KRK"])
+    return BitbaseProber(str(directory))
+
+
+def successor_result(board, prober, move_generator):
+    """
+    Result for the side to move worked out from the results of its successors
+    """
+    moves = move_generator.generate_moves(board)
+    if not moves:
+        return Bitbase.Loss if move_generator.is_in_check() else Bitbase.Draw
+
+    results = []
+    for move in moves:
+        board.make_move(move, in_search=True)
+        result = prober.probe(board)
+        # Positions with an en passant square aren't in the tables
+        if result == Bitbase.Unknown:
+            result = successor_result(board, prober, MoveGenerator())
+        board.unmake_move(move, in_search=True)
+        results.append(result)
+
+    if Bitbase.Loss in results:
+        return Bitbase.Win
+    return Bitbase.Loss if all(result == Bitbase.Win for result in results) else Bitbase.Draw
+
+
+def random_positions(signature, num_positions, seed=0):
+    """
+    Random legal positions (as FEN strings) of the ending
+    """
+    rng = random.Random(seed)
+    pieces = Bitbase.signature_pieces(signature)
+    positions = []
+    while len(positions) < num_positions:
+        squares = rng.sample(range(64), len(pieces))
+        white_king, black_king = squares[0], squares[1]
+        if max(abs(white_king % 8 - black_king % 8), abs(white_king // 8 - black_king // 8)) <= 1:
+            continue
+        if any(Piece.piece_type(piece) == Piece.Pawn and square // 8 in (0, 7) for piece, square in zip(pieces, squares)):
+            continue
+        ranks = [['1'] * 8 for _ in range(8)]
+        for piece, square in zip(pieces, squares):
+            ranks[7 - square // 8][square % 8] = Piece.get_symbol(piece)
+        placement = '/'.join(''.join(rank) for rank in ranks)
+
+        # Skip positions where the side which just moved is in check
+        side = rng.choice("wb")
+        other_side = Board.create_board(f"{placement} {'b' if side == 'w' else 'w'} - - 0 1")
+        move_generator = MoveGenerator()
+        move_generator.generate_moves(other_side)
+        if not move_generator.is_in_check():
+            positions.append(f"{placement} {side} - - 0 1")
+    return positions
+
+
+@pytest.mark.parametrize("fen, expected", KnownPositions)
+def test_known_positions(prober, fen, expected):
+    assert prober.probe(Board.create_board(fen)) == expected
+
+
+@pytest.mark.parametrize("signature", ["KPK", "KRK", "KQK"])
+def test_results_agree_with_successors(prober, signature):
+    move_generator = MoveGenerator()
+    for fen in random_positions(signature, 200):
+        board = Board.create_board(fen)
+        assert prober.probe(board) == successor_result(board, prober, move_generator), fen
+
+
+def test_en_passant_successor_state():
+    # Table results after a double push, with one en passant capture available in every position but the last
+    successor_state = np.array([Bitbase.Draw, Bitbase.Draw, Bitbase.Loss, Bitbase.Draw, Bitbase.Unknown, Bitbase.Draw], dtype=np.uint8)
+    successor_move_count = np.array([3, 3, 3, 0, 3, 3])
+    counts = np.array([1, 1, 1, 1, 1, 0])
+    wins = np.array([1, 0, 0, 0, 0, 0])
+    losses = np.array([0, 0, 1, 1, 1, 0])
+
+    state = BitbaseGenerator.en_passant_successor_state(successor_state, successor_move_count, (counts, wins, losses))
+    # Winning capture; drawing capture; every move loses; stalemate lifted by a losing capture; still unresolved; no capture
+    assert state.tolist() == [Bitbase.Win, Bitbase.Draw, Bitbase.Loss, Bitbase.Loss, Bitbase.Unknown, Bitbase.Draw]
+
+
+def test_pawn_captures_with_two_capturable_pieces(prober):
+    # With both an enemy king and pawn, the capture grids broadcast along different axes
+    pieces = Bitbase.signature_pieces("KPKP")
+    squares = BitbaseGenerator.square_grids(len(pieces))
+    pawn = pieces.index(Piece.WhitePawn)
+    black_pawn = pieces.index(Piece.BlackPawn)
+    start, target = 28, 35
+    # White to move, so the black king isn't in check
+    legal = BitbaseGenerator.valid_placements(pieces, squares) & ~BitbaseGenerator.is_attacked(pieces, squares, squares[1], True)
+    legal_from = legal[BitbaseGenerator.square_slice(pawn, start)]
+
+    num_moves, wins, losses, quiet, en_passant = BitbaseGenerator.generate_moves(prober, pieces, squares, legal_from, pawn, start, target,
+                                                                                BitbaseGenerator.PawnCapture)
+    assert num_moves.shape == legal_from.shape
+    captures_pawn = np.broadcast_to(squares[black_pawn] == target, num_moves.shape)
+    assert num_moves.any() and not num_moves[~captures_pawn].any()
+    assert not quiet.any() and en_passant is None
+
+    # Each capture leaves a KPK position, scored from the table
+    rng = random.Random(1)
+    placements = np.argwhere(num_moves > 0)
+    for placement in placements[rng.sample(range(len(placements)), 50)]:
+        board_squares = [start if k == pawn else int(square) for k, square in enumerate(placement)]
+        ranks = [['1'] * 8 for _ in range(8)]
+        for piece, square in zip(pieces, board_squares):
+            ranks[7 - square // 8][square % 8] = Piece.get_symbol(piece)
+        board = Board.create_board('/'.join(''.join(rank) for rank in ranks) + " w - - 0 1")
+        move = next(move for move in MoveGenerator().generate_moves(board) if move.start_square == start and move.target_square == target)
+        board.make_move(move, in_search=True)
+        result = prober.probe(board)
+        assert wins[tuple(placement)] == (result == Bitbase.Loss)
+        assert losses[tuple(placement)] == (result == Bitbase.Win)
+
+
+@pytest.mark.parametrize("fen", ["8/8/8/4k3/8/8/8/R3K3 w - - 0 1", "4k3/8/4K3/4P3/8/8/8/8 b - - 0 1"])
+def test_search_converts_won_endings(prober, fen):
+    # Bitbase wins are scored with progress terms and searched on, so the search mates rather than shuffling
+    board = Board.create_board(fen)
+    searcher = Searcher(board, tt_size_mb=8, bitbase_prober=prober)
+    move_generator = MoveGenerator()
+    for _ in range(60):
+        if not move_generator.generate_moves(board):
+            break
+        board.make_move(searcher.start_search(max_depth=4))
+    assert not move_generator.generate_moves(board) and move_generator.is_in_check()
+
+
+def test_position_is_probed_once(prober, monkeypatch):
+    probes = []
+    monkeypatch.setattr(prober, "probe", lambda board: probes.append(board.zobrist_key) or BitbaseProber.probe(prober, board))
+    board = Board.create_board("8/8/8/4k3/8/8/8/R3K3 w - - 0 1")
+    evaluation = Evaluation(prober)
+    assert evaluation.probe_bitbase(board) == Bitbase.Win
+    assert evaluation.evaluate(board) > Evaluation.KnownWinScore
+    assert len(probes) == 1
+
+    # Closer to mate scores higher
+    assert evaluation.evaluate(Board.create_board("4k3/8/4K3/8/8/8/8/R7 w - - 0 1")) > evaluation.evaluate(board)
@@ -0,0 +1,33 @@
+import random
+import pytest
+from Move_Generation.Bitboards.bitBoardUtility import BitBoardUtility
+
+FullBoard = (1 << 64) - 1
+
+
+@pytest.mark.parametrize("bitboard, squares", [
+    (0, []),
+    (1, [0]),
+    (1 << 63, [63]),
+    (1 | 1 << 63, [0, 63]),
+    # Set bits either side of the 16 bit chunk boundaries
+    (1 << 15 | 1 << 16 | 1 << 47 | 1 << 48, [15, 16, 47, 48]),
+    (FullBoard, list(range(64))),
+])
+def test_squares_of_edge_values(bitboard, squares):
+    assert list(BitBoardUtility.iter_squares(bitboard)) == squares
+    assert BitBoardUtility.get_squares(bitboard) == squares
+    assert BitBoardUtility.popcount(bitboard) == len(squares)
+    assert BitBoardUtility.lsb(bitboard) == BitBoardUtility.pop_lsb(bitboard) == (squares[0] if squares else -1)
+    assert BitBoardUtility.msb(bitboard) == (squares[-1] if squares else -1)
+
+
+def test_squares_of_random_bitboards():
+    rng = random.Random(1)
+    for _ in range(200):
+        bitboard = rng.getrandbits(64) & rng.getrandbits(64)
+        squares = [square for square in range(64) if bitboard >> square & 1]
+        assert list(BitBoardUtility.iter_squares(bitboard)) == BitBoardUtility.get_squares(bitboard) == squares
+        assert BitBoardUtility.popcount(bitboard) == len(squares)
+        if squares:
+            assert (BitBoardUtility.lsb(bitboard), BitBoardUtility.msb(bitboard)) == (squares[0], squares[-1])
@@ -0,0 +1,68 @@
+import pytest
+from Board.board import Board
+from Board.piece import Piece
+from Helpers.fenUtility import FenUtility
+
+Fens = [
+    FenUtility.StartPositionFEN,
+    # Castling rights for both sides
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    # Partial castling rights, black to move
+    "r3k2r/8/8/8/8/8/8/R3K2R b Kq - 3 20",
+    # En passant square
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "rnbqkbnr/pppp1ppp/8/8/3Pp3/8/PPP1PPPP/RNBQKBNR b KQkq d3 0 2",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+]
+
+
+def get_piece_lists(board):
+    return {piece: sorted(board.all_piece_lists[piece][i] for i in range(board.all_piece_lists[piece].count))
+            for piece in Piece.PieceIndices}
+
+
+def get_state(board):
+    game_state = board.current_game_state
+    return {
+        "square": list(board.square),
+        "piece_bitboards": list(board.piece_bitboards),
+        "color_bitboards": list(board.color_bitboards),
+        "all_pieces_bitboard": board.all_pieces_bitboard,
+        "king_square": list(board.king_square),
+        "piece_lists": get_piece_lists(board),
+        "piece_count": board.total_piece_count_without_pawns_and_kings,
+        "white_to_move": board.is_white_to_move,
+        "ply_count": board.ply_count,
+        "game_state": (game_state.captured_piece_type, game_state.en_passant_file, game_state.castling_rights,
+                       game_state.fifty_move_counter, game_state.zobrist_key),
+        "repetition_history": list(board.repetition_position_history),
+    }
+
+
+def test_new_board_is_empty():
+    board = Board()
+    assert board.all_pieces_bitboard == 0
+    assert board.zobrist_key == 0
+
+
+@pytest.mark.parametrize("fen", Fens)
+def test_load_fen_fast_matches_load_position(fen):
+    expected = Board()
+    expected.load_position(fen)
+    board = Board()
+    board.load_fen_fast(fen)
+    assert get_state(board) == get_state(expected)
+
+
+def test_load_fen_fast_reuses_board():
+    board = Board()
+    for fen in Fens:
+        board.load_fen_fast(fen)
+    expected = Board()
+    expected.load_position(Fens[-1])
+    assert get_state(board) == get_state(expected)
+
+
+@pytest.mark.parametrize("fen", Fens)
+def test_current_fen_round_trip(fen):
+    assert Board.create_board(fen).current_fen == fen
@@ -0,0 +1,63 @@
+import os
+import pytest
+from Book.bookBuilder import BookBuilder
+
+Games = """[Event "a"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 1-0
+
+[Event "b"]
+[Result "0-1"]
+
+1. e4 c5 2. Nf3 d6 0-1
+
+[Event "c"]
+[Result "1/2-1/2"]
+
+1. d4 d5 1/2-1/2
+"""
+
+
+@pytest.fixture
+def pgn_path(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(Games)
+    return str(path)
+
+
+def read_text_book(path):
+    book = {}
+    with open(path, 'r') as file:
+        for line in file:
+            if line.startswith("pos "):
+                moves = book.setdefault(line[4:].strip(), {})
+            else:
+                move_name, count = line.split()
+                moves[move_name] = int(count)
+    return book
+
+
+def test_build_text_book(tmp_path, pgn_path):
+    output_path = str(tmp_path / "book.txt")
+    assert BookBuilder(max_ply=3, num_workers=2).build([pgn_path], output_path) == 5
+
+    book = read_text_book(output_path)
+    assert book["rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -"] == {"e2e4": 2, "d2d4": 1}
+    assert book["rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3"] == {"e7e5": 1, "c7c5": 1}
+
+
+def test_worker_error_is_raised(tmp_path, pgn_path, monkeypatch):
+    def fail(*args):
+        raise ValueError("bad game")
+
+    # Workers are forked, so they run the patched method
+    monkeypatch.setattr(BookBuilder, "count_games", staticmethod(fail))
+    with pytest.raises(RuntimeError, match="bad game"):
+        BookBuilder(num_workers=2).build([pgn_path], str(tmp_path / "book.txt"))
+
+
+def test_worker_exit_is_raised(tmp_path, pgn_path, monkeypatch):
+    monkeypatch.setattr(BookBuilder, "count_games", staticmethod(lambda *args: os._exit(3)))
+    with pytest.raises(RuntimeError, match="without a result"):
+        BookBuilder(num_workers=2).build([pgn_path], str(tmp_path / "book.txt"))
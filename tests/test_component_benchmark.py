@@ -0,0 +1,30 @@
+import pytest
+from Benchmarks.componentBenchmark import ComponentBenchmark
+
+
+def make_results(ns_per_op):
+    return {"python": "3.11", "benchmarks": {name: {"ns_per_op": ns, "median_ns_per_op": ns * 1.1} for name, ns in ns_per_op.items()}}
+
+
+def test_compare(tmp_path):
+    baseline = make_results({"slower": 100.0, "slightly slower": 200.0, "faster": 100.0, "removed": 50.0, "untimed": 0.0})
+    results = make_results({"slower": 125.0, "slightly slower": 210.0, "faster": 80.0, "added": 10.0, "untimed": 5.0})
+
+    # Results read back from JSON compare the same way
+    path = str(tmp_path / "baseline.json")
+    ComponentBenchmark.write_json(baseline, path)
+    comparisons, regressions = ComponentBenchmark.compare(results, ComponentBenchmark.read_json(path))
+
+    # Benchmarks missing from either side are left out
+    changes = {name: change for name, _, _, change in comparisons}
+    assert changes == pytest.approx({"slower": 0.25, "slightly slower": 0.05, "faster": -0.2, "untimed": 0.0})
+    assert regressions == ["slower"]
+    assert ("slower", 100.0, 125.0) in [comparison[:3] for comparison in comparisons]
+
+
+def test_compare_threshold():
+    baseline = make_results({"a": 100.0, "b": 100.0})
+    results = make_results({"a": 104.0, "b": 130.0})
+    assert ComponentBenchmark.compare(results, baseline, threshold=0.5)[1] == []
+    assert ComponentBenchmark.compare(results, baseline, threshold=0.2)[1] == ["b"]
+    assert ComponentBenchmark.compare(results, baseline, threshold=0.03)[1] == ["a", "b"]
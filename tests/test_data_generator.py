@@ -0,0 +1,80 @@
+from Board.board import Board
+from Board.piece import Piece
+from Book.bookCompiler import BookCompiler
+from Game_Result.arbiter import Arbiter
+from Game_Result.gameResult import GameResult
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from Move_Generation.moveGenerator import MoveGenerator
+from Search.searcher import Searcher
+from Tuning.dataGenerator import DataGenerator
+
+
+def game_outcome(generator):
+    """
+    Result of the game just played, from white's perspective: from the arbiter, the ply limit or the adjudication score
+    """
+    state = generator.arbiter.get_game_state()
+    if state != GameResult.InProgress:
+        return 0 if Arbiter.is_draw_result(state) else (1 if Arbiter.is_white_wins_result(state) else -1)
+    if generator.board.ply_count >= DataGenerator.MaxGamePly:
+        return 0
+    score = generator.searcher.best_eval
+    assert abs(score) >= DataGenerator.WinAdjudicationScore
+    return 1 if (score if generator.board.is_white_to_move else -score) > 0 else -1
+
+
+def record_fen(record):
+    ranks = [['1'] * 8 for _ in range(8)]
+    for piece, bitboard in zip(Piece.PieceIndices, record['pieces'].tolist()):
+        for square in range(64):
+            if bitboard >> square & 1:
+                assert ranks[7 - square // 8][square % 8] == '1'
+                ranks[7 - square // 8][square % 8] = Piece.get_symbol(piece)
+    return '/'.join(''.join(rank) for rank in ranks) + (" w" if record['side_to_move'] == 0 else " b") + " - - 0 1"
+
+
+def test_generated_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataGenerator, "MaxGamePly", 60)
+    generator = DataGenerator(str(tmp_path), max_nodes=150, random_ply=2, min_sample_ply=0, sample_rate=1.0, chunk_size=16)
+    generator.start_worker(0)
+
+    expected_results = []
+    for _ in range(2):
+        num_samples = generator.play_game()
+        expected_results += [game_outcome(generator)] * num_samples
+    generator.flush()
+
+    records = DataGenerator.load(str(tmp_path))
+    # Chunks of chunk_size records, the last one flushed partly full
+    assert len(list(tmp_path.glob("*.bin"))) == (len(records) + 15) // 16
+    assert records['result'].tolist() == expected_results
+    assert len(set(expected_results)) > 1
+
+    move_generator = MoveGenerator()
+    for record in records:
+        board = Board.create_board(record_fen(record))
+        assert bin(board.piece_bitboards[Piece.WhiteKing]).count('1') == bin(board.piece_bitboards[Piece.BlackKing]).count('1') == 1
+        move_generator.generate_moves(board)
+        assert not move_generator.is_in_check()
+        assert record['castling_rights'] <= 15 and record['en_passant_file'] <= 8
+        assert abs(int(record['score'])) < Searcher.ImmediateMateScore - Searcher.MaxPly
+
+    # A second generator in the same directory continues after the existing chunks
+    generator = DataGenerator(str(tmp_path))
+    generator.start_worker(0)
+    assert generator.chunk_index == len(list(tmp_path.glob("*.bin")))
+
+
+def test_openings_follow_the_book_through_double_pushes(tmp_path):
+    line = ["e2e4", "e7e5", "d2d4", "e5d4", "d1d4", "b8c6"]
+    board = Board.create_board()
+    positions = []
+    for move_name in line:
+        positions.append((FenUtility.current_fen(board, always_include_ep_square=False), [(move_name, 1)]))
+        board.make_move(MoveUtility.get_move_from_uci_name(move_name, board))
+
+    generator = DataGenerator(str(tmp_path), book=BookCompiler.compile_positions(positions), opening_ply=6, random_ply=0)
+    generator.start_worker(0)
+    assert generator.play_opening()
+    assert [MoveUtility.get_move_name_uci(move) for move in generator.board.all_game_moves] == line
@@ -0,0 +1,64 @@
+import io
+import os
+import subprocess
+import sys
+from Board.board import Board
+from Endgames.bitbase import BitbaseGenerator
+from Helpers.moveUtility import MoveUtility
+from Move_Generation.moveGenerator import MoveGenerator
+from conftest import SrcDir
+from engineUCI import EngineUCI
+
+
+def test_uci_session():
+    commands = "uci\nisready\nposition startpos moves e2e4\ngo depth 2\nquit\n"
+    process = subprocess.run([sys.executable, os.path.join(SrcDir, "engineUCI.py")], input=commands,
+                             capture_output=True, text=True, timeout=120)
+    assert process.returncode == 0, process.stderr
+    lines = process.stdout.splitlines()
+    assert "uciok" in lines
+    assert "readyok" in lines
+
+    best_move_lines = [line for line in lines if line.startswith("bestmove")]
+    assert len(best_move_lines) == 1
+    best_move_name = best_move_lines[0].split()[1]
+
+    board = Board.create_board()
+    board.make_move(MoveUtility.get_move_from_uci_name("e2e4", board))
+    legal_move_names = [MoveUtility.get_move_name_uci(move) for move in MoveGenerator().generate_moves(board)]
+    assert best_move_name in legal_move_names
+
+
+def test_bitbase_path_option(tmp_path):
+    BitbaseGenerator(str(tmp_path)).generate(["KRK"])
+    engine = EngineUCI(output=io.StringIO())
+    engine.receive_command("uci")
+    assert "option name BitbasePath type string" in engine.output.getvalue()
+
+    engine.receive_command(f"setoption name BitbasePath value {tmp_path}")
+    searcher = engine.bot.searcher
+    assert list(searcher.bitbase_prober.tables) == ["KRK"]
+    assert searcher.evaluation.bitbase_prober is searcher.bitbase_prober
+
+    # A directory without tables (or no path) turns probing off
+    engine.receive_command(f"setoption name BitbasePath value {tmp_path / 'missing'}")
+    assert searcher.bitbase_prober is None and searcher.evaluation.bitbase_prober is None
+
+
+def test_illegal_position_moves():
+    engine = EngineUCI(output=io.StringIO())
+    engine.receive_command("position startpos moves e2e4 e2e4 e7e5")
+    assert "info string illegal move e2e4" in engine.output.getvalue()
+
+    # The moves before the illegal one are kept, and the engine can still search and extend the position
+    board = engine.bot.board
+    assert engine.bot.position_moves == ["e2e4"]
+    assert board.all_game_moves[-1].value == MoveUtility.get_move_from_uci_name("e2e4", Board.create_board()).value
+    for move_names in ("e2e4 e7e5", "e2e4 zz99", "e2e4 e7e8q"):
+        engine.receive_command(f"position startpos moves {move_names}")
+    assert engine.bot.position_moves == ["e2e4"]
+    assert engine.output.getvalue().count("info string illegal move") == 3
+
+    engine.receive_command("go depth 1")
+    engine.bot.stop_thinking()
+    assert "bestmove" in engine.output.getvalue()
@@ -0,0 +1,50 @@
+import bz2
+import gzip
+import pytest
+from Board.board import Board
+from Helpers.epdReader import EpdReader
+
+RuyLopez = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq -"
+
+
+@pytest.mark.parametrize("text, opcodes", [
+    ('bm Bb5; id "Ruy Lopez";', {"bm": "Bb5", "id": "Ruy Lopez"}),
+    # Several operands, and an opcode without any
+    ("bm Bb5 Bc4; noop; am d3;", {"bm": "Bb5 Bc4", "noop": "", "am": "d3"}),
+    # Quoted operands keep their spaces and semicolons
+    ('c0 "first; second";  c1 "a  b"; id x;', {"c0": "first; second", "c1": "a  b", "id": "x"}),
+    # Missing final semicolon, and an unterminated quote running to the end of the line
+    ('id "open; quote', {"id": "open; quote"}),
+    ("bm Bb5", {"bm": "Bb5"}),
+    ("", {}),
+])
+def test_parse_opcodes(text, opcodes):
+    assert EpdReader.parse_opcodes(text) == opcodes
+
+
+def test_parse_line_clocks():
+    # Without hmvc/fmvn the clocks default to the start of a game
+    fen, opcodes = EpdReader.parse_line(f'{RuyLopez} bm Bb5; id "Ruy Lopez";')
+    assert fen == f"{RuyLopez} 0 1"
+    assert opcodes == {"bm": "Bb5", "id": "Ruy Lopez"}
+
+    fen, opcodes = EpdReader.parse_line(f"{RuyLopez} hmvc 2; fmvn 3;")
+    assert fen == f"{RuyLopez} 2 3"
+    assert Board.create_board(fen).current_fen == fen
+
+    # A line with no opcodes at all
+    assert EpdReader.parse_line(RuyLopez) == (f"{RuyLopez} 0 1", {})
+
+
+def test_read_lines_skips_comments_and_blank_lines():
+    lines = ["# test suite", "", f"{RuyLopez} id \"a\";", "   ", f"{RuyLopez} id \"b\";\n"]
+    assert [opcodes["id"] for _, opcodes in EpdReader.read_lines(lines)] == ["a", "b"]
+
+
+@pytest.mark.parametrize("extension, open_file", [(".epd", open), (".epd.gz", gzip.open), (".epd.bz2", bz2.open)])
+def test_read_compressed_files(tmp_path, extension, open_file):
+    path = str(tmp_path / f"positions{extension}")
+    with open_file(path, 'wt') as file:
+        file.write(f"{RuyLopez} bm Bb5;\n8/8/8/8/8/8/8/K6k b - - hmvc 10;\n")
+    assert list(EpdReader.read(path)) == [(f"{RuyLopez} 0 1", {"bm": "Bb5"}),
+                                          ("8/8/8/8/8/8/8/K6k b - - 10 1", {"hmvc": "10"})]
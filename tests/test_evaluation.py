@@ -0,0 +1,65 @@
+import pytest
+from Board.board import Board
+from Endgames.bitbase import Bitbase
+from Endgames.endgames import Endgames
+from Evaluation.evaluation import Evaluation
+from Move_Generation.moveGenerator import MoveGenerator
+
+Fens = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    # Side to move in check from a rook and from a bishop: the slider's attacks continue past the king
+    # only when the king is removed from the blockers
+    "4r2k/8/8/8/4K3/8/8/R7 w - - 0 1",
+    "7k/8/8/8/4K3/8/2b5/7R w - - 0 1",
+    "r1b1k2r/ppppqppp/2n2n2/2b5/2B1P3/2N2N2/PPPP1PPP/R1BQK2R b KQkq - 0 1",
+]
+
+
+@pytest.mark.parametrize("fen", Fens)
+def test_evaluate_with_move_generator_matches(fen):
+    board = Board.create_board(fen)
+    move_generator = MoveGenerator()
+    move_generator.generate_moves(board, captures_only=True)
+
+    evaluation = Evaluation()
+    assert evaluation.evaluate(board, move_generator) == evaluation.evaluate(board)
+
+
+@pytest.mark.parametrize("fen", Fens)
+def test_features_match_weights(fen):
+    # The tuned linear terms: a side's evaluation is the dot product of its features with the weights
+    board = Board.create_board(fen)
+    weights = Evaluation.get_weights()
+    white_eval = sum(value * weights[index] for index, value in Evaluation.get_features(board))
+
+    evaluation = Evaluation()
+    side_to_move_eval = evaluation.evaluate(board)
+    assert side_to_move_eval == (white_eval if board.is_white_to_move else -white_eval)
+
+
+class FixedResultProber:
+    """
+    Stands in for a BitbaseProber with a table for the position, giving the same result for every probe
+    """
+    max_non_pawn_pieces = 2
+
+    def __init__(self, result):
+        self.result = result
+
+    def probe(self, board):
+        return self.result
+
+
+def test_kbnk_with_bitbases_prefers_the_bishops_corner():
+    # Dark squared bishop: the weak king belongs in a1 or h8, not h1
+    right_corner = Board.create_board("8/8/8/8/8/2K5/3B4/k2N4 w - - 0 1")
+    wrong_corner = Board.create_board("8/8/8/8/8/5K2/3B4/3N3k w - - 0 1")
+
+    evaluation = Evaluation(FixedResultProber(Bitbase.Win))
+    assert evaluation.evaluate(right_corner) > evaluation.evaluate(wrong_corner) > Evaluation.KnownWinScore
+    # The specialized evaluator scores the position, with or without the bitbases
+    assert evaluation.evaluate(right_corner) == Endgames.evaluate_kbnk(right_corner, Board.WhiteIndex) == Evaluation().evaluate(right_corner)
+
+    # A bitbase draw still overrides it
+    assert Evaluation(FixedResultProber(Bitbase.Draw)).evaluate(right_corner) == 0
@@ -0,0 +1,52 @@
+import io
+import random
+from Board.board import Board
+from Game_Result.gameResult import GameResult
+from Games.gameArchive import GameArchive, GameArchiveWriter
+from Helpers.pgnWriter import PGNWriter
+from test_pgn import StartFens, random_game
+
+
+def test_archive_round_trip(tmp_path):
+    rng = random.Random(3)
+    results = [GameResult.WhiteIsMated, GameResult.Stalemate, GameResult.DrawByArbiter, GameResult.InProgress]
+    games = [(fen, random_game(fen, rng.randrange(0, 80), rng), rng.choice(results), f"player {rng.randrange(3)}")
+             for fen in StartFens for _ in range(3)]
+
+    path = str(tmp_path / "games.bin")
+    with GameArchiveWriter(path) as writer:
+        for fen, moves, result, name in games:
+            writer.add_game(moves, result, fen, name, "opponent")
+
+    archive = GameArchive(path)
+    assert len(archive) == len(games)
+    for game_index, (fen, moves, result, name) in enumerate(games):
+        assert archive.get_game_info(game_index) == (fen, name, "opponent", result)
+        assert [move.value for move in archive.get_moves(game_index)] == [move.value for move in moves]
+
+        expected = Board.create_board(fen)
+        for move in moves:
+            expected.make_move(move)
+        assert archive.replay(game_index).zobrist_key == expected.zobrist_key
+
+
+def test_pgn_games_that_cannot_be_replayed_are_skipped(tmp_path):
+    rng = random.Random(5)
+    games = [random_game(StartFens[0], 20, rng) for _ in range(3)]
+    output = io.StringIO()
+    with PGNWriter(output) as pgn_writer:
+        for moves in games:
+            pgn_writer.write_game(moves, GameResult.DrawByArbiter)
+    # Make a move of the second game unresolvable
+    games_text = output.getvalue().split("[Event")
+    games_text[2] = games_text[2].replace(" 5. ", " 5. Qh9 ", 1)
+    pgn = io.StringIO("[Event".join(games_text))
+
+    path = str(tmp_path / "games.bin")
+    with GameArchiveWriter(path) as writer:
+        assert writer.add_pgn_games(pgn) == (2, 1)
+
+    archive = GameArchive(path)
+    for game_index, moves in enumerate([games[0], games[2]]):
+        assert [move.value for move in archive.get_moves(game_index)] == [move.value for move in moves]
+        assert archive.get_game_info(game_index)[3] == GameResult.DrawByArbiter
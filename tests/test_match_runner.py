@@ -0,0 +1,84 @@
+import math
+import pytest
+from Board.board import Board
+from Board.move import Move
+from Game_Result.gameResult import GameResult
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from program import EngineConfig, MatchRunner
+
+
+def test_elo_from_score():
+    assert MatchRunner.elo_from_score(0.5) == 0
+    assert MatchRunner.elo_from_score(0.75) == pytest.approx(400 * math.log10(3))
+    assert MatchRunner.elo_from_score(0.25) == pytest.approx(-MatchRunner.elo_from_score(0.75))
+    # Clamped rather than infinite for a perfect score
+    assert math.isfinite(MatchRunner.elo_from_score(1.0)) and MatchRunner.elo_from_score(1.0) > 2000
+
+
+def test_elo_difference():
+    assert MatchRunner.elo_difference(0, 0, 0) == (0.0, 0.0)
+    assert MatchRunner.elo_difference(30, 40, 30)[0] == pytest.approx(0.0)
+
+    # Score 0.7 with a per-game variance of 0.16, so the 95% interval of the score is 0.7 +/- 1.96 * 0.04
+    elo, error = MatchRunner.elo_difference(60, 20, 20)
+    assert elo == pytest.approx(147.19, abs=0.01)
+    assert error == pytest.approx((MatchRunner.elo_from_score(0.7784) - MatchRunner.elo_from_score(0.6216)) / 2)
+    assert error == pytest.approx(66.01, abs=0.01)
+
+    # More games of the same distribution narrow the interval
+    assert MatchRunner.elo_difference(600, 200, 200)[1] < error
+
+
+def test_sprt_llr():
+    # Score 0.55 with variance 0.1225 over 2000 games, against score0 = 0.5 and score1 = 1 / (1 + 10 ** (-10 / 400))
+    score1 = 1 / (1 + 10 ** (-10 / 400))
+    expected = 2000 * (score1 - 0.5) * (2 * 0.55 - 0.5 - score1) / (2 * 0.1225)
+    assert MatchRunner.sprt_llr(600, 1000, 400, 0, 10) == pytest.approx(expected)
+
+    # Swapping the engines mirrors the hypotheses
+    assert MatchRunner.sprt_llr(400, 1000, 600, -10, 0) == pytest.approx(-expected)
+    # A score halfway between the hypotheses favours neither
+    assert MatchRunner.sprt_llr(100, 0, 100, -10, 10) == pytest.approx(0.0)
+    # No games, or no variance
+    assert MatchRunner.sprt_llr(0, 0, 0, 0, 10) == 0.0
+    assert MatchRunner.sprt_llr(10, 0, 0, 0, 10) == 0.0
+    assert MatchRunner.sprt_llr(0, 10, 0, 0, 10) == 0.0
+
+
+def test_sprt_verdict():
+    # Bounds are log(19) = 2.94 and -log(19) for alpha = beta = 0.05
+    assert MatchRunner.sprt_verdict(600, 1000, 400, 0, 10) == "H1"
+    assert MatchRunner.sprt_verdict(400, 1000, 600, 0, 10) == "H0"
+    assert MatchRunner.sprt_verdict(12, 20, 10, 0, 10) is None
+    # A stricter alpha needs more evidence to accept H1
+    llr = MatchRunner.sprt_llr(600, 1000, 400, 0, 10)
+    alpha = (1 - 0.05) / math.exp(llr) / 2
+    assert MatchRunner.sprt_verdict(600, 1000, 400, 0, 10, alpha=alpha) is None
+
+
+def test_record_result():
+    runner = MatchRunner(EngineConfig("a"), EngineConfig("b"), num_workers=1)
+    runner.record_result(GameResult.BlackIsMated, a_is_white=True)
+    runner.record_result(GameResult.BlackIsMated, a_is_white=False)
+    runner.record_result(GameResult.WhiteTimeout, a_is_white=False)
+    runner.record_result(GameResult.Repetition, a_is_white=True)
+    assert (runner.wins, runner.draws, runner.losses) == (2, 1, 1)
+    assert runner.get_summary().startswith("Games: 4  a vs b: +2 =1 -1  Elo: +")
+
+
+def test_openings_follow_the_book_through_double_pushes(tmp_path):
+    # 1.d4 Nf6 2.c4 e6 3.Nc3 Bb4 4.e3 O-O 5.Bd3 d5, one book move per position
+    line = ["d2d4", "g8f6", "c2c4", "e7e6", "b1c3", "f8b4", "e2e3", "e8g8", "f1d3", "d7d5"]
+    board = Board.create_board()
+    text = ""
+    for move_name in line:
+        text += f"pos {FenUtility.current_fen(board, always_include_ep_square=False)}\n{move_name} 1\n"
+        board.make_move(MoveUtility.get_move_from_uci_name(move_name, board))
+    book_path = tmp_path / "book.txt"
+    book_path.write_text(text)
+
+    runner = MatchRunner(EngineConfig("a"), EngineConfig("b"), num_workers=1, book_path=str(book_path), opening_ply=8)
+    opening = runner.pick_opening()
+    assert len(opening) == 8
+    assert [MoveUtility.get_move_name_uci(Move(move_value=value)) for value in opening] == line[:8]
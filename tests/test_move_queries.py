@@ -0,0 +1,62 @@
+import pytest
+from Board.board import Board
+from Board.move import Move
+from Move_Generation.moveGenerator import MoveGenerator
+from test_perft import PerftPositions
+
+# Perft positions plus positions with en passant captures (including one that exposes the king), checks and pins
+QueryPositions = [fen for fen, _ in PerftPositions] + [
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "8/8/8/KPp4r/8/8/8/6k1 w - c6 0 1",
+    "4k3/8/8/8/1b6/8/3P4/4K2R w K - 0 1",
+    "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1",
+    "3k4/8/8/8/8/8/3P4/3K4 b - - 0 1",
+]
+
+
+def move_variants(move_values):
+    """
+    Every flag on the start and target squares of the given moves: the legal moves of other positions,
+    and moves with the wrong flag for their squares
+    """
+    return {Move(value & Move.start_square_mask, (value & Move.target_square_mask) >> 6, flag).value
+            for value in move_values for flag in range(8)}
+
+
+@pytest.mark.parametrize("fen", QueryPositions)
+def test_gives_check_agrees_with_making_the_move(fen):
+    board = Board.create_board(fen)
+    move_generator = MoveGenerator()
+    query_generator = MoveGenerator()
+
+    for move in move_generator.generate_moves(board):
+        board.make_move(move, in_search=True)
+        for reply in move_generator.generate_moves(board):
+            gives_check = query_generator.gives_check(board, reply)
+            board.make_move(reply, in_search=True)
+            assert gives_check == board.is_in_check(), (fen, move.value, reply.value)
+            board.unmake_move(reply, in_search=True)
+        board.unmake_move(move, in_search=True)
+
+
+def test_is_legal_agrees_with_generated_moves():
+    move_generator = MoveGenerator()
+    query_generator = MoveGenerator()
+    boards = [Board.create_board(fen) for fen in QueryPositions]
+
+    # Positions after each first move, so the queries include every kind of position the tree reaches
+    positions = []
+    for board in boards:
+        for move in move_generator.generate_moves(board):
+            positions.append((board, move))
+    candidates = move_variants(move.value for _, move in positions)
+
+    for board, move in positions:
+        board.make_move(move, in_search=True)
+        legal_values = {reply.value for reply in move_generator.generate_moves(board)}
+        for value in candidates | move_variants(legal_values):
+            assert query_generator.is_legal(board, Move(move_value=value)) == (value in legal_values), (move.value, value)
+        board.unmake_move(move, in_search=True)
+
+    assert not query_generator.is_legal(boards[0], Move.null_move())
+    assert not query_generator.is_legal(boards[0], None)
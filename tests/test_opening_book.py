@@ -0,0 +1,69 @@
+import os
+from Board.board import Board
+from Book.bookCompiler import BookCompiler
+from Book.openingBook import OpeningBook
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+from conftest import SrcDir
+
+BookPath = os.path.join(SrcDir, "..", "resources", "Book.txt")
+
+
+def play_line(move_names):
+    board = Board.create_board()
+    for move_name in move_names:
+        board.make_move(MoveUtility.get_move_from_uci_name(move_name, board))
+    return board
+
+
+def text_book_line(board, move_name, count, always_include_ep_square=False):
+    return f"pos {FenUtility.current_fen(board, always_include_ep_square)}\n{move_name} {count}\n"
+
+
+def test_book_lines_through_double_pushes(tmp_path):
+    # 1.e4 e5 2.d4, and 1.e4 d5 2.e5 f5 where the en passant capture exf6 is possible
+    lines = [["e2e4", "e7e5", "d2d4", "e5d4"], ["e2e4", "d7d5", "e4e5", "f7f5", "e5f6"]]
+    text = ""
+    for line in lines:
+        for ply, move_name in enumerate(line):
+            text += text_book_line(play_line(line[:ply]), move_name, 10)
+    # The position after 1.e4 again, written with its (uncapturable) en passant square: merged with the first
+    text += text_book_line(play_line(["e2e4"]), "e7e5", 5, always_include_ep_square=True)
+    text_path = tmp_path / "book.txt"
+    text_path.write_text(text)
+    binary_path = str(tmp_path / "book.bin")
+    assert BookCompiler.compile(str(text_path), binary_path) == 7
+
+    book = OpeningBook(binary_path)
+    for line in lines:
+        board = Board.create_board()
+        for move_name in line:
+            book_moves = {MoveUtility.get_move_name_uci(move): count for move, count in book.get_book_moves(OpeningBook.position_key(board))}
+            assert move_name in book_moves, (line, move_name)
+            move = book.try_get_book_move(board) if len(book_moves) == 1 else MoveUtility.get_move_from_uci_name(move_name, board)
+            assert MoveUtility.get_move_name_uci(move) == move_name
+            board.make_move(move)
+        assert book.try_get_book_move(board) is None
+
+    assert dict((MoveUtility.get_move_name_uci(move), count) for move, count in book.get_book_moves(OpeningBook.position_key(play_line(["e2e4"])))) == \
+        {"e7e5": 15, "d7d5": 10}
+
+
+def test_position_key_keeps_capturable_en_passant():
+    # Same placement, with and without the right to capture en passant
+    with_capture = play_line(["e2e4", "d7d5", "e4e5", "f7f5"])
+    without_capture = Board.create_board(FenUtility.current_fen(with_capture).replace(" f6 ", " - "))
+    assert OpeningBook.position_key(with_capture) != OpeningBook.position_key(without_capture)
+
+    # A double push with no pawn to capture has the key of the same position loaded without an en passant square
+    after_push = play_line(["d2d4"])
+    assert after_push.zobrist_key != Board.create_board(FenUtility.current_fen(after_push, False)).zobrist_key
+    assert OpeningBook.position_key(after_push) == OpeningBook.position_key(Board.create_board(FenUtility.current_fen(after_push, False)))
+
+
+def test_resources_book_follows_lines_through_double_pushes():
+    book = BookCompiler.compile_positions(BookCompiler.read_text_book(BookPath))
+    board = Board.create_board()
+    for move_name in ["d2d4", "g8f6", "c2c4"]:
+        board.make_move(MoveUtility.get_move_from_uci_name(move_name, board))
+        assert book.get(OpeningBook.position_key(board)), move_name
@@ -0,0 +1,73 @@
+import pytest
+from Board.board import Board
+from Board.zobrist import Zobrist
+from Move_Generation.moveGenerator import MoveGenerator
+from test_board import get_state
+
+# Reference positions and node counts from the Chess Programming Wiki perft results
+PerftPositions = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379]),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890]),
+]
+
+
+def perft(board, move_generator, depth):
+    moves = move_generator.generate_moves(board)
+    if depth == 1:
+        return len(moves)
+
+    num_nodes = 0
+    for move in moves:
+        board.make_move(move, in_search=True)
+        num_nodes += perft(board, move_generator, depth - 1)
+        board.unmake_move(move, in_search=True)
+    return num_nodes
+
+
+@pytest.mark.parametrize("fen, node_counts", PerftPositions)
+def test_perft(fen, node_counts):
+    board = Board.create_board(fen)
+    move_generator = MoveGenerator()
+    for depth, expected in enumerate(node_counts, 1):
+        assert perft(board, move_generator, depth) == expected, f"depth {depth}"
+
+
+@pytest.mark.parametrize("fen", [fen for fen, _ in PerftPositions])
+def test_make_unmake_restores_board(fen):
+    board = Board.create_board(fen)
+    move_generator = MoveGenerator()
+    initial_state = get_state(board)
+
+    # Moves are made as in search: outside search, irreversible moves clear the repetition history for good
+    for move in move_generator.generate_moves(board):
+        board.make_move(move, in_search=True)
+        # The incrementally updated key matches the key calculated from scratch
+        assert board.zobrist_key == Zobrist.calculate_zobrist_key(board)
+        for reply in move_generator.generate_moves(board):
+            board.make_move(reply, in_search=True)
+            assert board.zobrist_key == Zobrist.calculate_zobrist_key(board)
+            board.unmake_move(reply, in_search=True)
+        board.unmake_move(move, in_search=True)
+        assert get_state(board) == initial_state
+
+
+@pytest.mark.parametrize("fen", [fen for fen, _ in PerftPositions])
+def test_load_fen_fast_matches_load_position(fen):
+    board = Board.create_board(fen)
+    # The position itself and every position a move away (with new en passant squares, castling rights and clocks)
+    fens = [fen]
+    for move in MoveGenerator().generate_moves(board):
+        board.make_move(move)
+        fens.append(board.current_fen)
+        board.unmake_move(move)
+
+    fast_board = Board()
+    for position_fen in fens:
+        expected = Board()
+        expected.load_position(position_fen)
+        fast_board.load_fen_fast(position_fen)
+        assert get_state(fast_board) == get_state(expected), position_fen
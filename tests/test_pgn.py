@@ -0,0 +1,75 @@
+import io
+import random
+import pytest
+from Board.board import Board
+from Game_Result.gameResult import GameResult
+from Helpers.moveUtility import MoveUtility
+from Helpers.pgnReader import PGNReader
+from Helpers.pgnWriter import PGNWriter
+from Move_Generation.moveGenerator import MoveGenerator
+from test_perft import PerftPositions
+
+StartFens = [fen for fen, _ in PerftPositions] + ["rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"]
+
+
+def random_game(start_fen, num_ply, rng):
+    board = Board.create_board(start_fen)
+    move_generator = MoveGenerator()
+    moves = []
+    for _ in range(num_ply):
+        legal_moves = move_generator.generate_moves(board)
+        if not legal_moves:
+            break
+        move = rng.choice(legal_moves)
+        board.make_move(move)
+        moves.append(move)
+    return moves
+
+
+@pytest.mark.parametrize("fen", StartFens)
+def test_san_round_trip(fen):
+    board = Board.create_board(fen)
+    for move in MoveGenerator().generate_moves(board):
+        san = MoveUtility.get_move_name_san(move, board)
+        assert MoveUtility.get_move_from_san(board, san).value == move.value, san
+
+
+@pytest.mark.parametrize("fen, san", [
+    # Knight pinned against its king
+    ("4k3/4r3/8/8/8/8/4N3/4K3 w - - 0 1", "Nc3"),
+    # King moving into check
+    ("4k3/8/8/8/8/8/8/4K2r w - - 0 1", "Kd1"),
+    # Castling through an attacked square
+    ("4kr2/8/8/8/8/8/8/4K2R w K - 0 1", "O-O"),
+    # Castling without the right
+    ("4k3/8/8/8/8/8/8/4K2R w - - 0 1", "O-O"),
+    # Pawn move that leaves the king in check
+    ("4k3/8/8/b7/8/8/3P4/4K3 w - - 0 1", "d3"),
+])
+def test_illegal_san_gives_null_move(fen, san):
+    assert MoveUtility.get_move_from_san(Board.create_board(fen), san).is_null
+
+
+def test_pgn_round_trip():
+    rng = random.Random(7)
+    games = [(fen, random_game(fen, 60, rng)) for fen in StartFens for _ in range(3)]
+
+    output = io.StringIO()
+    writer = PGNWriter(output)
+    for round_number, (fen, moves) in enumerate(games, 1):
+        writer.write_game(moves, GameResult.DrawByArbiter, fen, "White Player", "Black Player", headers={"Round": str(round_number)},
+                          comments=["a comment {with braces}" if i % 7 == 3 else None for i in range(len(moves))])
+    writer.close()
+
+    output.seek(0)
+    read_games = list(PGNReader.read_games(output))
+    assert len(read_games) == len(games)
+
+    board = Board()
+    for round_number, ((fen, moves), game) in enumerate(zip(games, read_games), 1):
+        assert game.headers["Round"] == str(round_number)
+        assert (game.headers["White"], game.headers["Black"]) == ("White Player", "Black Player")
+        assert game.result == "1/2-1/2"
+        assert game.start_fen == fen
+        assert [move.value for move in PGNReader.read_game_moves(game, board)] == [move.value for move in moves]
+        assert len(game.comments) == len([i for i in range(len(moves)) if i % 7 == 3])
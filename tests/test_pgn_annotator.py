@@ -0,0 +1,71 @@
+import random
+import pytest
+from Analysis.pgnAnnotator import PGNAnnotator
+from Game_Result.gameResult import GameResult
+from Helpers.pgnReader import PGNReader
+from Helpers.pgnWriter import PGNWriter
+from test_pgn import StartFens, random_game
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def pgn_path(tmp_path):
+    rng = random.Random(3)
+    path = str(tmp_path / "games.pgn")
+    with PGNWriter(path) as writer:
+        for round_number in range(1, 8):
+            fen = StartFens[round_number % len(StartFens)]
+            writer.write_game(random_game(fen, 12, rng), GameResult.DrawByArbiter, fen, headers={"Round": str(round_number)})
+    # Make a move of the third game unresolvable
+    with open(path) as file:
+        games_text = file.read().split("[Event")
+    games_text[3] = games_text[3].replace(" 3. ", " 3. Qh9 ", 1)
+    with open(path, 'w') as file:
+        file.write("[Event".join(games_text))
+    return path
+
+
+def create_annotator():
+    return PGNAnnotator(max_depth=1, num_workers=1, tt_size_mb=8, flush_interval=2)
+
+
+def test_games_that_cannot_be_replayed_are_skipped(pgn_path, tmp_path):
+    output_path = str(tmp_path / "annotated.pgn")
+    assert create_annotator().annotate(pgn_path, output_path) == (6, 1)
+
+    with open(output_path) as file:
+        games = list(PGNReader.read_games(file))
+    assert [game.headers["Round"] for game in games] == ["1", "2", "4", "5", "6", "7"]
+    for game in games:
+        assert len(game.comments) == len(game.moves) == 12
+
+
+def test_resumed_run_matches_uninterrupted_run(pgn_path, tmp_path, monkeypatch):
+    expected_path = str(tmp_path / "expected.pgn")
+    create_annotator().annotate(pgn_path, expected_path)
+
+    # Stop the run while writing the fifth game: the fourth has been written but not recorded in the checkpoint
+    output_path = str(tmp_path / "annotated.pgn")
+    write_game = PGNWriter.write_game
+
+    def write_game_then_stop(writer, *args, **kwargs):
+        if writer.num_games_written == 4:
+            raise Interrupted()
+        write_game(writer, *args, **kwargs)
+
+    monkeypatch.setattr(PGNWriter, "write_game", write_game_then_stop)
+    with pytest.raises(Interrupted):
+        create_annotator().annotate(pgn_path, output_path)
+    monkeypatch.setattr(PGNWriter, "write_game", write_game)
+
+    num_games, num_skipped, offset = PGNAnnotator.read_checkpoint(output_path + ".checkpoint")
+    assert (num_games, num_skipped) == (4, 1)
+    with open(output_path) as file:
+        assert len(file.read()) > offset
+
+    assert create_annotator().annotate(pgn_path, output_path) == (6, 1)
+    with open(output_path) as output, open(expected_path) as expected:
+        assert output.read() == expected.read()
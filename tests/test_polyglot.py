@@ -0,0 +1,64 @@
+import pytest
+from Board.board import Board
+from Book.polyglot import PolyglotBook, PolyglotMove, PolyglotWriter, PolyglotZobrist
+from Helpers.boardHelpers import BoardHelper
+from Helpers.fenUtility import FenUtility
+from Helpers.moveUtility import MoveUtility
+
+# Keys given in the Polyglot book format specification, for the positions after each line of moves
+ReferenceKeys = [
+    ([], 0x463B96181691FC9C),
+    (["e2e4"], 0x823C9B50FD114196),
+    (["e2e4", "d7d5"], 0x0756B94461C50FB0),
+    (["e2e4", "d7d5", "e4e5"], 0x662FAFB965DB29D4),
+    (["e2e4", "d7d5", "e4e5", "f7f5"], 0x22A48B5A8E47FF78),
+    (["e2e4", "d7d5", "e4e5", "f7f5", "e1e2"], 0x652A607CA3F242C1),
+    (["e2e4", "d7d5", "e4e5", "f7f5", "e1e2", "e8f7"], 0x00FDD303C946BDD9),
+    (["a2a4", "b7b5", "h2h4", "b5b4", "c2c4"], 0x3C8123EA7B067637),
+    (["a2a4", "b7b5", "h2h4", "b5b4", "c2c4", "b4c3", "a1a3"], 0x5C3F9B829B279560),
+]
+
+
+@pytest.mark.parametrize("move_names, key", ReferenceKeys)
+def test_reference_keys(move_names, key):
+    board = Board.create_board(FenUtility.StartPositionFEN)
+    for move_name in move_names:
+        board.make_move(MoveUtility.get_move_from_uci_name(move_name, board))
+    assert PolyglotZobrist.calculate_key(board) == key
+
+    # The same position loaded from its FEN (which always has the en passant square after a double push)
+    assert PolyglotZobrist.calculate_key(Board.create_board(FenUtility.current_fen(board))) == key
+
+
+@pytest.mark.parametrize("fen, uci_name, polyglot_name", [
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "e1g1", "e1h1"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "e1c1", "e1a1"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "e8g8", "e8h8"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "e8c8", "e8a8"),
+    ("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1", "b7b8n", "b7b8n"),
+    ("4k3/8/8/8/8/8/8/R3K3 w - - 0 1", "a1h1", "a1h1"),
+])
+def test_move_encoding(fen, uci_name, polyglot_name):
+    board = Board.create_board(fen)
+    polyglot_move = PolyglotMove.from_uci_name(uci_name, board)
+    assert PolyglotMove.to_uci_name(polyglot_move, board) == uci_name
+    # to square in the low 6 bits, from square in the next 6
+    from_square = BoardHelper.square_index_from_name(polyglot_name[:2])
+    to_square = BoardHelper.square_index_from_name(polyglot_name[2:4])
+    assert polyglot_move & 0xFFF == to_square | from_square << 6
+
+
+def test_written_book_is_readable(tmp_path):
+    text_book = tmp_path / "book.txt"
+    text_book.write_text("pos rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -\ne2e4 200000\nd2d4 100000\n"
+                         "pos r3k2r/8/8/8/8/8/8/R3K2R w KQkq -\ne1g1 3\na1a8 1\n")
+    output = str(tmp_path / "book.bin")
+    assert PolyglotWriter.write(str(text_book), output) == 4
+
+    book = PolyglotBook(output)
+    # Weights are scaled to 16 bits, highest first
+    board = Board.create_board(FenUtility.StartPositionFEN)
+    assert [(MoveUtility.get_move_name_uci(move), weight) for move, weight in book.get_book_moves(board)] == [("e2e4", 0xFFFF), ("d2d4", 0x7FFF)]
+    board = Board.create_board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    assert [(MoveUtility.get_move_name_uci(move), weight) for move, weight in book.get_book_moves(board)] == [("e1g1", 3), ("a1a8", 1)]
+    assert book.get_book_moves(Board.create_board("4k3/8/8/8/8/8/8/4K3 w - - 0 1")) == []
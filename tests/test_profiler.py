@@ -0,0 +1,34 @@
+import importlib.util
+from Benchmarks.profiler import Profiler
+
+
+class Target:
+    def work(self, n):
+        return sum(range(n))
+
+
+def test_enable_and_disable():
+    original = Target.__dict__["work"]
+    Profiler.enable([(Target, "work")])
+    try:
+        assert Target().work(10) == 45
+        assert Profiler.stats["Target.work"][0] == 1
+    finally:
+        Profiler.disable()
+    assert Target.__dict__["work"] is original
+
+
+def test_second_copy_does_not_wrap_again():
+    # e.g. python -m Benchmarks.profiler runs a second copy of the module as __main__, with its own originals dict
+    spec = importlib.util.find_spec("Benchmarks.profiler")
+    second_copy = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(second_copy)
+
+    Profiler.enable([(Target, "work")])
+    try:
+        wrapper = Target.__dict__["work"]
+        second_copy.Profiler.enable([(Target, "work")])
+        assert Target.__dict__["work"] is wrapper
+        assert not second_copy.Profiler.originals
+    finally:
+        Profiler.disable()
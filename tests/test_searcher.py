@@ -0,0 +1,34 @@
+from Analysis.pgnAnnotator import GameAnnotator
+from Board.board import Board
+from Helpers.moveUtility import MoveUtility
+from Search.searcher import Searcher
+
+
+def test_repeated_search_searches_root_moves():
+    board = Board.create_board("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    searcher = Searcher(board, tt_size_mb=8)
+    first_move = searcher.start_search(max_depth=3)
+
+    # The second search finds every root position in the transposition table, but must still search the root moves
+    second_move = searcher.start_search(max_depth=3)
+    assert second_move.value == first_move.value
+    assert len(searcher.pv) > 1
+    assert len(searcher.root_move_nodes) > 1
+
+
+def test_search_moves_restricts_root_moves():
+    board = Board.create_board("4k3/8/8/3q4/8/8/3Q4/4K3 w - - 0 1")
+    searcher = Searcher(board, tt_size_mb=8)
+    assert MoveUtility.get_move_name_san(searcher.start_search(max_depth=3), board) == "Qxd5"
+
+    played_move = MoveUtility.get_move_from_san(board, "Ke2")
+    assert searcher.start_search(max_depth=3, search_moves=[played_move]).value == played_move.value
+    assert set(searcher.root_move_nodes) == {played_move.value}
+
+
+def test_annotated_move_is_scored_at_the_best_move_depth():
+    annotator = GameAnnotator(max_depth=3, tt_size_mb=8)
+    annotator.board.load_position("4k3/8/8/3q4/8/8/3Q4/4K3 w - - 0 1")
+    comment = annotator.annotate_move(MoveUtility.get_move_from_san(annotator.board, "Ke2"))
+    assert comment.split()[0].endswith("/3")
+    assert "Blunder" in comment and "Best: Qxd5" in comment
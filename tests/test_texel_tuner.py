@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from Board.board import Board
+from Evaluation.evaluation import Evaluation
+from Tuning.texelTuner import TexelTuner
+from conftest import SrcDir
+from program import EngineConfig
+
+DatasetLines = [
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1 [0.5]",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1 [0.0]",
+    "4k3/8/8/8/8/8/4P3/3QK3 w - - 0 1 [1.0]",
+    "3qk3/4p3/8/8/8/8/8/4K3 w - - 0 1 [0.5]",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1 \"1-0\"",
+]
+
+
+@pytest.fixture
+def tuner(tmp_path):
+    dataset = tmp_path / "positions.txt"
+    dataset.write_text("\n".join(DatasetLines) + "\n")
+    tuner = TexelTuner()
+    tuner.load_positions(str(dataset))
+    return tuner
+
+
+def test_parse_line():
+    fen, result = TexelTuner.parse_line("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1 [0.5]\n")
+    assert fen == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+    assert result == 0.5
+    assert TexelTuner.parse_line("8/8/8/8/8/8/8/8 w - -\n") is None
+
+
+def test_output_is_readable_as_engine_weights(tmp_path):
+    dataset = tmp_path / "positions.txt"
+    dataset.write_text("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1 [0.5]\n"
+                       "4k3/8/8/8/8/8/4P3/3QK3 w - - 0 1 [1.0]\n"
+                       "3qk3/4p3/8/8/8/8/8/4K3 w - - 0 1 [0.0]\n")
+    output = tmp_path / "weights.json"
+    process = subprocess.run([sys.executable, "-m", "Tuning.texelTuner", str(dataset), "--epochs", "2", "--k", "1.0",
+                              "--output", str(output)], cwd=os.path.join(SrcDir, "Core"), capture_output=True, text=True, timeout=120)
+    assert process.returncode == 0, process.stderr
+
+    config = EngineConfig.from_string(f"tuned,weights={output}")
+    assert len(config.weights) == len(Evaluation.get_weights())
+    assert all(isinstance(weight, int) for weight in config.weights)
+
+
+def test_evaluate_all_matches_features(tuner):
+    weights = np.asarray(Evaluation.get_weights(), dtype=np.float64)
+    board = Board()
+    for position_index, line in enumerate(DatasetLines):
+        board.load_fen_fast(TexelTuner.parse_line(line)[0])
+        expected = sum(value * weights[index] for index, value in Evaluation.get_features(board))
+        assert tuner.evaluate_all(weights)[position_index] == pytest.approx(expected)
+
+
+def test_gradient_matches_finite_differences(tuner):
+    k = 1.2
+    weights = np.asarray(Evaluation.get_weights(), dtype=np.float64)
+    gradient = tuner.gradient(weights, k)
+    assert len(gradient) == Evaluation.NumFeatures
+
+    # Features that appear in the positions, and a few that don't (whose gradient is zero)
+    used = np.unique(tuner.indices)
+    unused = np.setdiff1d(np.arange(Evaluation.NumFeatures), used)[:5]
+    step = 1e-3
+    for index in np.concatenate([used, unused]):
+        offset = np.zeros_like(weights)
+        offset[index] = step
+        numerical = (tuner.loss(weights + offset, k) - tuner.loss(weights - offset, k)) / (2 * step)
+        assert gradient[index] == pytest.approx(numerical, rel=1e-4, abs=1e-12), f"feature {index}"
+    assert np.any(gradient[used] != 0)
+
+
+def test_adam_steps_lower_the_loss(tuner):
+    k = 1.2
+    weights = np.asarray(Evaluation.get_weights(), dtype=np.float64)
+    initial_weights = weights.copy()
+    initial_loss = tuner.loss(weights, k)
+
+    one_step_loss = tuner.loss(tuner.tune(weights, k, epochs=1, log_interval=0), k)
+    assert one_step_loss < initial_loss
+    assert tuner.loss(tuner.tune(weights, k, epochs=20, log_interval=0), k) < one_step_loss
+    # The weights passed in are left unchanged
+    assert np.array_equal(weights, initial_weights)
@@ -0,0 +1,118 @@
+import itertools
+import time
+import pytest
+from Board.board import Board
+from Board.move import Move
+from Helpers.fenUtility import FenUtility
+from Search.searcher import Searcher
+from Search.timeManager import TimeManager
+
+MoveA = Move(12, 28)
+MoveB = Move(11, 27)
+
+
+def expire(time_manager, elapsed_ms):
+    time_manager.start_time = time.monotonic() - elapsed_ms / 1000
+
+
+@pytest.mark.parametrize("time_ms, increment_ms, moves_to_go, soft_ms, hard_ms", [
+    # (60000 - 30) / 40, and 4 times that
+    (60000, 0, None, 1499.25, 5997),
+    # The increment is added while the remaining time is more than twice the increment
+    (10000, 1000, None, 9970 / 40 + 800, 9970 / 40 * 4 + 3200),
+    (1500, 1000, None, 1470 / 40, 1470 / 40 * 4),
+    # The hard limit is at most half the remaining time
+    (10000, 0, 5, 1994, 4985),
+    # Moves to go is capped at the default
+    (10000, 0, 100, 9970 / 40, 9970 / 40 * 4),
+    # Nearly out of time: the minimum think time, but never more than is left
+    (100, 0, None, 70 / 40, 10),
+    (20, 0, None, 1 / 40, 1),
+])
+def test_clock_limits(time_ms, increment_ms, moves_to_go, soft_ms, hard_ms):
+    time_manager = TimeManager.for_clock(time_ms, increment_ms, moves_to_go)
+    assert time_manager.soft_limit_ms == pytest.approx(soft_ms)
+    assert time_manager.hard_limit_ms == pytest.approx(hard_ms)
+
+
+def test_clock_limits_stay_within_the_remaining_time():
+    for time_ms, increment_ms, moves_to_go, overhead_ms in itertools.product([1, 25, 50, 200, 1000, 30000, 600000], [0, 100, 2000],
+                                                                             [None, 1, 2, 10], [0, 30, 100]):
+        time_manager = TimeManager.for_clock(time_ms, increment_ms, moves_to_go, overhead_ms)
+        available_ms = max(1, time_ms - overhead_ms)
+        assert 0 < time_manager.soft_limit_ms <= time_manager.hard_limit_ms <= available_ms
+        assert time_manager.hard_limit_ms <= max(available_ms * TimeManager.MaxHardFraction, min(TimeManager.MinThinkTimeMs, available_ms))
+
+
+def test_max_think_time():
+    time_manager = TimeManager.for_clock(600000, max_think_time_ms=100)
+    assert time_manager.soft_limit_ms == 100
+    assert time_manager.hard_limit_ms == 400
+
+
+def test_move_time():
+    assert (TimeManager.for_move_time(1000).soft_limit_ms, TimeManager.for_move_time(1000).hard_limit_ms) == (970, 970)
+    assert TimeManager.for_move_time(10).hard_limit_ms == 1
+    assert not TimeManager().is_time_limited
+
+
+def test_soft_limit_scaling():
+    # A stable best move: the soft limit is used as is
+    time_manager = TimeManager(100, 1000)
+    for _ in range(3):
+        assert not time_manager.on_iteration_complete(MoveA, 0, 500, 1000)
+    assert time_manager.scaled_soft_limit_ms == pytest.approx(100)
+
+    # A changing best move stretches it, a big score drop stretches it further, up to the maximum factor
+    time_manager = TimeManager(100, 1000)
+    time_manager.on_iteration_complete(MoveA, 0, 500, 1000)
+    time_manager.on_iteration_complete(MoveB, 0, 500, 1000)
+    assert time_manager.scaled_soft_limit_ms == pytest.approx(100 * (1 + TimeManager.InstabilityScale))
+    time_manager.on_iteration_complete(MoveA, -50, 500, 1000)
+    assert time_manager.scaled_soft_limit_ms == pytest.approx(100 * (1 + 1.5 * TimeManager.InstabilityScale) * 1.25)
+    time_manager.on_iteration_complete(MoveB, -500, 500, 1000)
+    assert time_manager.scaled_soft_limit_ms == pytest.approx(100 * TimeManager.MaxSoftLimitFactor)
+
+    # A best move taking nearly all the nodes shrinks it
+    time_manager = TimeManager(100, 1000)
+    time_manager.on_iteration_complete(MoveA, 0, 950, 1000)
+    assert time_manager.scaled_soft_limit_ms == pytest.approx(100 * TimeManager.DominantMoveFactor)
+
+    # Never beyond the hard limit
+    time_manager = TimeManager(100, 150)
+    time_manager.on_iteration_complete(MoveA, 0, 500, 1000)
+    time_manager.on_iteration_complete(MoveB, -500, 500, 1000)
+    assert time_manager.scaled_soft_limit_ms == 150
+
+
+def test_stopping():
+    time_manager = TimeManager(100, 400)
+    expire(time_manager, 150)
+    assert time_manager.on_iteration_complete(MoveA, 0, 500, 1000)
+    assert not time_manager.is_hard_limit_reached()
+    expire(time_manager, 400)
+    assert time_manager.is_hard_limit_reached()
+
+    # Pondering never stops the search; the clock starts on ponder hit
+    time_manager.is_pondering = True
+    assert not time_manager.is_hard_limit_reached()
+    assert not time_manager.on_iteration_complete(MoveA, 0, 500, 1000)
+    time_manager.ponder_hit()
+    assert not time_manager.is_pondering and not time_manager.is_hard_limit_reached()
+
+    # Without limits the search is never stopped
+    time_manager = TimeManager()
+    expire(time_manager, 10 ** 7)
+    assert not time_manager.on_iteration_complete(MoveA, 0, 500, 1000)
+    assert not time_manager.is_hard_limit_reached()
+
+
+def test_search_stops_at_the_hard_limit():
+    searcher = Searcher(Board.create_board(FenUtility.StartPositionFEN), tt_size_mb=8)
+    # Build the lazily initialized tables first, so that only the search itself is timed
+    searcher.start_search(max_depth=1)
+    time_manager = TimeManager(50, 100)
+    start = time.monotonic()
+    move = searcher.start_search(time_manager=time_manager)
+    assert time.monotonic() - start < 2
+    assert not move.is_null
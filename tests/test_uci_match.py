@@ -0,0 +1,32 @@
+import asyncio
+import sys
+from Game_Result.gameResult import GameResult
+from Helpers.fenUtility import FenUtility
+from uciMatch import UCIEngineSpec, UCIMatchHarness
+
+# Exits before answering "uci"
+BrokenSpec = UCIEngineSpec("broken", [sys.executable, "-c", "import sys; sys.exit(1)"])
+
+
+def test_engine_failing_to_start_loses():
+    harness = UCIMatchHarness([BrokenSpec, UCIEngineSpec("other", [sys.executable, "-c", "import sys; sys.exit(1)"])])
+
+    async def play():
+        try:
+            return await harness.play_game(FenUtility.StartPositionFEN, harness.specs[0], harness.specs[1])
+        finally:
+            await asyncio.gather(*(pool.close() for pool in harness.pools.values()))
+
+    board, result = asyncio.run(play())
+    assert result == GameResult.WhiteIllegalMove
+    assert board.all_game_moves == []
+    assert all(not pool.all_engines for pool in harness.pools.values())
+
+
+def test_gauntlet_scores_startup_failures():
+    tested = UCIEngineSpec.from_string("tested:self")
+    harness = UCIMatchHarness([tested, BrokenSpec], base_time_ms=1000, increment_ms=0, concurrency=1)
+    asyncio.run(harness.run(2))
+
+    # The broken engine forfeits as both white and black
+    assert harness.scores == {"broken": [2, 0, 0]}